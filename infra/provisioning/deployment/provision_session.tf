@@ -12,6 +12,56 @@ variable "enable_session_mode" {
   default     = false
 }
 
+variable "session_slots_per_instance" {
+  description = "Number of independent Houdini sessions hosted per session instance. Each slot holds its own Houdini license."
+  type        = number
+  default     = 1
+}
+
+variable "session_warm_pool_max" {
+  description = "Maximum number of free, pre-booted session slots kept warm. 0 disables the warm pool."
+  type        = number
+  default     = 0
+}
+
+variable "session_warm_pool_size" {
+  description = "Number of warm session slots outside of any scheduled window."
+  type        = number
+  default     = 0
+}
+
+variable "session_warm_pool_schedule" {
+  description = "JSON list of {start_hour, end_hour, size} (UTC) overriding the warm pool size by time of day."
+  type        = string
+  default     = "[]"
+}
+
+variable "session_warm_pool_demand_window_minutes" {
+  description = "The warm pool grows to at least the number of sessions started in this many minutes."
+  type        = number
+  default     = 30
+}
+
+variable "session_direct_ws_port" {
+  description = "Port of the direct browser-to-instance WebSocket channel (slot N uses port + N). 0 disables the direct channel."
+  type        = number
+  default     = 0
+}
+
+variable "session_direct_ws_tls_secret_name" {
+  description = "Secrets Manager secret with the direct channel's PEM certificate and private_key (and optional host_suffix)."
+  type        = string
+  default     = ""
+}
+
+locals {
+  direct_ws_enabled = var.enable_session_mode && var.session_direct_ws_port > 0 && var.session_direct_ws_tls_secret_name != ""
+
+  # The pool manager also places sessions onto shared (multi-slot) instances
+  warm_pool_enabled       = var.enable_session_mode && (var.session_warm_pool_max > 0 || var.session_slots_per_instance > 1)
+  warm_pool_function_name = "aurora-session-pool"
+}
+
 ############################
 # CloudWatch Log Group
 ############################
@@ -42,12 +92,30 @@ resource "aws_dynamodb_table" "houdini_sessions" {
     type = "S"
   }
 
+  # Hour (UTC) of started_at, so recent starts are queried instead of scanned
+  attribute {
+    name = "start_bucket"
+    type = "S"
+  }
+
+  attribute {
+    name = "started_at"
+    type = "N"
+  }
+
   global_secondary_index {
     name            = "ConnectionIdIndex"
     hash_key        = "connection_id"
     projection_type = "ALL"
   }
 
+  global_secondary_index {
+    name            = "StartedAtIndex"
+    hash_key        = "start_bucket"
+    range_key       = "started_at"
+    projection_type = "KEYS_ONLY"
+  }
+
   ttl {
     attribute_name = "ttl"
     enabled        = true
@@ -58,6 +126,34 @@ resource "aws_dynamodb_table" "houdini_sessions" {
   }
 }
 
+# Session slots of warm / shared instances (keyed by "<instance_id>/<slot>")
+resource "aws_dynamodb_table" "session_pool" {
+  count        = var.enable_session_mode ? 1 : 0
+  name         = "aurora-session-pool"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "slot_id"
+
+  attribute {
+    name = "slot_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "connection_id"
+    type = "S"
+  }
+
+  global_secondary_index {
+    name            = "ConnectionIdIndex"
+    hash_key        = "connection_id"
+    projection_type = "ALL"
+  }
+
+  tags = {
+    Name = "Aurora Session Warm Pool"
+  }
+}
+
 ############################
 # IAM Role for WebSocket Lambda
 ############################
@@ -109,9 +205,16 @@ resource "aws_iam_role_policy" "websocket_lambda_policy" {
         ]
         Resource = [
           aws_dynamodb_table.houdini_sessions[0].arn,
-          "${aws_dynamodb_table.houdini_sessions[0].arn}/index/*"
+          "${aws_dynamodb_table.houdini_sessions[0].arn}/index/*",
+          aws_dynamodb_table.session_pool[0].arn,
+          "${aws_dynamodb_table.session_pool[0].arn}/index/*"
         ]
       },
+      {
+        Effect   = "Allow"
+        Action   = "lambda:InvokeFunction"
+        Resource = "arn:aws:lambda:${var.aws_region}:${data.aws_caller_identity.current.account_id}:function:${local.warm_pool_function_name}"
+      },
       {
         Effect = "Allow"
         Action = [
@@ -143,6 +246,15 @@ resource "aws_iam_role_policy" "websocket_lambda_policy" {
         Resource = [
           "${aws_s3_bucket.input_bucket.arn}/*"
         ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject"
+        ]
+        Resource = [
+          "${aws_s3_bucket.output_bucket.arn}/hda_schemas/*"
+        ]
       }
     ]
   })
@@ -179,6 +291,10 @@ resource "aws_lambda_function" "websocket_connect" {
       SECURITY_GROUP_ID      = aws_security_group.aurora_app_security_group.id
       INPUT_BUCKET           = aws_s3_bucket.input_bucket.bucket
       OUTPUT_BUCKET          = aws_s3_bucket.output_bucket.bucket
+      POOL_TABLE             = aws_dynamodb_table.session_pool[0].name
+      POOL_FUNCTION_NAME     = local.warm_pool_enabled ? local.warm_pool_function_name : ""
+      WARM_POOL_MAX          = var.session_warm_pool_max
+      SESSION_SLOTS          = var.session_slots_per_instance
     }
   }
 }
@@ -203,6 +319,10 @@ resource "aws_lambda_function" "websocket_disconnect" {
       SECURITY_GROUP_ID      = aws_security_group.aurora_app_security_group.id
       INPUT_BUCKET           = aws_s3_bucket.input_bucket.bucket
       OUTPUT_BUCKET          = aws_s3_bucket.output_bucket.bucket
+      POOL_TABLE             = aws_dynamodb_table.session_pool[0].name
+      POOL_FUNCTION_NAME     = local.warm_pool_enabled ? local.warm_pool_function_name : ""
+      WARM_POOL_MAX          = var.session_warm_pool_max
+      SESSION_SLOTS          = var.session_slots_per_instance
     }
   }
 }
@@ -227,10 +347,70 @@ resource "aws_lambda_function" "websocket_message" {
       SECURITY_GROUP_ID      = aws_security_group.aurora_app_security_group.id
       INPUT_BUCKET           = aws_s3_bucket.input_bucket.bucket
       OUTPUT_BUCKET          = aws_s3_bucket.output_bucket.bucket
+      POOL_TABLE             = aws_dynamodb_table.session_pool[0].name
+      POOL_FUNCTION_NAME     = local.warm_pool_enabled ? local.warm_pool_function_name : ""
+      WARM_POOL_MAX          = var.session_warm_pool_max
+      SESSION_SLOTS          = var.session_slots_per_instance
+      DIRECT_WS_PORT         = local.direct_ws_enabled ? var.session_direct_ws_port : 0
+      DIRECT_WS_TLS_SECRET   = local.direct_ws_enabled ? var.session_direct_ws_tls_secret_name : ""
     }
   }
 }
 
+# Warm pool manager (scheduled, and invoked after every claim)
+resource "aws_lambda_function" "session_pool" {
+  count            = local.warm_pool_enabled ? 1 : 0
+  filename         = data.archive_file.websocket_lambda[0].output_path
+  function_name    = local.warm_pool_function_name
+  role             = aws_iam_role.websocket_lambda_role[0].arn
+  handler          = "lambda_websocket_handler.pool_handler"
+  source_code_hash = data.archive_file.websocket_lambda[0].output_base64sha256
+  runtime          = "python3.11"
+  timeout          = 60
+
+  # One manager at a time, so concurrent runs don't double-launch
+  reserved_concurrent_executions = 1
+
+  environment {
+    variables = {
+      SESSIONS_TABLE                  = aws_dynamodb_table.houdini_sessions[0].name
+      WEBSOCKET_API_ENDPOINT          = aws_apigatewayv2_stage.production[0].invoke_url
+      LAUNCH_TEMPLATE_NAME            = aws_launch_template.interactive_app[0].name
+      INPUT_BUCKET                    = aws_s3_bucket.input_bucket.bucket
+      OUTPUT_BUCKET                   = aws_s3_bucket.output_bucket.bucket
+      POOL_TABLE                      = aws_dynamodb_table.session_pool[0].name
+      WARM_POOL_MAX                   = var.session_warm_pool_max
+      WARM_POOL_SIZE                  = var.session_warm_pool_size
+      WARM_POOL_SCHEDULE              = var.session_warm_pool_schedule
+      WARM_POOL_DEMAND_WINDOW_SECONDS = var.session_warm_pool_demand_window_minutes * 60
+      SESSION_SLOTS                   = var.session_slots_per_instance
+      DIRECT_WS_PORT                  = local.direct_ws_enabled ? var.session_direct_ws_port : 0
+      DIRECT_WS_TLS_SECRET            = local.direct_ws_enabled ? var.session_direct_ws_tls_secret_name : ""
+    }
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "session_pool" {
+  count               = local.warm_pool_enabled ? 1 : 0
+  name                = "aurora-session-pool-schedule"
+  schedule_expression = "rate(1 minute)"
+}
+
+resource "aws_cloudwatch_event_target" "session_pool" {
+  count = local.warm_pool_enabled ? 1 : 0
+  rule  = aws_cloudwatch_event_rule.session_pool[0].name
+  arn   = aws_lambda_function.session_pool[0].arn
+}
+
+resource "aws_lambda_permission" "session_pool" {
+  count         = local.warm_pool_enabled ? 1 : 0
+  statement_id  = "AllowEventBridgeInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.session_pool[0].function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.session_pool[0].arn
+}
+
 ############################
 # Launch Template for Aurora Session Mode
 ############################
@@ -326,6 +506,35 @@ resource "aws_launch_template" "interactive_app" {
   }
 }
 
+# Direct browser channel: open the ports (one per slot) and let instances
+# read the channel's TLS certificate
+resource "aws_security_group_rule" "direct_ws" {
+  count             = local.direct_ws_enabled ? 1 : 0
+  type              = "ingress"
+  from_port         = var.session_direct_ws_port
+  to_port           = var.session_direct_ws_port + var.session_slots_per_instance - 1
+  protocol          = "tcp"
+  cidr_blocks       = ["0.0.0.0/0"]
+  security_group_id = aws_security_group.aurora_app_security_group.id
+}
+
+resource "aws_iam_role_policy" "direct_ws_tls_secret" {
+  count = local.direct_ws_enabled ? 1 : 0
+  name  = "aurora-session-direct-ws-tls"
+  role  = aws_iam_role.ec2_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = "secretsmanager:GetSecretValue"
+        Resource = "arn:aws:secretsmanager:${var.aws_region}:${data.aws_caller_identity.current.account_id}:secret:${var.session_direct_ws_tls_secret_name}-*"
+      }
+    ]
+  })
+}
+
 ############################
 # API Gateway WebSocket
 ############################
@@ -505,6 +714,11 @@ output "sessions_table_name" {
   description = "DynamoDB table name for session tracking"
 }
 
+output "session_pool_table_name" {
+  value       = var.enable_session_mode ? aws_dynamodb_table.session_pool[0].name : null
+  description = "DynamoDB table name for warm pool / shared instance session slots"
+}
+
 output "session_launch_template_name" {
   value       = var.enable_session_mode ? aws_launch_template.interactive_app[0].name : null
   description = "Launch template name for Aurora Session instances"
@@ -4,12 +4,20 @@ Routes messages directly between browser and EC2 WebSocket connections.
 No SQS - pure WebSocket messaging for low-latency interactions.
 """
 
+import base64
+import hashlib
+import hmac
 import json
 import logging
+import math
 import os
+import secrets
 import time
 import uuid
+from datetime import datetime, timezone
+
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 
 # Initialize logging
@@ -20,29 +28,90 @@ logger.setLevel(logging.INFO)
 dynamodb = boto3.resource("dynamodb")
 ec2 = boto3.client("ec2")
 s3 = boto3.client("s3")
+lambda_client = boto3.client("lambda")
 
 # Environment variables
 SESSIONS_TABLE = os.environ["SESSIONS_TABLE"]
 INPUT_BUCKET = os.environ["INPUT_BUCKET"]
+OUTPUT_BUCKET = os.environ.get("OUTPUT_BUCKET")
+
+# Offline HDA index published by "hda_index" batch directives.
+# Must match runtime/session/schema_cache.py.
+HDA_SCHEMA_PREFIX = "hda_schemas/v1"
+# Node path HDAs are instantiated at in session_runner.hip
+DEFAULT_HDA_NODE_PATH = "/obj/CONTAINER/user_hda"
+
+# Independent Houdini sessions hosted per instance
+SESSION_SLOTS = max(1, int(os.environ.get("SESSION_SLOTS", "1")))
+
+# Warm pool of pre-booted, licensed session slots (disabled when max is 0)
+POOL_TABLE = os.environ.get("POOL_TABLE")
+POOL_FUNCTION_NAME = os.environ.get("POOL_FUNCTION_NAME")
+WARM_POOL_MAX = int(os.environ.get("WARM_POOL_MAX", "0"))
+WARM_POOL_SIZE = int(os.environ.get("WARM_POOL_SIZE", "0"))
+# JSON list of {"start_hour", "end_hour", "size"} (UTC), e.g. office hours
+WARM_POOL_SCHEDULE = json.loads(os.environ.get("WARM_POOL_SCHEDULE") or "[]")
+WARM_POOL_DEMAND_WINDOW_SECONDS = int(
+    os.environ.get("WARM_POOL_DEMAND_WINDOW_SECONDS", "1800")
+)
+# Instances that never register (or stop heartbeating) are replaced
+WARM_POOL_LAUNCH_TIMEOUT_SECONDS = 900
+WARM_POOL_HEARTBEAT_TIMEOUT_SECONDS = 900
+
+# Messages above API Gateway's 128 KB limit are split into "chunk"
+# messages. Must match runtime/session/message_framing.py.
+MAX_PAYLOAD_BYTES = 64 * 1024
+CHUNK_BYTES = 48 * 1024
+
+# Direct browser ↔ instance channel (disabled when the port is 0); see
+# runtime/session/direct_channel.py
+DIRECT_WS_PORT = int(os.environ.get("DIRECT_WS_PORT") or "0")
+DIRECT_WS_TLS_SECRET = os.environ.get("DIRECT_WS_TLS_SECRET", "")
+DIRECT_TOKEN_TTL_SECONDS = 60  # only needed to open the connection
+
+# Per-container routing cache: ("connection" | "session", id) -> (expires_at, session).
+# Each Lambda function runs in its own containers, so entries can go stale
+# when another function changes a session; routing falls back to DynamoDB
+# when a cached peer is missing or gone, and the TTL bounds the rest.
+ROUTE_CACHE_TTL_SECONDS = float(os.environ.get("ROUTE_CACHE_TTL_SECONDS", "10"))
+ROUTE_CACHE_MAX_ENTRIES = 1000
+_route_cache = {}
+
+# Actions handled by the Lambda itself rather than routed
+SESSION_ACTIONS = {
+    "get_session_id",
+    "request_upload_url",
+    "start_session",
+    "terminate_session",
+    "direct_channel_available",
+    "request_direct_channel",
+}
+
+# API Gateway Management API clients by endpoint, reused across invocations
+_apigw_clients = {}
 
 
 def get_apigw_management_client(event):
-    """Create API Gateway Management API client from event context."""
+    """Get the (cached) API Gateway Management API client for the event's stage."""
     domain_name = event["requestContext"]["domainName"]
     stage = event["requestContext"]["stage"]
+    endpoint_url = f"https://{domain_name}/{stage}"
 
-    return boto3.client(
-        "apigatewaymanagementapi", endpoint_url=f"https://{domain_name}/{stage}"
-    )
+    client = _apigw_clients.get(endpoint_url)
+    if client is None:
+        client = boto3.client("apigatewaymanagementapi", endpoint_url=endpoint_url)
+        _apigw_clients[endpoint_url] = client
+    return client
 
 
 def connect_handler(event, context):
     """
     Handle WebSocket connection.
 
-    Two types of connections:
+    Three types of connections:
     1. Browser client - creates new session (no HDA at connect time)
     2. EC2 instance - includes 'session_id' query param, joins existing session
+    3. Free session slot - includes 'pool_slot_id', waits to be claimed
     """
     connection_id = event["requestContext"]["connectionId"]
     query_params = event.get("queryStringParameters", {}) or {}
@@ -50,6 +119,10 @@ def connect_handler(event, context):
     logger.info(f"WebSocket connection: {connection_id}")
     logger.info(f"Query params: {query_params}")
 
+    # Session slot announcing it is booted and waiting for a session
+    if "pool_slot_id" in query_params:
+        return register_pool_slot(query_params["pool_slot_id"], connection_id)
+
     table = dynamodb.Table(SESSIONS_TABLE)
 
     # Check if this is an EC2 connection joining existing session
@@ -69,6 +142,7 @@ def connect_handler(event, context):
             )
 
             logger.info(f"EC2 connected to session: {session_id}")
+            invalidate_routes(session_id)
 
             # Notify browser that EC2 WebSocket handler is connected
             # NOTE: This does NOT mean the Houdini runner is ready yet.
@@ -135,6 +209,10 @@ def disconnect_handler(event, context):
     connection_id = event["requestContext"]["connectionId"]
 
     logger.info(f"WebSocket disconnection: {connection_id}")
+    invalidate_routes(None, connection_id)
+
+    if release_pool_connection(connection_id):
+        return {"statusCode": 200, "body": "Pool slot disconnected"}
 
     table = dynamodb.Table(SESSIONS_TABLE)
 
@@ -152,6 +230,7 @@ def disconnect_handler(event, context):
             instance_id = session.get("instance_id")
             browser_conn = session.get("browser_connection_id")
             ec2_conn = session.get("ec2_connection_id")
+            invalidate_routes(session_id, browser_conn, ec2_conn)
 
             # If browser disconnects, terminate everything
             if connection_id == browser_conn:
@@ -168,8 +247,8 @@ def disconnect_handler(event, context):
                     except:
                         pass
 
-                # Terminate EC2 instance
-                if instance_id:
+                # Terminate EC2 instance (a shared instance recycles the slot)
+                if instance_id and not session.get("shared_instance"):
                     try:
                         ec2.terminate_instances(InstanceIds=[instance_id])
                         logger.info(f"Terminated instance {instance_id}")
@@ -215,7 +294,11 @@ def message_handler(event, context):
     Special actions handled by Lambda:
     - start_session: Launch EC2 instance
     - terminate_session: Clean up and terminate
+
+    Routing lookups go through a short-lived per-container cache; the
+    special actions always read the session from DynamoDB.
     """
+    received_at = time.time()
     connection_id = event["requestContext"]["connectionId"]
     apigw_mgmt = get_apigw_management_client(event)
 
@@ -226,38 +309,30 @@ def message_handler(event, context):
 
         logger.info(f"Message from {connection_id}: {action}")
 
-        # Get session - try by session_id first (for EC2 messages), then by connection_id
-        table = dynamodb.Table(SESSIONS_TABLE)
-
-        if session_id_in_body:
-            # Direct query by session_id (EC2 messages include this)
-            response = table.get_item(Key={"session_id": session_id_in_body})
-            if "Item" not in response:
-                send_to_connection(
-                    apigw_mgmt, connection_id, {"error": "Session not found"}
-                )
-                return {"statusCode": 404, "body": "Session not found"}
-            session = response["Item"]
-        else:
-            # Query by connection_id (browser messages)
-            response = table.query(
-                IndexName="ConnectionIdIndex",
-                KeyConditionExpression="connection_id = :conn_id",
-                ExpressionAttributeValues={":conn_id": connection_id},
-            )
+        # Free slots are not part of a session yet
+        if action == "pool_heartbeat":
+            return handle_pool_heartbeat(body, connection_id)
 
-            if not response["Items"]:
-                send_to_connection(
-                    apigw_mgmt, connection_id, {"error": "Session not found"}
-                )
-                return {"statusCode": 404, "body": "Session not found"}
+        # Only this Lambda keys the direct channel; never route one sent by a client
+        if action == "direct_channel_key":
+            logger.warning(f"Dropped direct_channel_key from {connection_id}")
+            return {"statusCode": 403, "body": "Forbidden action"}
 
-            session = response["Items"][0]
+        # Lambda actions read and change the session record, so they always
+        # go to DynamoDB; plain routing can use the per-container cache
+        use_cache = action not in SESSION_ACTIONS
+        session, cached = find_session(connection_id, session_id_in_body, use_cache)
+        if not session:
+            send_to_connection(apigw_mgmt, connection_id, {"error": "Session not found"})
+            return {"statusCode": 404, "body": "Session not found"}
 
         session_id = session["session_id"]
         browser_conn = session.get("browser_connection_id")
         ec2_conn = session.get("ec2_connection_id")
 
+        if action in SESSION_ACTIONS:
+            invalidate_routes(session_id, browser_conn, ec2_conn)
+
         # Handle Lambda-specific actions
         if action == "get_session_id":
             # Send session_id to browser
@@ -281,24 +356,24 @@ def message_handler(event, context):
         elif action == "terminate_session":
             return handle_terminate_session(session, apigw_mgmt, connection_id)
 
-        # Route messages between connections
-        elif connection_id == browser_conn:
-            # Browser → EC2
-            if ec2_conn:
-                send_to_connection(apigw_mgmt, ec2_conn, body)
-                logger.info(f"Routed message from browser to EC2")
-            else:
-                send_to_connection(
-                    apigw_mgmt, connection_id, {"error": "EC2 not connected yet"}
-                )
+        elif action == "direct_channel_available" and connection_id == ec2_conn:
+            return handle_direct_channel_available(session, body, apigw_mgmt)
 
-        elif connection_id == ec2_conn:
-            # EC2 → Browser
-            if browser_conn:
-                send_to_connection(apigw_mgmt, browser_conn, body)
-                logger.info(f"Routed message from EC2 to browser")
-            else:
-                logger.warning("Browser not connected")
+        elif action == "request_direct_channel":
+            return send_direct_channel(session, apigw_mgmt)
+
+        # Serve the pre-indexed schema while Houdini installs the HDA
+        if (
+            connection_id == browser_conn
+            and action == "extract_parameters"
+            and body.get("s3_key")
+        ):
+            send_cached_preview(body["s3_key"], apigw_mgmt, connection_id)
+
+        # Route messages between connections
+        if body.get("request_id") and connection_id == browser_conn:
+            event["body"] = add_route_time(event["body"], received_at)
+        route_message(event, session, cached, session_id_in_body, apigw_mgmt)
 
         return {"statusCode": 200, "body": "Message routed"}
 
@@ -311,6 +386,122 @@ def message_handler(event, context):
         return {"statusCode": 500, "body": str(e)}
 
 
+def find_session(connection_id, session_id=None, use_cache=True):
+    """
+    Look up the session a message belongs to.
+
+    EC2 messages carry their ``session_id``; browser messages are matched
+    by connection id through the ``ConnectionIdIndex`` GSI.
+
+    Returns:
+        ``(session, cached)``: the session item (None if there is none) and
+        whether it came from the routing cache.
+    """
+    key = ("session", session_id) if session_id else ("connection", connection_id)
+    now = time.time()
+
+    if use_cache:
+        entry = _route_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1], True
+
+    table = dynamodb.Table(SESSIONS_TABLE)
+    if session_id:
+        session = table.get_item(Key={"session_id": session_id}).get("Item")
+    else:
+        items = table.query(
+            IndexName="ConnectionIdIndex",
+            KeyConditionExpression="connection_id = :conn_id",
+            ExpressionAttributeValues={":conn_id": connection_id},
+        )["Items"]
+        session = items[0] if items else None
+
+    if session:
+        # Drop expired entries now and then so warm containers stay small
+        if len(_route_cache) >= ROUTE_CACHE_MAX_ENTRIES:
+            for stale in [k for k, (expires, _) in _route_cache.items() if expires <= now]:
+                del _route_cache[stale]
+        _route_cache[key] = (now + ROUTE_CACHE_TTL_SECONDS, session)
+    else:
+        _route_cache.pop(key, None)
+    return session, False
+
+
+def invalidate_routes(session_id=None, *connection_ids):
+    """Drop cached routing entries for a session and/or connections."""
+    if session_id:
+        _route_cache.pop(("session", session_id), None)
+    for connection_id in connection_ids:
+        if connection_id:
+            _route_cache.pop(("connection", connection_id), None)
+
+
+def add_route_time(payload, received_at):
+    """
+    Prepend ``route_ms`` (time spent in this handler so far) to a JSON
+    object payload without re-encoding it, for the request's latency
+    breakdown. Same technique as runtime/session/message_framing.py.
+    """
+    route_ms = round((time.time() - received_at) * 1000, 2)
+    body = payload.lstrip()[1:]
+    separator = "" if body.lstrip().startswith("}") else ", "
+    return '{"route_ms": ' + json.dumps(route_ms) + separator + body
+
+
+def route_message(event, session, cached, session_id_in_body, apigw_mgmt):
+    """
+    Forward a message to the other side of its session.
+
+    A cached session is re-read from DynamoDB once if it doesn't know the
+    sender or the peer (e.g. EC2 joined after it was cached), or if the
+    peer connection is gone.
+    """
+    connection_id = event["requestContext"]["connectionId"]
+
+    for _ in range(2):
+        browser_conn = session.get("browser_connection_id")
+        ec2_conn = session.get("ec2_connection_id")
+        target = {browser_conn: ec2_conn, ec2_conn: browser_conn}.get(connection_id)
+
+        if cached and not target:
+            session, cached = find_session(connection_id, session_id_in_body, False)
+            if session:
+                continue
+            return
+
+        if connection_id == browser_conn:
+            # Browser → EC2 (forward the original body, no re-encoding)
+            if not ec2_conn:
+                send_to_connection(
+                    apigw_mgmt, connection_id, {"error": "EC2 not connected yet"}
+                )
+                return
+        elif connection_id == ec2_conn:
+            # EC2 → Browser
+            if not browser_conn:
+                logger.warning("Browser not connected")
+                return
+        else:
+            return
+
+        try:
+            # Only the browser reassembles chunks; browser messages already
+            # fit in one API Gateway frame, so they go to EC2 whole
+            send_to_connection(apigw_mgmt, target, event["body"], chunk=target == browser_conn)
+        except ClientError as e:
+            if cached and e.response["Error"]["Code"] == "GoneException":
+                invalidate_routes(session["session_id"], browser_conn, ec2_conn)
+                session, cached = find_session(connection_id, session_id_in_body, False)
+                if session:
+                    continue
+                return
+            raise
+
+        direction = "browser to EC2" if target == ec2_conn else "EC2 to browser"
+        logger.info(f"Routed message from {direction}")
+        return
+
+
 def handle_request_upload_url(session, body, apigw_mgmt, connection_id):
     """Generate a presigned URL for uploading HDA file to S3."""
     session_id = session["session_id"]
@@ -372,11 +563,21 @@ def handle_request_upload_url(session, body, apigw_mgmt, connection_id):
 
 
 def handle_start_session(session, apigw_mgmt, connection_id, body=None):
-    """Launch EC2 instance for the session (no HDA — loaded later via menu)."""
+    """Place the session on a free slot, or launch an EC2 instance for it.
+
+    An optional ``s3_key`` (an HDA already uploaded via
+    ``request_upload_url``) is passed to the instance (as a tag, or in the
+    claim message for a pooled slot) so it can be downloaded and installed
+    while Houdini boots. Without it the HDA is loaded later via the menu.
+    """
     session_id = session["session_id"]
     
     # Get idle timeout from request body (in minutes, convert to seconds)
     body = body or {}
+
+    # Optional HDA to preload at boot
+    hda_s3_key = body.get("s3_key") or session.get("s3_key")
+    hda_filename = body.get("filename") or session.get("hda_file")
     idle_timeout_minutes = body.get("idle_timeout_minutes", 15)
     idle_timeout_seconds = idle_timeout_minutes * 60
     
@@ -392,8 +593,58 @@ def handle_start_session(session, apigw_mgmt, connection_id, body=None):
         )
         return {"statusCode": 400, "body": "Already started"}
 
+    table = dynamodb.Table(SESSIONS_TABLE)
+
+    slot = claim_pool_slot(
+        session_id,
+        {
+            "hda_s3_key": hda_s3_key or "",
+            "hda_filename": hda_filename or "",
+            "idle_timeout_seconds": str(idle_timeout_seconds),
+            "idle_warning_seconds": str(idle_warning_seconds),
+        },
+        apigw_mgmt,
+    )
+    if slot:
+        started_at = int(time.time())
+        table.update_item(
+            Key={"session_id": session_id},
+            UpdateExpression=(
+                "SET instance_id = :iid, slot_id = :slot, shared_instance = :shared, "
+                "#status = :status, started_at = :now, start_bucket = :bucket"
+            ),
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":iid": slot["instance_id"],
+                ":slot": slot["slot_id"],
+                ":shared": SESSION_SLOTS > 1,
+                ":status": "starting",
+                ":now": started_at,
+                ":bucket": _start_bucket(started_at),
+            },
+        )
+
+        send_to_connection(
+            apigw_mgmt,
+            connection_id,
+            {
+                "action": "session_started",
+                "session_id": session_id,
+                "instance_id": slot["instance_id"],
+                "status": "starting",
+                "warm": True,
+                "hda_s3_key": hda_s3_key,
+                "message": "Warm instance claimed, connecting...",
+            },
+        )
+
+        if hda_s3_key:
+            send_cached_preview(hda_s3_key, apigw_mgmt, connection_id)
+
+        trigger_pool_replenish()
+        return {"statusCode": 200, "body": "Session started (warm)"}
+
     try:
-        launch_template_name = os.environ["LAUNCH_TEMPLATE_NAME"]
         websocket_url = os.environ["WEBSOCKET_API_ENDPOINT"]
         input_bucket = os.environ["INPUT_BUCKET"]
         output_bucket = os.environ["OUTPUT_BUCKET"]
@@ -408,31 +659,30 @@ def handle_start_session(session, apigw_mgmt, connection_id, body=None):
             {"Key": "idle_timeout_seconds", "Value": str(idle_timeout_seconds)},
             {"Key": "idle_warning_seconds", "Value": str(idle_warning_seconds)},
         ]
+        if hda_s3_key:
+            tags.append({"Key": "hda_s3_key", "Value": hda_s3_key})
+            tags.append({"Key": "hda_filename", "Value": hda_filename or ""})
 
-        instance = ec2.run_instances(
-            LaunchTemplate={
-                "LaunchTemplateName": launch_template_name,
-                "Version": "$Latest",
-            },
-            MinCount=1,
-            MaxCount=1,
-            TagSpecifications=[
-                {
-                    "ResourceType": "instance",
-                    "Tags": tags,
-                }
-            ],
-        )
-
-        instance_id = instance["Instances"][0]["InstanceId"]
+        # The session gets slot 0; any other slots join the pool once booted
+        instance_id = launch_pool_instances(1, session_id=session_id, tags=tags)[0]
 
         # Update session with instance ID
-        table = dynamodb.Table(SESSIONS_TABLE)
+        started_at = int(time.time())
         table.update_item(
             Key={"session_id": session_id},
-            UpdateExpression="SET instance_id = :iid, #status = :status",
+            UpdateExpression=(
+                "SET instance_id = :iid, slot_id = :slot, shared_instance = :shared, "
+                "#status = :status, started_at = :now, start_bucket = :bucket"
+            ),
             ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":iid": instance_id, ":status": "starting"},
+            ExpressionAttributeValues={
+                ":iid": instance_id,
+                ":slot": slot_id_for(instance_id, 0),
+                ":shared": SESSION_SLOTS > 1,
+                ":status": "starting",
+                ":now": started_at,
+                ":bucket": _start_bucket(started_at),
+            },
         )
 
         logger.info(f"Started instance {instance_id} for session {session_id}")
@@ -445,10 +695,17 @@ def handle_start_session(session, apigw_mgmt, connection_id, body=None):
                 "session_id": session_id,
                 "instance_id": instance_id,
                 "status": "starting",
+                "hda_s3_key": hda_s3_key,
                 "message": "EC2 instance is starting. This may take 1-2 minutes.",
             },
         )
 
+        # Show the pre-indexed UI of the initial HDA while the instance boots
+        if hda_s3_key:
+            send_cached_preview(hda_s3_key, apigw_mgmt, connection_id)
+
+        # The pool was empty; let it catch up with demand
+        trigger_pool_replenish()
         return {"statusCode": 200, "body": "Session started"}
 
     except ClientError as e:
@@ -459,6 +716,651 @@ def handle_start_session(session, apigw_mgmt, connection_id, body=None):
         return {"statusCode": 500, "body": str(e)}
 
 
+def lookup_cached_hda(s3_key):
+    """
+    Find the offline index entry, schema and preview for an uploaded HDA.
+
+    The index is keyed by the MD5 of the HDA file, which is the ETag of
+    the single-part presigned upload, so no download is needed.
+
+    Returns:
+        ``(entry, schema)`` or ``None`` if the HDA has not been indexed.
+    """
+    if not OUTPUT_BUCKET:
+        return None
+
+    try:
+        head = s3.head_object(Bucket=INPUT_BUCKET, Key=s3_key)
+        etag = head["ETag"].strip('"')
+        if "-" in etag:
+            # Multipart upload — ETag is not a content hash
+            return None
+
+        entry = json.loads(
+            s3.get_object(
+                Bucket=OUTPUT_BUCKET, Key=f"{HDA_SCHEMA_PREFIX}/by_md5/{etag}.json"
+            )["Body"].read()
+        )
+        schema = json.loads(
+            s3.get_object(
+                Bucket=OUTPUT_BUCKET,
+                Key=f"{HDA_SCHEMA_PREFIX}/{entry['definition_key']}.json",
+            )["Body"].read()
+        )
+        return entry, schema
+
+    except ClientError as e:
+        code = e.response["Error"]["Code"]
+        if code not in ("NoSuchKey", "404", "AccessDenied", "403"):
+            logger.error(f"Error looking up cached HDA schema for {s3_key}: {e}")
+        return None
+
+
+def send_cached_preview(s3_key, apigw_mgmt, connection_id):
+    """
+    Send a pre-indexed schema (and preview geometry) to the browser.
+
+    The messages mirror what the session runner sends, flagged with
+    ``cached: True``; the runner's own ``parameters_ready`` follows once
+    the HDA is actually loaded.
+    """
+    cached = lookup_cached_hda(s3_key)
+    if not cached:
+        return False
+
+    entry, schema = cached
+    schema["hda_node_path"] = DEFAULT_HDA_NODE_PATH
+    schema["parameters"] = {
+        f"{DEFAULT_HDA_NODE_PATH}/{name}": parm
+        for name, parm in schema.get("parameters", {}).items()
+    }
+
+    send_to_connection(
+        apigw_mgmt,
+        connection_id,
+        {
+            "action": "parameters_ready",
+            "cached": True,
+            "parameters": schema,
+            "message": f"Loaded cached parameters for '{entry.get('tool_name')}'",
+        },
+    )
+
+    if entry.get("preview"):
+        preview_key = f"{HDA_SCHEMA_PREFIX}/{entry['definition_key']}.glb"
+        preview_url = s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": OUTPUT_BUCKET, "Key": preview_key},
+            ExpiresIn=3600,
+        )
+        send_to_connection(
+            apigw_mgmt,
+            connection_id,
+            {
+                "action": "geometry_ready",
+                "cached": True,
+                "geometry": {
+                    "status": "success",
+                    "url": preview_url,
+                    "geometry_url": preview_url,
+                    "s3_key": preview_key,
+                    "format": "gltf",
+                    "point_count": entry.get("point_count", 0),
+                    "primitive_count": entry.get("primitive_count", 0),
+                },
+            },
+        )
+
+    logger.info(f"Sent cached preview for {s3_key} ({entry['definition_key']})")
+    return True
+
+
+# ======================================================================
+#  Warm pool and session slots
+# ======================================================================
+#
+# An instance runs SESSION_SLOTS independent Houdini runners ("slots").
+# Each slot boots, licenses Houdini and loads session_runner.hip. A free
+# slot then connects with ``?pool_slot_id=<instance_id>/<slot>`` and waits.
+# ``start_session`` claims a free slot with a conditional update (so two
+# sessions can never get the same slot) and pushes the session config
+# over that connection. When a session on a shared instance ends, its
+# slot restarts hython and registers itself as free again.
+#
+# ``pool_handler`` runs on a schedule (and asynchronously after every
+# start_session). It keeps the number of free slots at the warm pool
+# target, and retires instances whose slots are all idle beyond it.
+#
+# Slot status: launching -> available <-> disconnected -> in_use -> available
+
+
+def slot_id_for(instance_id, slot):
+    """Return the pool key of *slot* on *instance_id*."""
+    return f"{instance_id}/{slot}"
+
+
+def register_pool_slot(slot_id, connection_id):
+    """
+    Mark a slot as free on its pool connection.
+
+    A claimed (``in_use``) slot is only recycled once its session has
+    ended (session items are deleted on disconnect and termination), so a
+    registration for a live session's slot cannot hand it to someone else.
+    """
+    if not POOL_TABLE:
+        return {"statusCode": 403, "body": "Warm pool disabled"}
+
+    table = dynamodb.Table(POOL_TABLE)
+    item = table.get_item(Key={"slot_id": slot_id}).get("Item")
+    status = item and item.get("status")
+    if status not in ("launching", "available", "disconnected", "in_use"):
+        # Unknown or retired slot
+        logger.warning(f"Rejected pool registration from {slot_id}")
+        return {"statusCode": 403, "body": "Not a pool slot"}
+
+    condition = "#status = :expected"
+    values = {
+        ":conn": connection_id,
+        ":now": int(time.time()),
+        ":available": "available",
+        ":expected": status,
+    }
+    if status == "in_use":
+        session_id = item.get("session_id")
+        if session_id and _session_exists(session_id):
+            logger.warning(f"Rejected pool registration from {slot_id}: session {session_id} is live")
+            return {"statusCode": 403, "body": "Pool slot in use"}
+        if session_id:
+            # Not re-claimed since it was read
+            condition += " AND session_id = :sid"
+            values[":sid"] = session_id
+
+    try:
+        table.update_item(
+            Key={"slot_id": slot_id},
+            UpdateExpression=(
+                "SET connection_id = :conn, #status = :available, "
+                "ready_at = :now, heartbeat_at = :now REMOVE session_id"
+            ),
+            ConditionExpression=condition,
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues=values,
+        )
+        logger.info(f"Slot {slot_id} available on {connection_id}")
+        return {"statusCode": 200, "body": "Pool slot registered"}
+
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            # Claimed or retired since it was read
+            logger.warning(f"Rejected pool registration from {slot_id}: slot changed")
+            return {"statusCode": 409, "body": "Pool slot changed"}
+        logger.error(f"Error registering pool slot {slot_id}: {e}")
+        return {"statusCode": 500, "body": str(e)}
+
+
+def _session_exists(session_id):
+    """Whether *session_id* still has a session item (i.e. has not ended)."""
+    table = dynamodb.Table(SESSIONS_TABLE)
+    return "Item" in table.get_item(Key={"session_id": session_id}, ProjectionExpression="session_id")
+
+
+def release_pool_connection(connection_id):
+    """
+    Handle a pool connection closing.
+
+    Returns:
+        True if *connection_id* belonged to a free slot.
+    """
+    if not POOL_TABLE:
+        return False
+
+    table = dynamodb.Table(POOL_TABLE)
+    response = table.query(
+        IndexName="ConnectionIdIndex",
+        KeyConditionExpression="connection_id = :conn_id",
+        ExpressionAttributeValues={":conn_id": connection_id},
+    )
+    if not response["Items"]:
+        return False
+
+    slot_id = response["Items"][0]["slot_id"]
+    try:
+        # Only a free slot becomes unclaimable; it re-registers on reconnect
+        table.update_item(
+            Key={"slot_id": slot_id},
+            UpdateExpression="SET #status = :disconnected",
+            ConditionExpression="#status = :available AND connection_id = :conn",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":disconnected": "disconnected",
+                ":available": "available",
+                ":conn": connection_id,
+            },
+        )
+        logger.info(f"Slot {slot_id} disconnected")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            logger.error(f"Error releasing pool connection {connection_id}: {e}")
+    return True
+
+
+def handle_pool_heartbeat(body, connection_id):
+    """Record that a free slot is still alive."""
+    slot_id = body.get("slot_id")
+    if not POOL_TABLE or not slot_id:
+        return {"statusCode": 400, "body": "Invalid pool heartbeat"}
+
+    try:
+        dynamodb.Table(POOL_TABLE).update_item(
+            Key={"slot_id": slot_id},
+            UpdateExpression="SET heartbeat_at = :now",
+            ConditionExpression="connection_id = :conn",
+            ExpressionAttributeValues={
+                ":now": int(time.time()),
+                ":conn": connection_id,
+            },
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            logger.error(f"Error recording pool heartbeat for {slot_id}: {e}")
+    return {"statusCode": 200, "body": "Pool heartbeat"}
+
+
+def claim_pool_slot(session_id, claim, apigw_mgmt):
+    """
+    Atomically claim a free slot for *session_id*.
+
+    Args:
+        session_id:  Session that gets the slot.
+        claim:       Session config pushed to the slot (initial HDA,
+                     idle timeouts).
+        apigw_mgmt:  API Gateway management client.
+
+    Returns:
+        The claimed pool item (``slot_id``, ``instance_id``), or ``None``
+        if no slot was free.
+    """
+    if not POOL_TABLE or (WARM_POOL_MAX <= 0 and SESSION_SLOTS <= 1):
+        return None
+
+    table = dynamodb.Table(POOL_TABLE)
+    candidates = _scan_all(table, FilterExpression=Attr("status").eq("available"))
+
+    # Oldest first, so slots don't sit idle forever
+    for item in sorted(candidates, key=lambda i: i.get("ready_at", 0)):
+        slot_id = item["slot_id"]
+        try:
+            table.update_item(
+                Key={"slot_id": slot_id},
+                UpdateExpression=(
+                    "SET #status = :in_use, session_id = :sid, claimed_at = :now"
+                ),
+                ConditionExpression="#status = :available AND connection_id = :conn",
+                ExpressionAttributeNames={"#status": "status"},
+                ExpressionAttributeValues={
+                    ":in_use": "in_use",
+                    ":available": "available",
+                    ":sid": session_id,
+                    ":conn": item["connection_id"],
+                    ":now": int(time.time()),
+                },
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                continue  # claimed by a concurrent start_session
+            raise
+
+        try:
+            send_to_connection(
+                apigw_mgmt,
+                item["connection_id"],
+                {"action": "claim_session", "session_id": session_id, **claim},
+                chunk=False,
+            )
+        except ClientError:
+            # Connection dropped just before the claim; it re-registers itself
+            table.update_item(
+                Key={"slot_id": slot_id},
+                UpdateExpression="SET #status = :disconnected REMOVE session_id",
+                ExpressionAttributeNames={"#status": "status"},
+                ExpressionAttributeValues={":disconnected": "disconnected"},
+            )
+            continue
+
+        if SESSION_SLOTS <= 1:
+            try:
+                ec2.create_tags(
+                    Resources=[item["instance_id"]],
+                    Tags=[
+                        {"Key": "session_id", "Value": session_id},
+                        {"Key": "Name", "Value": f"Houdini Interactive - {session_id[:8]}"},
+                    ],
+                )
+            except ClientError as e:
+                logger.warning(f"Error tagging claimed instance {item['instance_id']}: {e}")
+
+        logger.info(f"Claimed slot {slot_id} for session {session_id}")
+        return item
+
+    logger.info("No free session slot available")
+    return None
+
+
+def trigger_pool_replenish():
+    """Asynchronously run ``pool_handler`` so a claimed slot is refilled."""
+    if not POOL_FUNCTION_NAME:
+        return
+
+    try:
+        lambda_client.invoke(FunctionName=POOL_FUNCTION_NAME, InvocationType="Event")
+    except ClientError as e:
+        logger.error(f"Error triggering warm pool replenish: {e}")
+
+
+def desired_pool_size(now):
+    """
+    Target number of free slots at *now*.
+
+    The larger of the time-of-day schedule (falling back to
+    ``WARM_POOL_SIZE``) and the number of sessions started in the last
+    demand window, capped at ``WARM_POOL_MAX``.
+    """
+    if WARM_POOL_MAX <= 0:
+        return 0
+
+    hour = datetime.fromtimestamp(now, tz=timezone.utc).hour
+    scheduled = WARM_POOL_SIZE
+    for entry in WARM_POOL_SCHEDULE:
+        start, end = entry["start_hour"], entry["end_hour"]
+        in_window = start <= hour < end if start <= end else hour >= start or hour < end
+        if in_window:
+            scheduled = entry["size"]
+            break
+
+    recent_starts = _count_recent_session_starts(now - WARM_POOL_DEMAND_WINDOW_SECONDS)
+    return min(WARM_POOL_MAX, max(scheduled, recent_starts))
+
+
+def pool_handler(event, context):
+    """
+    Keep the number of free slots at the warm pool target.
+
+    Invoked on a schedule and asynchronously after each start_session.
+    Drops slots of instances that are gone, replaces slots that never
+    registered or stopped heartbeating, launches instances for missing
+    slots and retires fully idle instances beyond the target.
+    """
+    if not POOL_TABLE:
+        return {"statusCode": 200, "body": "Warm pool disabled"}
+
+    now = int(time.time())
+    table = dynamodb.Table(POOL_TABLE)
+
+    by_instance = {}
+    for item in _scan_all(table):
+        by_instance.setdefault(item["instance_id"], []).append(item)
+
+    running = _running_instances(list(by_instance))
+    for instance_id in [i for i in by_instance if i not in running]:
+        logger.info(f"Dropping slots of stopped instance {instance_id}")
+        for item in by_instance.pop(instance_id):
+            table.delete_item(Key={"slot_id": item["slot_id"]})
+
+    free = []
+    for instance_id, items in list(by_instance.items()):
+        live = []
+        for item in items:
+            status = item["status"]
+            if status == "in_use":
+                live.append(item)
+                continue
+            if status == "launching":
+                alive = now - int(item.get("launched_at", 0)) < WARM_POOL_LAUNCH_TIMEOUT_SECONDS
+            else:
+                alive = now - int(item.get("heartbeat_at", 0)) < WARM_POOL_HEARTBEAT_TIMEOUT_SECONDS
+
+            if alive:
+                live.append(item)
+                free.append(item)
+            else:
+                logger.warning(f"Dropping unresponsive slot {item['slot_id']}")
+                _delete_slot(table, item)
+
+        by_instance[instance_id] = live
+        if not live:
+            _terminate_instance(instance_id)
+            del by_instance[instance_id]
+
+    target = desired_pool_size(now)
+    logger.info(f"Warm pool: {len(free)} free slots, target {target}")
+
+    if len(free) < target:
+        launch_pool_instances(math.ceil((target - len(free)) / SESSION_SLOTS))
+    else:
+        # Retire whole idle instances, newest first (oldest get claimed first)
+        idle = [
+            items
+            for items in by_instance.values()
+            if all(i["status"] in ("available", "disconnected") for i in items)
+        ]
+        idle.sort(key=lambda items: max(i.get("ready_at", 0) for i in items), reverse=True)
+        surplus = len(free) - target
+        for items in idle:
+            if len(items) > surplus:
+                continue
+            if all(_delete_slot(table, item) for item in items):
+                _terminate_instance(items[0]["instance_id"])
+                surplus -= len(items)
+
+    return {"statusCode": 200, "body": json.dumps({"free": len(free), "target": target})}
+
+
+def launch_pool_instances(count, session_id=None, tags=None):
+    """
+    Launch *count* instances and register their slots.
+
+    Args:
+        count:      Number of instances.
+        session_id: Session placed on slot 0 (on-demand launch); ``None``
+                    launches session-less warm instances.
+        tags:       Instance tags for an on-demand launch.
+
+    Returns:
+        The launched instance ids.
+    """
+    if session_id is None:
+        tags = [
+            {"Key": "mode", "Value": "warm_pool"},
+            {"Key": "Name", "Value": "Houdini Interactive - warm pool"},
+            {"Key": "websocket_url", "Value": os.environ["WEBSOCKET_API_ENDPOINT"]},
+            {"Key": "input_bucket", "Value": INPUT_BUCKET},
+            {"Key": "s3_output_bucket", "Value": OUTPUT_BUCKET},
+        ]
+    tags = tags + [{"Key": "session_slots", "Value": str(SESSION_SLOTS)}]
+    if DIRECT_WS_PORT and DIRECT_WS_TLS_SECRET:
+        tags = tags + [
+            {"Key": "direct_ws_port", "Value": str(DIRECT_WS_PORT)},
+            {"Key": "direct_ws_tls_secret", "Value": DIRECT_WS_TLS_SECRET},
+        ]
+
+    response = ec2.run_instances(
+        LaunchTemplate={
+            "LaunchTemplateName": os.environ["LAUNCH_TEMPLATE_NAME"],
+            "Version": "$Latest",
+        },
+        MinCount=1,
+        MaxCount=count,
+        TagSpecifications=[{"ResourceType": "instance", "Tags": tags}],
+    )
+    instance_ids = [i["InstanceId"] for i in response["Instances"]]
+
+    if POOL_TABLE and (session_id is None or SESSION_SLOTS > 1):
+        table = dynamodb.Table(POOL_TABLE)
+        now = int(time.time())
+        for instance_id in instance_ids:
+            for slot in range(SESSION_SLOTS):
+                item = {
+                    "slot_id": slot_id_for(instance_id, slot),
+                    "instance_id": instance_id,
+                    "status": "launching",
+                    "launched_at": now,
+                }
+                if session_id and slot == 0:
+                    item.update(status="in_use", session_id=session_id, claimed_at=now)
+                table.put_item(Item=item)
+
+    logger.info(f"Launched instances {instance_ids} ({SESSION_SLOTS} slots each)")
+    return instance_ids
+
+
+def _delete_slot(table, item):
+    """Delete a slot unless it changed (e.g. was claimed) since it was read."""
+    try:
+        table.delete_item(
+            Key={"slot_id": item["slot_id"]},
+            ConditionExpression="#status = :expected",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={":expected": item["status"]},
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def _terminate_instance(instance_id):
+    try:
+        ec2.terminate_instances(InstanceIds=[instance_id])
+        logger.info(f"Retired pool instance {instance_id}")
+    except ClientError as e:
+        logger.error(f"Error terminating pool instance {instance_id}: {e}")
+
+
+def _running_instances(instance_ids):
+    """Return the subset of *instance_ids* that are pending or running."""
+    running = set()
+    for start in range(0, len(instance_ids), 100):
+        # Filter rather than InstanceIds, which fails on long-gone instances
+        response = ec2.describe_instances(
+            Filters=[
+                {"Name": "instance-id", "Values": instance_ids[start : start + 100]},
+                {"Name": "instance-state-name", "Values": ["pending", "running"]},
+            ],
+        )
+        for reservation in response["Reservations"]:
+            running.update(i["InstanceId"] for i in reservation["Instances"])
+    return running
+
+
+def _start_bucket(timestamp):
+    """Hour (UTC) a session start falls in; partition key of ``StartedAtIndex``."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def _count_recent_session_starts(since):
+    """Count sessions whose instance was started at or after *since*.
+
+    Queries ``StartedAtIndex`` one hour bucket at a time, so only the
+    starts in the window are read rather than the whole table.
+    """
+    table = dynamodb.Table(SESSIONS_TABLE)
+    count = 0
+    hour = int(since) - int(since) % 3600
+    while hour <= time.time():
+        kwargs = {
+            "IndexName": "StartedAtIndex",
+            "KeyConditionExpression": (
+                Key("start_bucket").eq(_start_bucket(hour)) & Key("started_at").gte(int(since))
+            ),
+            "Select": "COUNT",
+        }
+        while True:
+            response = table.query(**kwargs)
+            count += response["Count"]
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        hour += 3600
+    return count
+
+
+def _scan_all(table, **kwargs):
+    """Scan every page of *table*."""
+    items = []
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+# ======================================================================
+#  Direct channel
+# ======================================================================
+#
+# Once its Houdini runner is ready, a bridge with a direct channel sends
+# ``direct_channel_available``. The Lambda generates a per-session key,
+# sends it to the bridge (over the bridge's API Gateway connection) and
+# gives the browser the channel URL plus a short-lived token signed with
+# it. API Gateway stays connected for control messages and as fallback.
+
+
+def sign_direct_token(key, session_id, expires_at):
+    """Sign a direct channel token. Must match runtime/session/direct_channel.py."""
+    claims = f"{session_id}.{int(expires_at)}"
+    signature = hmac.new(key.encode(), claims.encode(), hashlib.sha256).hexdigest()
+    return f"{claims}.{signature}"
+
+
+def handle_direct_channel_available(session, body, apigw_mgmt):
+    """Key the bridge's direct channel and offer it to the browser."""
+    session_id = session["session_id"]
+    key = secrets.token_hex(32)
+
+    dynamodb.Table(SESSIONS_TABLE).update_item(
+        Key={"session_id": session_id},
+        UpdateExpression="SET direct_url = :url, direct_key = :key",
+        ExpressionAttributeValues={":url": body["url"], ":key": key},
+    )
+    send_to_connection(
+        apigw_mgmt,
+        session["ec2_connection_id"],
+        {"action": "direct_channel_key", "key": key},
+        chunk=False,
+    )
+
+    logger.info(f"Direct channel available for session {session_id}: {body['url']}")
+    return send_direct_channel(
+        {**session, "direct_url": body["url"], "direct_key": key}, apigw_mgmt
+    )
+
+
+def send_direct_channel(session, apigw_mgmt):
+    """Send the browser the direct channel URL and a fresh token."""
+    browser_conn = session.get("browser_connection_id")
+    if not browser_conn:
+        return {"statusCode": 200, "body": "Browser not connected"}
+
+    if not session.get("direct_key"):
+        send_to_connection(apigw_mgmt, browser_conn, {"action": "direct_channel_unavailable"})
+        return {"statusCode": 200, "body": "Direct channel unavailable"}
+
+    expires_at = int(time.time()) + DIRECT_TOKEN_TTL_SECONDS
+    send_to_connection(
+        apigw_mgmt,
+        browser_conn,
+        {
+            "action": "direct_channel",
+            "url": session["direct_url"],
+            "token": sign_direct_token(session["direct_key"], session["session_id"], expires_at),
+            "expires_at": expires_at,
+        },
+    )
+    return {"statusCode": 200, "body": "Direct channel sent"}
+
+
 def handle_terminate_session(session, apigw_mgmt, connection_id):
     """Terminate the EC2 instance and clean up session."""
     session_id = session["session_id"]
@@ -468,12 +1370,12 @@ def handle_terminate_session(session, apigw_mgmt, connection_id):
     # Notify EC2 to shut down gracefully
     if ec2_conn:
         try:
-            send_to_connection(apigw_mgmt, ec2_conn, {"action": "terminate"})
+            send_to_connection(apigw_mgmt, ec2_conn, {"action": "terminate"}, chunk=False)
         except:
             pass
 
-    # Terminate instance
-    if instance_id:
+    # Terminate instance (a shared instance recycles the slot)
+    if instance_id and not session.get("shared_instance"):
         try:
             ec2.terminate_instances(InstanceIds=[instance_id])
             logger.info(f"Terminated instance {instance_id}")
@@ -493,12 +1395,42 @@ def handle_terminate_session(session, apigw_mgmt, connection_id):
     return {"statusCode": 200, "body": "Session terminated"}
 
 
-def send_to_connection(apigw_mgmt, connection_id, data):
-    """Send data to WebSocket connection."""
+def chunk_payload(payload):
+    """Split an encoded message into "chunk" messages if it is too large."""
+    data = payload.encode("utf-8")
+    if len(data) <= MAX_PAYLOAD_BYTES:
+        return [data]
+
+    message_id = uuid.uuid4().hex
+    offsets = range(0, len(data), CHUNK_BYTES)
+    return [
+        json.dumps(
+            {
+                "action": "chunk",
+                "message_id": message_id,
+                "seq": seq,
+                "total": len(offsets),
+                "offset": offset,
+                "size": len(data),
+                "binary": False,
+                "data": base64.b64encode(data[offset : offset + CHUNK_BYTES]).decode("ascii"),
+            }
+        ).encode("utf-8")
+        for seq, offset in enumerate(offsets)
+    ]
+
+
+def send_to_connection(apigw_mgmt, connection_id, data, chunk=True):
+    """Send data (a dict, or an already-encoded JSON string) to WebSocket connection.
+
+    Large messages are split into "chunk" messages unless *chunk* is False
+    (the bridge and runner do not reassemble chunks).
+    """
+    payload = data if isinstance(data, str) else json.dumps(data)
+    parts = chunk_payload(payload) if chunk else [payload.encode("utf-8")]
     try:
-        apigw_mgmt.post_to_connection(
-            ConnectionId=connection_id, Data=json.dumps(data).encode("utf-8")
-        )
+        for part in parts:
+            apigw_mgmt.post_to_connection(ConnectionId=connection_id, Data=part)
     except ClientError as e:
         if e.response["Error"]["Code"] == "GoneException":
             logger.warning(f"Connection {connection_id} is gone")
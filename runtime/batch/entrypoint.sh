@@ -98,3 +98,21 @@ echo "--------------------"
 S3_OUTPUT_FILE="s3://$S3_OUTPUT_BUCKET/$JOB_ID/JobResult.zip"
 chmod +x "$AURORA_TOOLING_ROOT"/runtime/shared/s3/upload_file.sh
 "$AURORA_TOOLING_ROOT"/runtime/shared/s3/upload_file.sh "$S3_OUTPUT_FILE"
+
+
+# Publish HDA schema/preview index (written by "hda_index" directives) so
+# session Lambdas and runners can serve it before a session instance boots.
+# Each directive lists its output_dir (relative to SHARED) in hda_index_dirs.txt.
+HDA_INDEX_LIST="$AURORA_TOOLING_ROOT/SHARED/OUT/hda_index_dirs.txt"
+if [ -f "$HDA_INDEX_LIST" ]; then
+    echo "--------------------"
+    echo "Publishing HDA index to S3."
+    echo "--------------------"
+    sort -u "$HDA_INDEX_LIST" | while IFS= read -r HDA_INDEX_SUBDIR; do
+        HDA_INDEX_DIR="$AURORA_TOOLING_ROOT/SHARED/$HDA_INDEX_SUBDIR"
+        if [ -d "$HDA_INDEX_DIR" ]; then
+            echo "Publishing $HDA_INDEX_DIR"
+            aws s3 cp "$HDA_INDEX_DIR" "s3://$S3_OUTPUT_BUCKET/hda_schemas/" --recursive --exclude "manifest.json" --region "$AWS_REGION" --only-show-errors
+        fi
+    done
+fi
@@ -0,0 +1,172 @@
+"""
+Offline HDA schema indexing for the ``hda_index`` work directive type.
+
+For every HDA in a library this loads the session template, instantiates
+the HDA exactly as a session would, extracts its parameter schema and
+exports a default-state preview GLB. Results are written to a local
+directory that mirrors the ``hda_schemas/`` S3 layout used by the session
+schema cache (see ``runtime/session/schema_cache.py``), so the batch
+entrypoint can publish it with a single recursive copy. Each output
+directory is also listed in ``PUBLISH_LIST`` (one per line, relative to
+``$DATA_ROOT``, the directory shared with the host), which the entrypoint
+reads to find every directory to publish; ``output_dir`` must therefore be
+inside ``$DATA_ROOT``.
+
+Sample directive entry:
+    {
+      "enabled": true,
+      "type": "hda_index",
+      "hda_library": "$DATA_ROOT/IN/hdas",
+      "output_dir": "$DATA_ROOT/OUT/hda_index",
+      "export_preview": true
+    }
+"""
+
+import hashlib
+import json
+import os
+import sys
+import typing
+
+import hou
+
+_SESSION_RUNTIME = os.path.join(os.path.dirname(os.path.dirname(__file__)), "session")
+if _SESSION_RUNTIME not in sys.path:
+    sys.path.insert(0, _SESSION_RUNTIME)
+
+from hda_utils import export_gltf  # noqa: E402
+from hda_utils import extract_hda_parameters  # noqa: E402
+from hda_utils import hda_definition_key  # noqa: E402
+from hda_utils import install_and_instantiate_hda  # noqa: E402
+from schema_cache import SCHEMA_PREFIX  # noqa: E402
+from schema_cache import content_index_s3_key  # noqa: E402
+from schema_cache import preview_s3_key  # noqa: E402
+from schema_cache import schema_s3_key  # noqa: E402
+from schema_cache import to_relative_schema  # noqa: E402
+
+DEFAULT_OUTPUT_DIR = "$DATA_ROOT/OUT/hda_index"
+# Index directories written by this job, published by entrypoint.sh
+PUBLISH_LIST = "$DATA_ROOT/OUT/hda_index_dirs.txt"
+DEFAULT_SESSION_HIP = "$AURORA_TOOLING_ROOT/runtime/session/session_runner.hip"
+
+
+def _file_md5(path: str) -> str:
+    """MD5 of a file — matches the S3 ETag of a single-part upload."""
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _local_path(output_dir: str, s3_key: str) -> str:
+    """Map an ``hda_schemas/...`` S3 key onto *output_dir*."""
+    relative_key = os.path.relpath(s3_key, SCHEMA_PREFIX)
+    path = os.path.join(output_dir, relative_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def _write_json(path: str, data: typing.Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _list_hda_files(hda_library: typing.Union[str, typing.List[str]]) -> typing.List[str]:
+    """Resolve ``hda_library`` (a directory or a list of files) to HDA paths."""
+    if isinstance(hda_library, list):
+        return [hou.text.expandString(p) for p in hda_library]
+
+    library_dir = hou.text.expandString(hda_library)
+    if not os.path.isdir(library_dir):
+        raise ValueError(f"The specified HDA library '{library_dir}' does not exist!")
+
+    return sorted(
+        os.path.join(library_dir, name)
+        for name in os.listdir(library_dir)
+        if name.endswith((".hda", ".otl", ".hdanc", ".hdalc"))
+    )
+
+
+def index_hda(hda_path: str, output_dir: str, export_preview: bool) -> typing.Dict[str, typing.Any]:
+    """
+    Index a single HDA file into *output_dir*.
+
+    Returns:
+        The index entry that was written for the file.
+    """
+    hda_node = install_and_instantiate_hda(hda_path)
+    definition_key = hda_definition_key(hda_node)
+    schema = extract_hda_parameters(hda_node)
+
+    _write_json(
+        _local_path(output_dir, schema_s3_key(definition_key)),
+        to_relative_schema(schema),
+    )
+
+    entry = {
+        "filename": os.path.basename(hda_path),
+        "definition_key": definition_key,
+        "tool_name": schema.get("tool_name"),
+        "tool_version": schema.get("tool_version"),
+        "parameter_count": len(schema["parameters"]),
+        "preview": False,
+    }
+
+    if export_preview:
+        preview_path = _local_path(output_dir, preview_s3_key(definition_key))
+        exported = export_gltf(output_dir=os.path.dirname(preview_path))
+        if exported and os.path.isfile(exported):
+            os.replace(exported, preview_path)
+            geo = hda_node.geometry()
+            entry["preview"] = True
+            entry["point_count"] = geo.intrinsicValue("pointcount") if geo else 0
+            entry["primitive_count"] = geo.intrinsicValue("primitivecount") if geo else 0
+
+    _write_json(_local_path(output_dir, content_index_s3_key(_file_md5(hda_path))), entry)
+    return entry
+
+
+def index_hda_library(directive: typing.Dict[str, typing.Any]) -> None:
+    """
+    Process an ``hda_index`` directive.
+
+    Every HDA is indexed independently; failures are recorded in the
+    ``manifest.json`` written to the output directory and only abort the
+    directive if no HDA could be indexed at all.
+    """
+    output_dir = hou.text.expandString(directive.get("output_dir", DEFAULT_OUTPUT_DIR))
+    # Only $DATA_ROOT is shared with the host that publishes the index
+    published_dir = os.path.relpath(output_dir, hou.text.expandString("$DATA_ROOT"))
+    if published_dir.startswith(os.pardir):
+        raise ValueError(f"output_dir must be inside $DATA_ROOT to be published: {output_dir}")
+    session_hip = hou.text.expandString(directive.get("session_hip", DEFAULT_SESSION_HIP))
+    export_preview = directive.get("export_preview", True)
+    os.makedirs(output_dir, exist_ok=True)
+
+    hda_files = _list_hda_files(directive["hda_library"])
+    if not hda_files:
+        raise ValueError("The specified HDA library does not contain any HDA files!")
+
+    hou.hipFile.load(session_hip)
+
+    manifest = {"indexed": [], "failed": []}
+    for hda_path in hda_files:
+        print(f"Indexing HDA {hda_path}")
+        try:
+            entry = index_hda(hda_path, output_dir, export_preview)
+            manifest["indexed"].append(entry)
+            print(
+                f"Indexed '{entry['tool_name']}' ({entry['parameter_count']} parameters, "
+                f"preview: {entry['preview']})"
+            )
+        except Exception as e:
+            print(f"Failed to index {hda_path}: {e}")
+            manifest["failed"].append({"filename": os.path.basename(hda_path), "error": str(e)})
+
+    _write_json(os.path.join(output_dir, "manifest.json"), manifest)
+    with open(hou.text.expandString(PUBLISH_LIST), "a", encoding="utf-8") as f:
+        f.write(published_dir + "\n")
+
+    if not manifest["indexed"]:
+        raise RuntimeError("None of the HDAs in the library could be indexed")
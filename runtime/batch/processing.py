@@ -6,6 +6,8 @@ import argparse
 
 import hou
 
+from hda_indexer import index_hda_library
+
 
 @dataclasses.dataclass
 class HoudiniNodeError:
@@ -44,6 +46,9 @@ def save_geometry_from_houdini(config_json_path: str) -> None:
         for directive in config:
             if not directive["enabled"]:
                 continue
+            if directive.get("type", "hip") == "hda_index":
+                index_hda_library(directive)
+                continue
             # Load the Houdini file
             hou.hipFile.load(hou.text.expandString(directive["hip_file"]))
 
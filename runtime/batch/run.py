@@ -13,6 +13,7 @@ if AURORA_TOOLING_ROOT not in sys.path:
 
 
 from runtime.batch import docker_utils
+from runtime.shared.logging_config import setup_logging
 from infra.utils.aws_utils import get_aws_secrets
 from infra.utils.aws_utils import get_aws_region
 from infra.utils.constants import SIDEFX_SECRETS_NAME
@@ -85,6 +86,7 @@ if __name__ == "__main__":
         help="The houdini_directive.json Houdini work directive to process.",
     )
     args = argparser.parse_args()
+    setup_logging()
 
     timings = {}
 
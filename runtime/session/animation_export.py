@@ -0,0 +1,382 @@
+"""
+Progressive export of time-dependent HDAs.
+
+An ``export_animation`` command plans the frames of a range (with a
+stride) as an :class:`AnimationExport`. The runner exports them in order,
+one per idle step of its message loop, so commands arriving meanwhile are
+handled between frames. Each frame is sent to the browser as soon as it
+is exported; a frame whose geometry is byte-identical to the previous
+one is sent as a reference to it instead.
+
+The browser starts playback once :func:`preroll_frames` frames have
+arrived: enough that, at the current export rate, playback does not
+catch up with the export.
+
+Optionally the frames are packed into one animated GLB
+(:func:`pack_animated_glb`): each distinct frame becomes a node of the
+scene, and a step animation of the node scales shows one at a time.
+
+This module has no ``hou`` dependency.
+"""
+
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Frames one export_animation may cover
+MAX_ANIMATION_FRAMES = 1000
+
+# Frames buffered before playback starts, at least
+MIN_PREROLL_FRAMES = 3
+
+_GLB_MAGIC = 0x46546C67  # "glTF"
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+_FLOAT = 5126  # glTF componentType
+
+# Top-level arrays merged from the frame files, by what refers to them
+_MERGED = ("nodes", "meshes", "materials", "textures", "images", "samplers", "accessors", "bufferViews")
+
+
+def plan_frames(start: float, end: float, stride: float = 1) -> List[float]:
+    """
+    Return the frames from *start* to *end* (inclusive), every *stride*.
+
+    Raises:
+        ValueError: For an empty or reversed range, a non-positive stride,
+                    or more than ``MAX_ANIMATION_FRAMES`` frames.
+    """
+    if stride <= 0:
+        raise ValueError("stride must be positive")
+    if end < start:
+        raise ValueError(f"frame_end {end:g} is before frame_start {start:g}")
+    count = int(math.floor((end - start) / stride + 1e-9)) + 1
+    if count > MAX_ANIMATION_FRAMES:
+        raise ValueError(f"{count} frames requested, at most {MAX_ANIMATION_FRAMES}")
+    return [start + i * stride for i in range(count)]
+
+
+def preroll_frames(count: int, frame_seconds: float, playback_seconds: float) -> int:
+    """
+    Frames to buffer before playing so playback never waits for the export.
+
+    Args:
+        count:            Frames in the animation.
+        frame_seconds:    Average time to export one frame (0 if unknown).
+        playback_seconds: Time each frame is shown during playback.
+    """
+    if count <= MIN_PREROLL_FRAMES:
+        return count
+    if frame_seconds <= playback_seconds:
+        return MIN_PREROLL_FRAMES
+    # Playback starts once k frames are exported, at k * frame_seconds; frame
+    # i is then shown at k * frame_seconds + i * playback_seconds and is
+    # exported at (i + 1) * frame_seconds. The last frame binds:
+    # count * frame_seconds <= k * frame_seconds + (count - 1) * playback_seconds
+    needed = (count * frame_seconds - (count - 1) * playback_seconds) / frame_seconds
+    return min(count, max(MIN_PREROLL_FRAMES, math.ceil(needed)))
+
+
+class AnimationExport:
+    """Frames of one ``export_animation`` still to export, and those done."""
+
+    def __init__(
+        self,
+        animation_id: str,
+        instance: Optional[str],
+        frames: Sequence[float],
+        fps: float,
+        stride: float,
+        pack: bool = False,
+    ):
+        self.animation_id = animation_id
+        self.instance = instance
+        self.frames = list(frames)
+        self.fps = fps
+        self.stride = stride
+        self.pack = pack
+        self.cancelled = False
+        self.work_dir = tempfile.mkdtemp(prefix="houdini_animation_") if pack else None
+        self._next = 0
+        self._digests: List[str] = []
+        # Self-contained GLB of each exported frame; None once one is not
+        self._files: Optional[List[str]] = [] if pack else None
+
+    @property
+    def exported(self) -> int:
+        """Frames exported so far."""
+        return len(self._digests)
+
+    @property
+    def packable(self) -> bool:
+        """Whether every exported frame can go into the packed GLB."""
+        return self._files is not None and len(self._files) == self.exported > 0
+
+    @property
+    def files(self) -> List[str]:
+        """GLB of each exported frame, in order (repeated frames share one)."""
+        return list(self._files or ())
+
+    @property
+    def frame_seconds(self) -> float:
+        """Time each exported frame is shown during playback."""
+        return self.stride / self.fps
+
+    def next_frame(self) -> Optional[Tuple[int, float]]:
+        """Take the next ``(index, frame)`` to export, or None when done or cancelled."""
+        if self.cancelled or self._next >= len(self.frames):
+            return None
+        index = self._next
+        self._next += 1
+        return index, self.frames[index]
+
+    def add_frame(self, digest: str, glb_path: Optional[str] = None) -> bool:
+        """
+        Record the next exported frame.
+
+        Args:
+            digest:   Digest of the frame's export files.
+            glb_path: The frame's self-contained GLB, copied for packing;
+                      None if the export is not one (packing is then off).
+
+        Returns:
+            Whether the frame repeats the previous one.
+        """
+        repeated = bool(self._digests) and self._digests[-1] == digest
+        self._digests.append(digest)
+        if self._files is not None:
+            if repeated:
+                self._files.append(self._files[-1])
+            elif glb_path:
+                copy = os.path.join(self.work_dir, f"frame_{len(self._digests) - 1:04d}.glb")
+                shutil.copyfile(glb_path, copy)
+                self._files.append(copy)
+            else:
+                self._files = None
+        return repeated
+
+    def cancel(self) -> None:
+        """Stop exporting; frames already sent stay valid."""
+        self.cancelled = True
+
+    def close(self) -> None:
+        """Remove the frame copies kept for packing."""
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def read_glb(path: str) -> Tuple[Dict[str, Any], bytes]:
+    """Return the JSON document and binary chunk of a GLB file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    if magic != _GLB_MAGIC or version != 2:
+        raise ValueError(f"{path} is not a glTF 2.0 binary")
+
+    document, binary = None, b""
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8 : offset + 8 + chunk_length]
+        if chunk_type == _CHUNK_JSON:
+            document = json.loads(chunk)
+        elif chunk_type == _CHUNK_BIN:
+            binary = chunk
+        offset += 8 + chunk_length
+    if document is None:
+        raise ValueError(f"{path} has no JSON chunk")
+    return document, binary
+
+
+def write_glb(path: str, document: Dict[str, Any], binary: bytes) -> None:
+    """Write a GLB file from a JSON document and its binary buffer."""
+    json_chunk = json.dumps(document, separators=(",", ":")).encode()
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary = bytes(binary) + b"\0" * (-len(binary) % 4)
+    length = 12 + 8 + len(json_chunk) + (8 + len(binary) if binary else 0)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", _GLB_MAGIC, 2, length))
+        f.write(struct.pack("<II", len(json_chunk), _CHUNK_JSON))
+        f.write(json_chunk)
+        if binary:
+            f.write(struct.pack("<II", len(binary), _CHUNK_BIN))
+            f.write(binary)
+
+
+def _shift_textures(value: Any, offset: int) -> None:
+    """Offset the texture indices of material texture infos (``*Texture``)."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key.endswith("Texture") and isinstance(item, dict) and "index" in item:
+                item["index"] += offset
+            _shift_textures(item, offset)
+    elif isinstance(value, list):
+        for item in value:
+            _shift_textures(item, offset)
+
+
+def _merge_frame(merged: Dict[str, Any], binary: bytearray, document: Dict[str, Any], data: bytes) -> List[int]:
+    """Append one frame's document and buffer to *merged*; return its root nodes."""
+    if len(document.get("buffers", ())) > 1:
+        raise ValueError("Frames with several buffers cannot be packed")
+    base = {key: len(merged[key]) for key in _MERGED}
+    byte_offset = len(binary)
+    binary += data
+    binary += b"\0" * (-len(binary) % 4)
+
+    for view in document.get("bufferViews", ()):
+        merged["bufferViews"].append(
+            {**view, "buffer": 0, "byteOffset": view.get("byteOffset", 0) + byte_offset}
+        )
+    for accessor in document.get("accessors", ()):
+        accessor = json.loads(json.dumps(accessor))
+        if "bufferView" in accessor:
+            accessor["bufferView"] += base["bufferViews"]
+        for part in ("indices", "values"):
+            if part in accessor.get("sparse", {}):
+                accessor["sparse"][part]["bufferView"] += base["bufferViews"]
+        merged["accessors"].append(accessor)
+    for image in document.get("images", ()):
+        if "bufferView" in image:
+            image = {**image, "bufferView": image["bufferView"] + base["bufferViews"]}
+        merged["images"].append(image)
+    merged["samplers"].extend(document.get("samplers", ()))
+    for texture in document.get("textures", ()):
+        texture = dict(texture)
+        if "source" in texture:
+            texture["source"] += base["images"]
+        if "sampler" in texture:
+            texture["sampler"] += base["samplers"]
+        merged["textures"].append(texture)
+    for material in document.get("materials", ()):
+        material = json.loads(json.dumps(material))
+        _shift_textures(material, base["textures"])
+        merged["materials"].append(material)
+    for mesh in document.get("meshes", ()):
+        mesh = json.loads(json.dumps(mesh))
+        for primitive in mesh.get("primitives", ()):
+            for attributes in [primitive.get("attributes", {})] + primitive.get("targets", []):
+                for name in attributes:
+                    attributes[name] += base["accessors"]
+            if "indices" in primitive:
+                primitive["indices"] += base["accessors"]
+            if "material" in primitive:
+                primitive["material"] += base["materials"]
+            draco = primitive.get("extensions", {}).get("KHR_draco_mesh_compression")
+            if draco:
+                # Its attribute ids index the Draco stream, not the document
+                draco["bufferView"] += base["bufferViews"]
+        merged["meshes"].append(mesh)
+    for node in document.get("nodes", ()):
+        # Skins and cameras of the frames are not carried over
+        node = {k: v for k, v in node.items() if k not in ("skin", "camera")}
+        if "mesh" in node:
+            node["mesh"] += base["meshes"]
+        if "children" in node:
+            node["children"] = [child + base["nodes"] for child in node["children"]]
+        merged["nodes"].append(node)
+
+    for key in ("extensionsUsed", "extensionsRequired"):
+        for extension in document.get(key, ()):
+            if extension not in merged.setdefault(key, []):
+                merged[key].append(extension)
+
+    scenes = document.get("scenes") or [{"nodes": list(range(len(document.get("nodes", ()))))}]
+    roots = scenes[document.get("scene", 0)].get("nodes", [])
+    return [root + base["nodes"] for root in roots]
+
+
+def pack_animated_glb(
+    files: Sequence[str],
+    frame_seconds: float,
+    output_path: str,
+    names: Optional[Sequence[str]] = None,
+) -> None:
+    """
+    Pack per-frame GLBs into one GLB that flips through them.
+
+    Each distinct file is merged once, under a node named after its first
+    frame; a step animation on the node scales shows one at a time.
+
+    Args:
+        files:         GLB of each frame, in order (repeats share a path).
+        frame_seconds: Time each frame is shown.
+        output_path:   Where to write the packed GLB.
+        names:         Node name of each frame (defaults to ``frame_<i>``).
+    """
+    merged: Dict[str, Any] = {
+        "asset": {"version": "2.0", "generator": "HoudiniOnAWS animation export"},
+        "scene": 0,
+        "scenes": [{"nodes": []}],
+        **{key: [] for key in _MERGED},
+    }
+    binary = bytearray()
+
+    frame_nodes: Dict[str, int] = {}
+    for index, path in enumerate(files):
+        if path in frame_nodes:
+            continue
+        document, data = read_glb(path)
+        roots = _merge_frame(merged, binary, document, data)
+        frame_nodes[path] = len(merged["nodes"])
+        merged["nodes"].append(
+            {
+                "name": names[index] if names else f"frame_{index}",
+                "children": roots,
+                "scale": [1.0, 1.0, 1.0] if index == 0 else [0.0, 0.0, 0.0],
+            }
+        )
+        merged["scenes"][0]["nodes"].append(frame_nodes[path])
+
+    # Key times: one per frame, plus the end of the last one so it is
+    # shown for a full frame before the animation loops
+    times = [i * frame_seconds for i in range(len(files) + 1)]
+    shown = list(files) + [files[-1]]
+    animation_data = struct.pack(f"<{len(times)}f", *times)
+    outputs = {}
+    for path in frame_nodes:
+        outputs[path] = len(animation_data)
+        for frame_path in shown:
+            value = 1.0 if frame_path == path else 0.0
+            animation_data += struct.pack("<3f", value, value, value)
+
+    view = len(merged["bufferViews"])
+    merged["bufferViews"].append(
+        {"buffer": 0, "byteOffset": len(binary), "byteLength": len(animation_data)}
+    )
+    binary += animation_data
+
+    input_accessor = len(merged["accessors"])
+    merged["accessors"].append(
+        {
+            "bufferView": view,
+            "componentType": _FLOAT,
+            "count": len(times),
+            "type": "SCALAR",
+            "min": [times[0]],
+            "max": [times[-1]],
+        }
+    )
+    samplers, channels = [], []
+    for path, node in frame_nodes.items():
+        merged["accessors"].append(
+            {
+                "bufferView": view,
+                "byteOffset": outputs[path],
+                "componentType": _FLOAT,
+                "count": len(times),
+                "type": "VEC3",
+            }
+        )
+        channels.append({"sampler": len(samplers), "target": {"node": node, "path": "scale"}})
+        samplers.append(
+            {"input": input_accessor, "output": len(merged["accessors"]) - 1, "interpolation": "STEP"}
+        )
+    merged["animations"] = [{"name": "frames", "samplers": samplers, "channels": channels}]
+    merged["buffers"] = [{"byteLength": len(binary) + (-len(binary) % 4)}]
+
+    write_glb(output_path, {k: v for k, v in merged.items() if v != []}, binary)
@@ -0,0 +1,707 @@
+"""
+Aurora Session bootstrapper - brings up a session instance.
+
+Replaces the serial init steps that used to live in ``entrypoint.sh``.
+Independent steps run concurrently:
+
+- hython is launched first so its cold boot overlaps everything else.
+- Instance metadata, ``hserver -q`` and workspace preparation start
+  immediately.
+- Instance tags and the SideFX credentials are fetched in parallel once
+  the instance id / region are known.
+- The WebSocket bridge is started as soon as the session id and
+  WebSocket URL are known, so the API Gateway handshake overlaps
+  licensing.
+- Licensing (``hserver`` + ``sesictrl login``) runs as soon as the
+  credentials are in. Once licensing and the workspace are done hython
+  gets a warm signal (and loads the session HIP), then the ready signal
+  with the session config.
+
+An instance hosts ``session_slots`` (tag, default 1) sessions. Each
+:class:`SessionSlot` runs its own hython runner and WebSocket bridge on
+its own local port, pinned to its share of the CPUs and capped to its
+share of memory, so one session cannot starve or crash another.
+
+Slot 0 of an instance launched for a session serves that session. Every
+other slot, and every slot of a warm pool instance (tagged
+``mode=warm_pool``, no ``session_id``), does the same work up to the HIP
+load, then registers with the WebSocket API and waits to be claimed by
+``start_session``; the claim message carries the session id and initial
+HDA that are otherwise read from the tags.
+
+Every step is recorded in a startup timeline that is logged once a slot
+gets its session. A single-slot instance exits when either session
+process does; on a multi-slot instance the slot restarts hython and
+registers again instead.
+
+Runs with hython's bundled Python (no ``hou`` imports).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.request
+
+import boto3
+import websockets
+
+from signal_files import wait_for_file, write_signal_file
+from startup_timeline import StartupTimeline
+
+# The shared runtime package lives at the repository root
+_TOOLING_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _TOOLING_ROOT not in sys.path:
+    sys.path.insert(0, _TOOLING_ROOT)
+
+from runtime.shared.logging_config import setup_logging  # noqa: E402
+
+# Setup logging (non-blocking, structured)
+logger = setup_logging(__name__)
+
+SESSION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HYTHON_BIN = "/opt/houdini/bin/hython"
+HSERVER_BIN = "/opt/houdini/bin/hserver"
+SESICTRL_BIN = "/opt/houdini/houdini/sbin/sesictrl"
+LICENSE_HOST = "https://www.sidefx.com/license/sesinetd"
+SIDEFX_SECRET_ID = "SideFXOAuthCredentials"
+
+METADATA_URL = "http://169.254.169.254/latest/meta-data"
+METADATA_TIMEOUT = 5  # seconds
+
+# Signal files of slot 0; slot N appends ".N"
+HYTHON_WARM_SIGNAL = os.getenv("HYTHON_WARM_SIGNAL", "/tmp/houdini_warm")
+HYTHON_LOADED_SIGNAL = os.getenv("HYTHON_LOADED_SIGNAL", "/tmp/houdini_session_loaded")
+HYTHON_READY_SIGNAL = os.getenv("HYTHON_READY_SIGNAL", "/tmp/houdini_boot_ready")
+HYTHON_PREFETCH_SIGNAL = os.getenv("HYTHON_PREFETCH_SIGNAL", "/tmp/houdini_hda_prefetch")
+BRIDGE_READY_SIGNAL = os.getenv("BRIDGE_READY_SIGNAL", "/tmp/aurora_bridge_listening")
+
+LOCAL_WS_PORT = 7007  # slot N listens on LOCAL_WS_PORT + N
+METRICS_PORT = 9464  # slot N's bridge serves metrics on METRICS_PORT + N
+
+# TLS certificate + key of the direct browser channel
+DIRECT_WS_TLS_DIR = "/tmp/aurora_direct_ws"
+
+WARM_POOL_MODE = "warm_pool"
+POOL_HEARTBEAT_INTERVAL = 300  # seconds, below the API Gateway idle timeout
+POOL_MAX_CONNECT_FAILURES = 10
+POOL_RETRY_DELAY = 2  # seconds
+
+# Tag defaults, applied when a tag is missing
+DEFAULT_IDLE_TIMEOUT_SECONDS = "900"  # 15 minutes
+DEFAULT_IDLE_WARNING_SECONDS = "120"  # 2 minutes
+DEFAULT_S3_OUTPUT_BUCKET = "aurora-output-bucket"
+
+
+async def run_command(*args: str, check: bool = True) -> int:
+    """
+    Run a command to completion.
+
+    Args:
+        args:  Command and arguments.
+        check: Raise on a non-zero exit code instead of logging a warning.
+
+    Returns:
+        The exit code.
+    """
+    process = await asyncio.create_subprocess_exec(*args)
+    return_code = await process.wait()
+    if return_code != 0:
+        message = f"{os.path.basename(args[0])} exited with code {return_code}"
+        if check:
+            raise RuntimeError(message)
+        logger.warning(message)
+    return return_code
+
+
+def total_memory_mb() -> int:
+    """Physical memory of the instance in MB (0 if unknown)."""
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) // 1024
+    return 0
+
+
+class SessionSlot:
+    """One hython runner + WebSocket bridge pair on its own local port."""
+
+    def __init__(self, index: int, data_root: str):
+        self.index = index
+        self.port = LOCAL_WS_PORT + index
+        self.data_root = data_root
+        self.cpus = ""  # taskset CPU list, e.g. "0-3"; empty = unpinned
+        self.memory_mb = 0  # 0 = uncapped
+
+        self.hython: asyncio.subprocess.Process = None
+        self.bridge: asyncio.subprocess.Process = None
+
+        suffix = f".{index}" if index else ""
+        self.warm_signal = HYTHON_WARM_SIGNAL + suffix
+        self.loaded_signal = HYTHON_LOADED_SIGNAL + suffix
+        self.ready_signal = HYTHON_READY_SIGNAL + suffix
+        self.prefetch_signal = HYTHON_PREFETCH_SIGNAL + suffix
+        self.bridge_signal = BRIDGE_READY_SIGNAL + suffix
+
+    def clear_signals(self) -> None:
+        for path in (
+            self.warm_signal,
+            self.loaded_signal,
+            self.ready_signal,
+            self.prefetch_signal,
+            self.bridge_signal,
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def launch_hython(self, cwd: str) -> None:
+        """Start the Houdini runner so its ~90s cold boot overlaps init."""
+        self.hython = await asyncio.create_subprocess_exec(
+            HYTHON_BIN,
+            os.path.join(SESSION_DIR, "houdini_runner.py"),
+            cwd=cwd,
+            env={
+                **os.environ,
+                "HYTHON_WARM_SIGNAL": self.warm_signal,
+                "HYTHON_LOADED_SIGNAL": self.loaded_signal,
+                "HYTHON_READY_SIGNAL": self.ready_signal,
+                "HYTHON_PREFETCH_SIGNAL": self.prefetch_signal,
+                "BRIDGE_READY_SIGNAL": self.bridge_signal,
+            },
+        )
+        logger.info(f"[slot {self.index}] hython launched (PID: {self.hython.pid})")
+
+    async def apply_limits(self) -> None:
+        """Pin hython (all threads) to the slot's CPUs and cap its memory."""
+        if self.cpus:
+            await run_command(
+                "taskset", "-a", "-cp", self.cpus, str(self.hython.pid), check=False
+            )
+        if self.memory_mb:
+            await run_command(
+                "prlimit",
+                f"--pid={self.hython.pid}",
+                f"--data={self.memory_mb * 1024 * 1024}",
+                check=False,
+            )
+
+    async def start_bridge(self, config: dict, cwd: str, direct: dict = None) -> None:
+        """Start the WebSocket bridge; it connects to API Gateway on its own.
+
+        *direct* holds the ``DIRECT_WS_*`` settings of the direct browser
+        channel (host, TLS files, base port); slot N serves it on base + N.
+        """
+        direct_env = {}
+        if direct:
+            direct_env = {
+                **direct,
+                "DIRECT_WS_PORT": str(int(direct["DIRECT_WS_PORT"]) + self.index),
+            }
+
+        # Bundled Python needs the system CA bundle to verify API Gateway TLS
+        self.bridge = await asyncio.create_subprocess_exec(
+            sys.executable,
+            os.path.join(SESSION_DIR, "websocket_handler.py"),
+            cwd=cwd,
+            env={
+                **os.environ,
+                "SESSION_ID": config["session_id"],
+                "WEBSOCKET_URL": config["websocket_url"],
+                "LOCAL_WS_PORT": config["local_ws_port"],
+                "BRIDGE_READY_SIGNAL": self.bridge_signal,
+                "METRICS_PORT": str(METRICS_PORT + self.index),
+                "SSL_CERT_FILE": "/etc/ssl/certs/ca-certificates.crt",
+                **direct_env,
+            },
+        )
+        logger.info(f"[slot {self.index}] WebSocket handler launched (PID: {self.bridge.pid})")
+
+    async def wait_for_claim(self, slot_id: str, websocket_url: str) -> dict:
+        """
+        Register as a free session slot and wait for a session.
+
+        Reconnects whenever API Gateway drops the connection (idle or
+        2-hour limit); the Lambda only claims slots it sees connected.
+
+        Returns:
+            The ``claim_session`` message (session id, initial HDA, idle
+            timeouts).
+
+        Raises:
+            RuntimeError: If the pool connection keeps failing.
+        """
+        url = f"{websocket_url}?pool_slot_id={slot_id}"
+        failures = 0
+
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=30, ping_timeout=10) as ws:
+                    failures = 0
+                    logger.info(f"[slot {self.index}] Registered as {slot_id}, waiting for a session...")
+                    while True:
+                        try:
+                            raw = await asyncio.wait_for(
+                                ws.recv(), timeout=POOL_HEARTBEAT_INTERVAL
+                            )
+                        except asyncio.TimeoutError:
+                            await ws.send(
+                                json.dumps({"action": "pool_heartbeat", "slot_id": slot_id})
+                            )
+                            continue
+
+                        message = json.loads(raw)
+                        if message.get("action") == "claim_session":
+                            logger.info(
+                                f"[slot {self.index}] Claimed for session {message.get('session_id')}"
+                            )
+                            return message
+
+            except Exception as e:
+                failures += 1
+                logger.warning(
+                    f"[slot {self.index}] Pool connection lost "
+                    f"({failures}/{POOL_MAX_CONNECT_FAILURES}): {e}"
+                )
+                if failures >= POOL_MAX_CONNECT_FAILURES:
+                    raise RuntimeError("Could not stay registered in the warm pool") from e
+                await asyncio.sleep(POOL_RETRY_DELAY)
+
+    async def unless_hython_exits(self, coro):
+        """Await *coro*, failing if hython dies first (a broken free slot)."""
+        task = asyncio.ensure_future(coro)
+        hython_exit = asyncio.ensure_future(self.hython.wait())
+        await asyncio.wait({task, hython_exit}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            task.cancel()
+            raise RuntimeError(f"hython exited with code {self.hython.returncode}")
+        hython_exit.cancel()
+        return task.result()
+
+    async def supervise(self) -> int:
+        """Wait for either session process to exit, then stop the other."""
+        processes = [p for p in (self.hython, self.bridge) if p]
+        waiters = {asyncio.ensure_future(p.wait()): p for p in processes}
+        done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            waiter.cancel()
+
+        exited = waiters[next(iter(done))]
+        logger.info("==========================================")
+        logger.info(
+            f"[slot {self.index}] Process {exited.pid} ended with exit code: {exited.returncode}"
+        )
+        logger.info(f"[slot {self.index}] Terminating remaining processes...")
+        await self.terminate()
+        return exited.returncode
+
+    async def terminate(self) -> None:
+        for process in (self.hython, self.bridge):
+            if process and process.returncode is None:
+                process.terminate()
+        for process in (self.hython, self.bridge):
+            if process:
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    process.kill()
+        self.hython = None
+        self.bridge = None
+
+
+class SessionBootstrap:
+    """Runs the instance init steps and the session slots."""
+
+    def __init__(self):
+        self.tooling_root = os.environ.get("AURORA_TOOLING_ROOT", "/opt/aurora")
+        self.data_root = os.environ.get(
+            "DATA_ROOT", os.path.join(self.tooling_root, "SHARED")
+        )
+        self.session_hip = os.path.join(SESSION_DIR, "session_runner.hip")
+        self.timeline = StartupTimeline("bootstrap")
+
+        # More slots are added once the tags are known
+        self.slots = [SessionSlot(0, self.data_root)]
+        # Set by run(): workspace prep, and licensing + workspace prep
+        self.workspace_task: asyncio.Future = None
+        self.init_task: asyncio.Future = None
+        # DIRECT_WS_* env for the bridges; empty = API Gateway only
+        self.direct = {}
+
+    # ------------------------------------------------------------------ #
+    #  Helpers
+    # ------------------------------------------------------------------ #
+
+    async def _step(self, name: str, coro, **details):
+        """Await *coro* and record it in the timeline as *name*."""
+        started = time.time()
+        result = await coro
+        duration = self.timeline.record_since(name, started, **details)
+        logger.info(f"Step '{name}' finished in {duration:.2f}s")
+        return result
+
+    def _start_step(self, name: str, coro) -> asyncio.Future:
+        """Schedule *coro* as a timed step and return its task."""
+        return asyncio.ensure_future(self._step(name, coro))
+
+    @staticmethod
+    def _read_metadata(path: str) -> str:
+        with urllib.request.urlopen(
+            f"{METADATA_URL}/{path}", timeout=METADATA_TIMEOUT
+        ) as response:
+            return response.read().decode("utf-8")
+
+    # ------------------------------------------------------------------ #
+    #  Init steps
+    # ------------------------------------------------------------------ #
+
+    async def instance_id(self) -> str:
+        return await asyncio.to_thread(self._read_metadata, "instance-id")
+
+    async def region(self) -> str:
+        # The launch template already exports the region; fall back to IMDS
+        region = os.environ.get("AWS_REGION")
+        if region:
+            return region
+        return await asyncio.to_thread(self._read_metadata, "placement/region")
+
+    async def instance_tags(self, instance_id_task, region_task) -> dict:
+        instance_id, region = await asyncio.gather(instance_id_task, region_task)
+
+        def describe_tags():
+            ec2 = boto3.client("ec2", region_name=region)
+            response = ec2.describe_tags(
+                Filters=[{"Name": "resource-id", "Values": [instance_id]}]
+            )
+            return {tag["Key"]: tag["Value"] for tag in response["Tags"]}
+
+        tags = await asyncio.to_thread(describe_tags)
+        logger.info(f"Instance {instance_id} tags: {json.dumps(tags, indent=2)}")
+        return tags
+
+    async def sidefx_credentials(self, region_task) -> dict:
+        region = await region_task
+
+        def get_secret():
+            secrets = boto3.client("secretsmanager", region_name=region)
+            response = secrets.get_secret_value(SecretId=SIDEFX_SECRET_ID)
+            return json.loads(response["SecretString"])
+
+        return await asyncio.to_thread(get_secret)
+
+    async def direct_channel(self, tags: dict, region: str) -> dict:
+        """
+        Prepare the direct browser channel, if the instance is tagged for it.
+
+        The ``direct_ws_tls_secret`` secret holds the PEM ``certificate``
+        and ``private_key`` browsers will see, and optionally a
+        ``host_suffix``: the channel is then served as
+        ``<public-ip-with-dashes>.<host_suffix>`` (wildcard DNS), otherwise
+        on the instance's public hostname.
+
+        Returns:
+            ``DIRECT_WS_*`` bridge env vars (empty when disabled).
+        """
+        port = tags.get("direct_ws_port")
+        secret_id = tags.get("direct_ws_tls_secret")
+        if not port or not secret_id:
+            return {}
+
+        def get_secret():
+            secrets = boto3.client("secretsmanager", region_name=region)
+            response = secrets.get_secret_value(SecretId=secret_id)
+            return json.loads(response["SecretString"])
+
+        tls = await asyncio.to_thread(get_secret)
+        if tls.get("host_suffix"):
+            public_ip = await asyncio.to_thread(self._read_metadata, "public-ipv4")
+            host = f"{public_ip.replace('.', '-')}.{tls['host_suffix']}"
+        else:
+            host = await asyncio.to_thread(self._read_metadata, "public-hostname")
+
+        os.makedirs(DIRECT_WS_TLS_DIR, mode=0o700, exist_ok=True)
+        files = {}
+        for name in ("certificate", "private_key"):
+            path = os.path.join(DIRECT_WS_TLS_DIR, f"{name}.pem")
+            with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                f.write(tls[name])
+            files[name] = path
+
+        logger.info(f"Direct channel enabled on wss://{host}:{port}")
+        return {
+            "DIRECT_WS_PORT": port,
+            "DIRECT_WS_HOST": host,
+            "DIRECT_WS_CERT": files["certificate"],
+            "DIRECT_WS_KEY": files["private_key"],
+        }
+
+    async def prepare_workspace(self) -> None:
+        """Recreate an empty ``$DATA_ROOT`` for this instance."""
+        await run_command("sudo", "rm", "-rf", self.data_root)
+        os.makedirs(self.data_root, exist_ok=True)
+
+    async def license_houdini(self, credentials_task, hserver_quit_task) -> None:
+        credentials, _ = await asyncio.gather(credentials_task, hserver_quit_task)
+        await self._step(
+            "hserver_start",
+            run_command(
+                HSERVER_BIN,
+                "--clientid",
+                credentials["sidefx_client"],
+                "--clientsecret",
+                credentials["sidefx_secret"],
+                "--host",
+                LICENSE_HOST,
+                check=False,
+            ),
+        )
+        await self._step(
+            "sesictrl_login", run_command(SESICTRL_BIN, "login", check=False)
+        )
+
+    def configure_slots(self, tags: dict) -> None:
+        """
+        Add the slots requested by the ``session_slots`` tag.
+
+        Each slot gets its own ``$DATA_ROOT/slot<N>`` workspace, a
+        contiguous share of the CPUs and ``slot_memory_mb`` (tag, default an
+        equal share of physical memory, 0 = uncapped) of memory.
+        """
+        slot_count = max(1, int(tags.get("session_slots") or 1))
+        if slot_count == 1:
+            return
+
+        self.slots[0].data_root = os.path.join(self.data_root, "slot0")
+        for index in range(1, slot_count):
+            self.slots.append(
+                SessionSlot(index, os.path.join(self.data_root, f"slot{index}"))
+            )
+
+        cpus = sorted(os.sched_getaffinity(0))
+        per_slot = max(1, len(cpus) // slot_count)
+        memory_tag = tags.get("slot_memory_mb")
+        memory_mb = (
+            int(memory_tag) if memory_tag is not None else total_memory_mb() // slot_count
+        )
+        for slot in self.slots:
+            share = cpus[slot.index * per_slot : (slot.index + 1) * per_slot] or cpus
+            slot.cpus = f"{share[0]}-{share[-1]}"
+            slot.memory_mb = memory_mb
+            logger.info(
+                f"[slot {slot.index}] Port {slot.port}, CPUs {slot.cpus}, "
+                f"memory cap {memory_mb or 'none'} MB"
+            )
+
+    def build_config(self, tags: dict, region: str, slot: SessionSlot) -> dict:
+        """Build the session config shared with a slot's hython and bridge."""
+        websocket_url = tags.get("websocket_url", "")
+        return {
+            "session_id": tags.get("session_id", ""),
+            "session_hip": self.session_hip,
+            "websocket_url": websocket_url,
+            "aws_region": region,
+            "input_bucket": tags.get("input_bucket", ""),
+            "s3_output_bucket": tags.get("s3_output_bucket") or DEFAULT_S3_OUTPUT_BUCKET,
+            "idle_timeout_seconds": tags.get("idle_timeout_seconds")
+            or DEFAULT_IDLE_TIMEOUT_SECONDS,
+            "idle_warning_seconds": tags.get("idle_warning_seconds")
+            or DEFAULT_IDLE_WARNING_SECONDS,
+            "api_endpoint": websocket_url,
+            "local_ws_port": str(slot.port),
+            "data_root": slot.data_root,
+            "aurora_tooling_root": self.tooling_root,
+            # Initial HDA is optional (sessions can start empty)
+            "hda_s3_key": tags.get("hda_s3_key", ""),
+            "hda_filename": tags.get("hda_filename", ""),
+        }
+
+    async def start_session(self, slot: SessionSlot, config: dict) -> None:
+        """Start the slot's bridge and the initial HDA prefetch for *config*."""
+        if not config["session_id"] or not config["websocket_url"]:
+            raise RuntimeError("Instance is missing the session_id / websocket_url tags")
+
+        logger.info("==========================================")
+        logger.info(f"Session Configuration (slot {slot.index}):")
+        logger.info(f"  Session ID: {config['session_id']}")
+        logger.info(f"  Input Bucket: {config['input_bucket']}")
+        logger.info(f"  S3 Output Bucket: {config['s3_output_bucket']}")
+        logger.info(f"  WebSocket URL: {config['websocket_url']}")
+        logger.info(f"  Idle Timeout: {config['idle_timeout_seconds']} seconds")
+        logger.info(f"  Idle Warning: {config['idle_warning_seconds']} seconds")
+        logger.info(f"  Initial HDA: {config['hda_s3_key'] or '(none)'}")
+        logger.info("==========================================")
+
+        await self._step(
+            "start_bridge",
+            slot.start_bridge(config, self.tooling_root, self.direct),
+            slot=slot.index,
+        )
+
+        # Let hython start downloading the initial HDA in parallel with licensing
+        await self.workspace_task
+        os.makedirs(slot.data_root, exist_ok=True)
+        write_signal_file(
+            slot.prefetch_signal,
+            {
+                "hda_s3_key": config["hda_s3_key"],
+                "hda_filename": config["hda_filename"],
+                "input_bucket": config["input_bucket"],
+                "aws_region": config["aws_region"],
+                "data_root": config["data_root"],
+            },
+        )
+        logger.info(f"[slot {slot.index}] HDA prefetch signal written")
+
+    # ------------------------------------------------------------------ #
+    #  Orchestration
+    # ------------------------------------------------------------------ #
+
+    async def run_slot(
+        self, slot: SessionSlot, tags: dict, region: str, instance_id: str
+    ) -> int:
+        """
+        Serve sessions on *slot*.
+
+        Args:
+            slot:        Slot to run; slot 0's hython is already launched.
+            tags:        Instance tags.
+            region:      AWS region.
+            instance_id: EC2 instance id, part of the pool slot id.
+
+        Returns:
+            Exit code of the slot's (last) session.
+        """
+        # Slot 0 of an instance launched for a session serves it directly
+        direct = slot.index == 0 and (
+            bool(tags.get("session_id")) or tags.get("mode") != WARM_POOL_MODE
+        )
+
+        while True:
+            if slot.hython is None:
+                slot.clear_signals()
+                await self._step(
+                    "launch_hython", slot.launch_hython(self.tooling_root), slot=slot.index
+                )
+            await slot.apply_limits()
+
+            config = self.build_config(tags, region, slot)
+            if direct:
+                await self.start_session(slot, config)
+
+            await self.init_task
+            os.makedirs(slot.data_root, exist_ok=True)
+
+            # Env vars set after forking aren't visible to hython, so the
+            # config is handed over as JSON. The warm signal lets hython
+            # load the session HIP before a session is known.
+            write_signal_file(slot.warm_signal, config)
+
+            if not direct:
+                await self._step(
+                    "session_hip_load",
+                    slot.unless_hython_exits(wait_for_file(slot.loaded_signal)),
+                    slot=slot.index,
+                )
+                claim = await self._step(
+                    "pool_wait",
+                    slot.unless_hython_exits(
+                        slot.wait_for_claim(
+                            f"{instance_id}/{slot.index}", config["websocket_url"]
+                        )
+                    ),
+                    slot=slot.index,
+                )
+                config = self.build_config({**tags, **claim}, region, slot)
+                await self.start_session(slot, config)
+
+            write_signal_file(slot.ready_signal, config)
+            self.timeline.record("ready_signal", 0.0, slot=slot.index)
+            logger.info(f"[slot {slot.index}] Config written to ready signal file")
+            self.timeline.log_summary(logger)
+
+            exit_code = await slot.supervise()
+            if len(self.slots) == 1:
+                return exit_code
+
+            # Shared instance: recycle the slot for the next session
+            direct = False
+            logger.info(f"[slot {slot.index}] Session ended, restarting slot")
+
+    async def run_slot_isolated(self, slot: SessionSlot, *args) -> int:
+        """Run a slot of a shared instance; a failing slot leaves the others running."""
+        try:
+            return await self.run_slot(slot, *args)
+        except Exception as e:
+            logger.error(f"[slot {slot.index}] Slot failed: {e}")
+            await slot.terminate()
+            return 1
+
+    async def run(self) -> int:
+        first_slot = self.slots[0]
+        first_slot.clear_signals()
+        await self._step(
+            "launch_hython", first_slot.launch_hython(self.tooling_root), slot=0
+        )
+
+        instance_id_task = self._start_step("instance_id", self.instance_id())
+        region_task = self._start_step("region", self.region())
+        hserver_quit_task = self._start_step(
+            "hserver_quit", run_command(HSERVER_BIN, "-q", check=False)
+        )
+        self.workspace_task = self._start_step(
+            "prepare_workspace", self.prepare_workspace()
+        )
+        tags_task = self._start_step(
+            "describe_tags", self.instance_tags(instance_id_task, region_task)
+        )
+        credentials_task = self._start_step(
+            "get_sidefx_secret", self.sidefx_credentials(region_task)
+        )
+        license_task = asyncio.ensure_future(
+            self.license_houdini(credentials_task, hserver_quit_task)
+        )
+        self.init_task = asyncio.ensure_future(
+            asyncio.gather(license_task, self.workspace_task)
+        )
+
+        try:
+            tags, region, instance_id = await asyncio.gather(
+                tags_task, region_task, instance_id_task
+            )
+            self.configure_slots(tags)
+            try:
+                self.direct = await self._step(
+                    "direct_channel", self.direct_channel(tags, region)
+                )
+            except Exception as e:
+                logger.error(f"Direct channel disabled: {e}")
+
+            if not os.path.isfile(self.session_hip):
+                logger.warning(f"Session HIP file does not exist at: {self.session_hip}")
+
+            if len(self.slots) == 1:
+                return await self.run_slot(first_slot, tags, region, instance_id)
+
+            logger.info(f"Hosting {len(self.slots)} session slots")
+            exit_codes = await asyncio.gather(
+                *(
+                    self.run_slot_isolated(slot, tags, region, instance_id)
+                    for slot in self.slots
+                )
+            )
+            logger.info(f"All session slots ended: {exit_codes}")
+            return max(exit_codes)
+
+        except Exception as e:
+            logger.error(f"Session bootstrap failed: {e}")
+            self.timeline.log_summary(logger)
+            for slot in self.slots:
+                await slot.terminate()
+            return 1
+        finally:
+            self.init_task.cancel()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(SessionBootstrap().run()))
@@ -0,0 +1,181 @@
+"""
+On-demand cook profiling for the ``profile`` session action.
+
+A :class:`CookProfiler` records a Houdini Performance Monitor profile
+(``hou.perfMon``, cook and memory stats) and a Python ``cProfile`` over
+the next N parameter updates, then summarizes:
+
+- the nodes with the highest cook time and the most memory,
+- the Python functions with the highest own time.
+
+The raw profiles (``.hperf`` for Houdini's Performance Monitor panel and
+``.pstats`` for ``pstats`` / snakeviz) are written to a local directory
+for the runner to upload.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import hou
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_UPDATES = 5
+MAX_PROFILE_UPDATES = 50
+TOP_ENTRIES = 15
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _collect_node_stats(data: Any, found: Dict[str, Dict[str, float]], path: str = None) -> None:
+    """
+    Collect per-node cook time (ms) and memory (bytes) from the profile's
+    JSON statistics.
+
+    The layout of ``hou.PerfMonProfile.stats()`` differs between Houdini
+    versions, so this walks it and picks up any entry that names a node
+    path (as a key or a ``path``/``name`` field) together with numeric
+    cook-time or memory fields.
+    """
+    if isinstance(data, list):
+        for item in data:
+            _collect_node_stats(item, found, path)
+        return
+    if not isinstance(data, dict):
+        return
+
+    for key in ("path", "name", "node", "object"):
+        value = data.get(key)
+        if isinstance(value, str) and value.startswith("/"):
+            path = value
+            break
+
+    if path:
+        entry = found.setdefault(path, {"cook_ms": 0.0, "memory_bytes": 0.0})
+        for key, value in data.items():
+            number = _number(value)
+            if number is None:
+                continue
+            lowered = key.lower()
+            if "time" in lowered or "cook" in lowered:
+                entry["cook_ms"] = max(entry["cook_ms"], number)
+            elif "mem" in lowered:
+                entry["memory_bytes"] = max(entry["memory_bytes"], number)
+
+    for key, value in data.items():
+        child_path = key if isinstance(key, str) and key.startswith("/") else path
+        if isinstance(value, (dict, list)):
+            _collect_node_stats(value, found, child_path)
+
+
+def _geometry_memory(root: "hou.Node") -> Dict[str, float]:
+    """Memory held by the cached geometry of each cooked SOP under *root*."""
+    memory = {}
+    for node in (root, *root.allSubChildren()):
+        try:
+            if node.cookCount() == 0 or not hasattr(node, "geometry"):
+                continue
+            geo = node.geometry()
+            if geo:
+                memory[node.path()] = float(geo.intrinsicValue("memoryusage"))
+        except Exception:
+            continue
+    return memory
+
+
+class CookProfiler:
+    """Houdini and Python profile over the next ``updates`` parameter updates."""
+
+    def __init__(self, updates: int = DEFAULT_PROFILE_UPDATES):
+        self.updates = max(1, min(int(updates), MAX_PROFILE_UPDATES))
+        self.completed = 0
+        self.started = time.time()
+        self._python = cProfile.Profile()
+        options = hou.PerfMonRecordOptions(cook_stats=True, memory_stats=True)
+        self._profile = hou.perfMon.startProfile("Aurora session profile", options)
+        logger.info(f"Profiling the next {self.updates} updates")
+
+    @property
+    def done(self) -> bool:
+        """Whether all requested updates have been profiled."""
+        return self.completed >= self.updates
+
+    def run(self, func, *args, **kwargs):
+        """Run one update under the Python profiler and count it."""
+        self._python.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._python.disable()
+            self.completed += 1
+
+    def finish(self, hda_node: "hou.Node" = None) -> Dict[str, Any]:
+        """
+        Stop profiling and summarize the results.
+
+        Returns:
+            The summary, with ``files`` listing the raw profiles written
+            to a temporary directory (the caller uploads and removes them).
+        """
+        self._profile.stop()
+        output_dir = tempfile.mkdtemp(prefix="houdini_profile_")
+        hperf_path = os.path.join(output_dir, "cook_profile.hperf")
+        pstats_path = os.path.join(output_dir, "python_profile.pstats")
+        self._profile.save(hperf_path)
+        self._python.dump_stats(pstats_path)
+
+        nodes: Dict[str, Dict[str, float]] = {}
+        try:
+            _collect_node_stats(json.loads(self._profile.stats()), nodes)
+        except Exception as e:
+            logger.warning(f"Could not read profile statistics: {e}")
+
+        if hda_node:
+            for path, memory in _geometry_memory(hda_node).items():
+                entry = nodes.setdefault(path, {"cook_ms": 0.0, "memory_bytes": 0.0})
+                entry["memory_bytes"] = max(entry["memory_bytes"], memory)
+
+        def top(field: str) -> List[Dict[str, Any]]:
+            ranked = sorted(nodes.items(), key=lambda item: item[1][field], reverse=True)
+            return [
+                {"path": path, **{k: round(v, 2) for k, v in entry.items()}}
+                for path, entry in ranked[:TOP_ENTRIES]
+                if entry[field] > 0
+            ]
+
+        return {
+            "updates": self.completed,
+            "duration": round(time.time() - self.started, 3),
+            "top_cook": top("cook_ms"),
+            "top_memory": top("memory_bytes"),
+            "python_hotspots": self._python_hotspots(),
+            "files": [hperf_path, pstats_path],
+        }
+
+    def cancel(self) -> None:
+        """Discard the profile (e.g. when the HDA is replaced)."""
+        try:
+            self._profile.cancel()
+        except Exception:
+            pass
+
+    def _python_hotspots(self) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(self._python)
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "self_ms": round(own * 1000, 2),
+                "total_ms": round(total * 1000, 2),
+            }
+            for (filename, line, func), (_, calls, own, total, _) in ranked[:TOP_ENTRIES]
+        ]
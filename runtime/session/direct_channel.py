@@ -0,0 +1,48 @@
+"""
+Tokens for the direct browser ↔ bridge WebSocket channel.
+
+High-frequency session traffic can bypass API Gateway and the routing
+Lambda by connecting straight to the bridge on the session instance. The
+Lambda generates a per-session key, hands it to the bridge over the
+bridge's API Gateway connection, and gives the browser short-lived
+tokens signed with it::
+
+    <session_id>.<expires_at>.<hex HMAC-SHA256 of "<session_id>.<expires_at>">
+
+The signing side is duplicated in the session Lambda
+(``infra/provisioning/deployment/session/lambda_websocket_handler.py``).
+
+This module has no ``hou`` dependency.
+"""
+
+import hashlib
+import hmac
+import time
+from urllib.parse import parse_qs, urlparse
+
+TOKEN_QUERY_PARAM = "token"
+
+
+def sign_token(key: str, session_id: str, expires_at: int) -> str:
+    """Return a token for *session_id* valid until *expires_at* (epoch seconds)."""
+    claims = f"{session_id}.{int(expires_at)}"
+    signature = hmac.new(key.encode(), claims.encode(), hashlib.sha256).hexdigest()
+    return f"{claims}.{signature}"
+
+
+def verify_token(key: str, token: str, session_id: str) -> bool:
+    """Check that *token* was signed with *key* for *session_id* and is unexpired."""
+    try:
+        token_session, expires_at, _ = token.split(".")
+        expired = int(expires_at) < time.time()
+    except ValueError:
+        return False
+    if token_session != session_id or expired:
+        return False
+    return hmac.compare_digest(sign_token(key, session_id, int(expires_at)), token)
+
+
+def token_from_path(path: str) -> str:
+    """Extract the token from a request path such as ``/?token=...``."""
+    values = parse_qs(urlparse(path).query).get(TOKEN_QUERY_PARAM)
+    return values[0] if values else ""
@@ -3,15 +3,16 @@ HDA (Houdini Digital Asset) utility functions.
 
 This module handles:
 - Installing HDA files into a Houdini session
-- Instantiating HDAs inside container nodes
+- Instantiating HDAs inside container nodes (one or several instances)
 - Extracting parameter schemas from HDA instances for UI generation
 - Wiring HDA output into the export pipeline
 """
 
+import hashlib
 import logging
 import os
 import hou
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,31 @@ CONTAINER_PATH = "/obj/CONTAINER"
 EXPORT_NODE_REF_PATH = "/obj/EXPORT/EXPORT_NODE_REF"
 EXPORT_GLTF_PATH = "/obj/EXPORT/EXPORT_GLTF"
 OBJPATH_PARM = "objpath1"
+XFORMTYPE_PARM = "xformtype"
+XFORMTYPE_INTO_THIS_OBJECT = 1  # menu index on the object merge
+
+# Object-level transform parms: (template type, components)
+OBJECT_TRANSFORM_PARMS = {
+    "xOrd": ("Menu", 1),
+    "rOrd": ("Menu", 1),
+    "t": ("Float", 3),
+    "r": ("Float", 3),
+    "s": ("Float", 3),
+    "p": ("Float", 3),
+    "pr": ("Float", 3),
+    "scale": ("Float", 1),
+}
+
+# Node name of the session's first (or only) HDA instance
+DEFAULT_INSTANCE_NAME = "user_hda"
 
 
-def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
+def install_and_instantiate_hda(
+    hda_file_path: str,
+    node_name: str = DEFAULT_INSTANCE_NAME,
+    replace: bool = True,
+    stale_files: Sequence[str] = (),
+) -> "hou.Node":
     """
     Install an HDA file and instantiate it inside the CONTAINER node.
 
@@ -33,7 +56,15 @@ def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
         4. Wire the HDA into the EXPORT pipeline by setting objpath1
 
     Args:
-        hda_file_path: Absolute path to the .hda file on disk.
+        hda_file_path: Absolute path to the .hda file on disk. Each
+                       instance kept alongside others needs its own file.
+        node_name:     Name of the instance node.
+        replace:       Remove every existing instance first; otherwise
+                       only a previous instance named *node_name*.
+        stale_files:   Library files of the removed instances that no
+                       remaining instance uses; uninstalled before the new
+                       node is created, so their (possibly older)
+                       definitions of the same node type cannot be picked.
 
     Returns:
         The instantiated HDA node.
@@ -72,9 +103,11 @@ def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
         )
 
     # --- Install the HDA definitions ---
-    # First, destroy any existing children so no instances of old node types remain.
+    # First, destroy the instances being replaced so none of old node types remain.
     # This must happen BEFORE uninstalling the old file to avoid stale references.
     for child in container_node.children():
+        if not replace and child.name() != node_name:
+            continue
         try:
             child_name = child.name()
             child.destroy()
@@ -82,14 +115,14 @@ def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
         except hou.ObjectWasDeleted:
             logger.warning("  Skipped already-deleted child node")
 
+    for stale_file in stale_files:
+        if stale_file != hda_file_path:
+            uninstall_hda_file(stale_file)
+
     # Uninstall the old file to flush Houdini's cached definitions.
     # Since we always overwrite the same path, Houdini won't re-read the file
     # on installFile() unless we uninstall first.
-    try:
-        hou.hda.uninstallFile(hda_file_path)
-        logger.info("Uninstalled previous HDA definitions from file")
-    except hou.OperationFailed:
-        pass  # No previous install at this path — that's fine
+    uninstall_hda_file(hda_file_path)
 
     logger.info("Installing HDA definitions...")
     hou.hda.installFile(hda_file_path)
@@ -117,7 +150,7 @@ def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
     logger.info(f"Using HDA: {node_type_name} (category: {node_type_category})")
 
     # --- Instantiate HDA inside CONTAINER ---
-    hda_node = container_node.createNode(node_type_name, "user_hda")
+    hda_node = container_node.createNode(node_type_name, node_name)
     if not hda_node:
         raise RuntimeError(
             f"Failed to create node of type '{node_type_name}' inside {CONTAINER_PATH}"
@@ -127,23 +160,118 @@ def install_and_instantiate_hda(hda_file_path: str) -> "hou.Node":
     logger.info(f"Instantiated HDA node at: {hda_node.path()}")
 
     # --- Wire into EXPORT pipeline ---
-    # The EXPORT_NODE_REF object merge needs the path to pull geometry from.
-    # For a SOP-level HDA inside a geo container, we point to the node's render/display.
-    # We set objpath1 to the full path of the HDA instance node.
-    hda_node_path = hda_node.path()
-    export_ref_parm = export_ref_node.parm(OBJPATH_PARM)
+    set_export_source(hda_node)
+
+    # No explicit cook here — the first GLTF ROP render will cook
+    # the full chain (EXPORT_NODE_REF -> HDA) on demand.
+
+    return hda_node
+
+
+def uninstall_hda_file(hda_file_path: str) -> bool:
+    """Uninstall the definitions of an HDA library file; False if it was not installed."""
+    try:
+        hou.hda.uninstallFile(hda_file_path)
+    except hou.OperationFailed:
+        return False  # No previous install at this path — that's fine
+    logger.info(f"Uninstalled HDA definitions from {hda_file_path}")
+    return True
+
+
+def set_export_source(hda_node: "hou.Node") -> bool:
+    """
+    Point the EXPORT pipeline at *hda_node*.
+
+    The EXPORT_NODE_REF object merge needs the path to pull geometry from.
+    For a SOP-level HDA inside a geo container, we point to the node's render/display.
+    We set objpath1 to the full path of the HDA instance node. With several
+    instances in the session, this is called before each instance's export.
+
+    Returns:
+        Whether the source changed (an unchanged path leaves the chain clean).
+
+    Raises:
+        RuntimeError: If EXPORT_NODE_REF or its parameter is missing.
+    """
+    export_ref_node = hou.node(EXPORT_NODE_REF_PATH)
+    export_ref_parm = export_ref_node.parm(OBJPATH_PARM) if export_ref_node else None
     if not export_ref_parm:
         raise RuntimeError(
             f"Parameter '{OBJPATH_PARM}' not found on {EXPORT_NODE_REF_PATH}"
         )
 
+    hda_node_path = hda_node.path()
+    if export_ref_parm.eval() == hda_node_path:
+        return False
+
     export_ref_parm.set(hda_node_path)
     logger.info(f"Set {EXPORT_NODE_REF_PATH}/{OBJPATH_PARM} = {hda_node_path}")
+    return True
 
-    # No explicit cook here — the first GLTF ROP render will cook
-    # the full chain (EXPORT_NODE_REF -> HDA) on demand.
 
-    return hda_node
+def is_transform_parm(parm_tuple: "hou.ParmTuple") -> bool:
+    """
+    Whether *parm_tuple* is one of an object's standard transform parms.
+
+    The name must be a transform parm of an object-level node and its
+    template must have the expected type and size. Parms that other parms
+    reference (e.g. a SOP reading the translate by channel reference) do
+    more than move the object and are not counted.
+    """
+    expected = OBJECT_TRANSFORM_PARMS.get(parm_tuple.name())
+    if not expected or not isinstance(parm_tuple.node(), hou.ObjNode):
+        return False
+    template = parm_tuple.parmTemplate()
+    if (template.type().name(), template.numComponents()) != expected:
+        return False
+    return not any(parm.parmsReferencingThis() for parm in parm_tuple)
+
+
+# Parm templates whose value never reaches the cook
+_NON_COOKING_TYPES = {"Button", "Folder", "FolderSet", "Separator", "Label"}
+
+
+def is_ui_only_parm(parm: "hou.Parm") -> bool:
+    """
+    Whether setting *parm* cannot change the cooked geometry.
+
+    True for buttons, folders, separators and labels, and for hidden or
+    disabled (``disableWhen``) parms that no other parm references; a
+    hidden parm driving the network through a channel reference counts as
+    cooking. Evaluate before setting the parm: the disable conditions
+    depend on the current values.
+    """
+    template = parm.parmTemplate()
+    if template.type().name() in _NON_COOKING_TYPES:
+        return True
+    if not (template.isHidden() or parm.isDisabled()):
+        return False
+    return not parm.parmsReferencingThis()
+
+
+def transform_object(hda_node: "hou.Node") -> Optional["hou.ObjNode"]:
+    """The object whose transform places *hda_node*: itself or its containing object."""
+    node = hda_node
+    while node is not None and not isinstance(node, hou.ObjNode):
+        node = node.parent()
+    return node
+
+
+def export_transform(hda_node: "hou.Node") -> Optional["hou.Matrix4"]:
+    """
+    Transform the EXPORT pipeline bakes into *hda_node*'s exported geometry.
+
+    EXPORT_NODE_REF set to transform "Into This Object" applies the world
+    transform of the object containing the source, relative to the EXPORT
+    object. Returns None for any other transform mode: object transforms
+    then either do not reach the export or are not handled here.
+    """
+    export_ref_node = hou.node(EXPORT_NODE_REF_PATH)
+    xform_parm = export_ref_node.parm(XFORMTYPE_PARM) if export_ref_node else None
+    source = transform_object(hda_node)
+    if not xform_parm or xform_parm.eval() != XFORMTYPE_INTO_THIS_OBJECT or not source:
+        return None
+    return source.worldTransform() * export_ref_node.parent().worldTransform().inverted()
 
 
 def extract_hda_parameters(hda_node: "hou.Node") -> Dict[str, Any]:
@@ -191,6 +319,73 @@ def extract_hda_parameters(hda_node: "hou.Node") -> Dict[str, Any]:
     return result
 
 
+def hda_definition_key(hda_node: "hou.Node") -> str:
+    """
+    Return a stable cache key for the definition behind *hda_node*.
+
+    The key combines a hash of the library file contents with the node
+    type name and definition version, so re-uploading an edited HDA
+    under the same name yields a new key.
+
+    Args:
+        hda_node: The instantiated HDA hou.Node.
+
+    Returns:
+        A filesystem/S3-safe key string.
+    """
+    node_type = hda_node.type()
+    hda_def = node_type.definition()
+
+    hasher = hashlib.sha256()
+    hasher.update(node_type.nameWithCategory().encode("utf-8"))
+
+    version = ""
+    if hda_def:
+        version = hda_def.version() or ""
+        library_path = hda_def.libraryFilePath()
+        if library_path and os.path.isfile(library_path):
+            with open(library_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+
+    hasher.update(version.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def refresh_parameter_defaults(schema: Dict[str, Any], hda_node: "hou.Node") -> int:
+    """
+    Re-evaluate the ``default`` of every parameter in a cached *schema*.
+
+    This is the only part of a schema that depends on the live node, and
+    is much cheaper than walking the parm template group again.
+
+    Args:
+        schema:   Schema as returned by :func:`extract_hda_parameters`.
+        hda_node: The HDA node the schema was rebased onto.
+
+    Returns:
+        Number of parameters that could no longer be found on the node.
+    """
+    missing = 0
+    for parm_path, entry in schema["parameters"].items():
+        if entry.get("num_components", 1) > 1:
+            parm_tuple = hou.parmTuple(parm_path)
+            if not parm_tuple:
+                missing += 1
+                continue
+            entry["default"] = [p.eval() for p in parm_tuple]
+        else:
+            parm = hou.parm(parm_path)
+            if not parm:
+                missing += 1
+                continue
+            entry["default"] = parm.eval()
+
+    if missing:
+        logger.warning(f"{missing} cached parameters not found on {hda_node.path()}")
+    return missing
+
+
 # ---------------------------------------------------------------------------
 #  Internal helpers
 # ---------------------------------------------------------------------------
@@ -4,28 +4,48 @@ This runs in hython and imports hou module.
 Uses asyncio ONLY for WebSocket client communication with local handler.
 """
 
+import hashlib
 import json
-import logging
 import os
 import shutil
 import sys
 import time
-import traceback
+import uuid
 import asyncio
 import concurrent.futures
 import boto3
 import tempfile
 import websockets
 from botocore.config import Config
-from hda_utils import install_and_instantiate_hda, EXPORT_GLTF_PATH
+from animation_export import AnimationExport, pack_animated_glb, plan_frames, preroll_frames
+from cook_profiler import CookProfiler, DEFAULT_PROFILE_UPDATES
+from hda_utils import install_and_instantiate_hda, EXPORT_GLTF_PATH, EXPORT_NODE_REF_PATH
+from hda_utils import uninstall_hda_file
+from hda_utils import DEFAULT_INSTANCE_NAME, OBJPATH_PARM, set_export_source
+from hda_utils import export_transform, is_transform_parm, is_ui_only_parm, transform_object
 from hda_utils import extract_hda_parameters
 from hda_utils import export_gltf
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
+from hda_utils import hda_definition_key, refresh_parameter_defaults
+from log_batcher import LogBatcher
+from memory_manager import MemoryManager, WARN_FRACTION
+from message_codec import MessageCodec
+from message_framing import encode_frame, encode_frames
+from request_timing import RequestTimer, UpdateBudget
+from schema_cache import SchemaCache
+from session_metrics import MetricsReport, process_rss_bytes
+from speculation import GeometryCache, Speculator, neighbour_values
+from signal_files import read_signal_file, wait_for_file, write_signal_file
+from startup_timeline import StartupTimeline
+
+# The shared runtime package lives at the repository root
+_TOOLING_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _TOOLING_ROOT not in sys.path:
+    sys.path.insert(0, _TOOLING_ROOT)
+
+from runtime.shared.logging_config import log_context, set_log_context, setup_logging  # noqa: E402
+
+# Setup logging (non-blocking, structured)
+logger = setup_logging(__name__)
 
 # Import Houdini
 try:
@@ -35,6 +55,31 @@ except ImportError:
     sys.exit(1)
 
 
+# Self-contained GLBs up to this size are sent inline in geometry_ready
+# instead of through S3 (larger messages are chunked; see message_framing)
+INLINE_GEOMETRY_MAX_BYTES = int(os.environ.get("INLINE_GEOMETRY_MAX_BYTES", 256 * 1024))
+
+# Unchanged geometry reuses its S3 object; its URL (valid for 1 hour) is
+# presigned again once it is older than this
+PRESIGNED_URL_REUSE_SECONDS = 3000
+
+# Idle-time pre-cooking of the neighbouring values of the last touched
+# parameter: wall time allowed per touched parameter, and the average
+# update cost above which it is not attempted (a speculative cook delays
+# a command arriving meanwhile)
+SPECULATION_BUDGET_SECONDS = float(os.environ.get("SPECULATION_BUDGET_SECONDS", 20))
+MAX_SPECULATIVE_UPDATE_SECONDS = float(os.environ.get("MAX_SPECULATIVE_UPDATE_SECONDS", 2))
+
+# Commands that make the frames an animation export has yet to cook stale
+ANIMATION_CANCELLING_ACTIONS = {
+    "update_parameter",
+    "extract_parameters",
+    "remove_instance",
+    "execute_python",
+    "cancel_animation",
+}
+
+
 class HoudiniRunner:
     """Handles Houdini operations synchronously."""
 
@@ -53,16 +98,61 @@ class HoudiniRunner:
         self.s3_client = s3_client
         self.input_bucket = input_bucket
         self.output_node = None
-        self.hda_node = None  # set when user loads an HDA via menu
+        # HDA instances by id (their node name), loaded via the menu; the
+        # active one is what commands without a parameter path apply to
+        self.instances = {}
+        self.active_instance = None
+        # Library file each instance was installed from
+        self._hda_libraries = {}
+        # Values set through update_parameter, per instance; with the
+        # instance's placement they key the geometry cache
+        self._parm_values = {}
         self.last_geometry_url = None
+        # Digest and result of each instance's last export, to skip unchanged uploads
+        self._last_geometries = {}
+        # Exports by parameter state, including pre-cooked neighbours
+        self.geometry_cache = GeometryCache(on_evict=_discard_local_export)
+        self._speculation_dir = None  # speculative exports not uploaded yet
+        self.speculator = Speculator(SPECULATION_BUDGET_SECONDS)
         self.running = True
         self.websocket = websocket
         self.log_sink = None
-        self._log_queue = []
-
+        self.log_batcher = LogBatcher()
+        self.schema_cache = SchemaCache(s3_client, s3_output_bucket)
+        self.timer = None  # RequestTimer of the command being processed
+        self.update_budget = UpdateBudget()  # advertised in geometry_ready
+        self.metrics = MetricsReport()  # pushed to the bridge's metrics endpoint
+        self.profiler = None  # CookProfiler while a profile action is running
+        self.memory = MemoryManager()  # checked after every command
+        self.animation = None  # AnimationExport streaming its frames, if any
+
+        set_log_context(session_id=session_id)
         logger.info(f"Initializing Houdini runner for session {session_id}")
         logger.info(f"Session HIP: {session_hip}")
 
+    @property
+    def hda_node(self):
+        """The active HDA instance node (None when no HDA is loaded)."""
+        return self.instances.get(self.active_instance)
+
+    @property
+    def _last_geometry(self):
+        return self._last_geometries.get(self.active_instance)
+
+    @_last_geometry.setter
+    def _last_geometry(self, entry):
+        self._last_geometries[self.active_instance] = entry
+
+    def _instance_of(self, param_path: str):
+        """Id of the instance owning the parameter at *param_path*, or None."""
+        for instance, node in self.instances.items():
+            try:
+                if param_path.startswith(node.path() + "/"):
+                    return instance
+            except hou.ObjectWasDeleted:
+                continue
+        return None
+
     def load_session(self) -> bool:
         """Load session_runner.hip template. HDA is loaded later via menu."""
 
@@ -101,8 +191,7 @@ class HoudiniRunner:
             return True
 
         except Exception as e:
-            logger.error(f"Error loading session/HDA: {e}")
-            traceback.print_exc()
+            logger.exception(f"Error loading session/HDA: {e}")
             return False
 
     def setup_log_capturing(self):
@@ -139,7 +228,7 @@ class HoudiniRunner:
 
             # Create a temporary log file
             log_dir = tempfile.gettempdir()
-            log_path = os.path.join(log_dir, f"houdini_{self.session_id}.log")
+            log_path = os.path.join(log_dir, f"houdini_{self.session_id or os.getpid()}.log")
 
             # Setup file sink
             self.log_sink = hou.logging.FileSink(log_path)
@@ -155,37 +244,80 @@ class HoudiniRunner:
             logger.error(f"Failed to setup Houdini log capturing: {e}")
 
     def send_log_to_client(self, level: str, message: str, context: str = ""):
-        """Send a log message to the client via WebSocket."""
-        self._log_queue.append(
-            {
-                "action": "log",
-                "level": level,
-                "message": message,
-                "context": context,
-                "timestamp": time.time(),
-            }
-        )
+        """Queue a log message for the next batched ``logs`` message."""
+        self.log_batcher.add(level, message, context)
 
     def get_pending_logs(self):
-        """Get and clear pending logs for sending."""
-        logs = self._log_queue.copy()
-        self._log_queue.clear()
-        return logs
+        """Get and clear pending logs as a ``logs`` message (None if empty)."""
+        return self.log_batcher.drain()
 
     def process_command(self, command: dict) -> dict:
-        """Process a command synchronously and return result."""
+        """Process a command synchronously and return result.
+
+        Commands carrying a ``request_id`` get it back in the result along
+        with the latency breakdown (see ``request_timing``).
+        """
+        self.timer = RequestTimer(command)
+        action = command.get("action") or "unknown"
+        with log_context(request_id=self.timer.request_id):
+            try:
+                result = self._dispatch(command)
+            finally:
+                self.memory.touch(self.active_instance)
+                timer, self.timer = self.timer, None
+                duration = time.time() - timer.started
+                self.metrics.observe("command_seconds", duration, action=action)
+
+            logger.info(
+                "Command %s done: %s",
+                action,
+                timer.summary(),
+                extra={"phase": action, "duration_ms": round(duration * 1000, 2)},
+            )
+        return timer.attach(result)
+
+    def _record(self, stage: str, seconds: float) -> None:
+        """Add a stage duration to the current request's timings, if any."""
+        if self.timer:
+            self.timer.add(stage, seconds)
+        logger.debug(
+            "%s took %.3fs",
+            stage,
+            seconds,
+            extra={"phase": stage, "duration_ms": round(seconds * 1000, 2)},
+        )
+
+    def _dispatch(self, command: dict) -> dict:
+        """Run one command."""
         action = command.get("action")
 
         logger.info(f"Processing command: {action}")
 
+        # Commands may name the instance they apply to
+        if command.get("instance") in self.instances and action != "extract_parameters":
+            self.active_instance = command["instance"]
+
+        if self.animation and action in ANIMATION_CANCELLING_ACTIONS:
+            logger.info(f"Cancelling animation {self.animation.animation_id} ({action})")
+            self.animation.cancel()
+
         try:
             if action == "extract_parameters":
                 return self.extract_parameters(command)
             elif action == "update_parameter":
+                if self.profiler:
+                    return self.profiler.run(self.update_parameter, command)
                 return self.update_parameter(command)
+            elif action == "profile":
+                return self.start_profile(command)
             elif action == "get_geometry":
-                geometry_data = self.export_geometry()
-                return {"action": "geometry_ready", "geometry": geometry_data}
+                return self.geometry_ready(self.export_geometry())
+            elif action == "remove_instance":
+                return self.remove_instance(command)
+            elif action == "export_animation":
+                return self.export_animation(command)
+            elif action == "cancel_animation":
+                return {"status": "cancelled"}
             elif action == "execute_python":
                 return self.execute_python(command)
             elif action == "terminate":
@@ -203,7 +335,9 @@ class HoudiniRunner:
         """Download HDA from S3, install it, and extract parameters.
 
         Always expects 's3_key' and 'filename' in the command.
-        Supports loading the first HDA or swapping to a different one.
+        Supports loading the first HDA or swapping to a different one. With
+        ``add_instance`` the HDA is added next to the loaded ones as a new
+        instance; with ``instance`` only that instance is replaced.
         """
         try:
             s3_key = command.get("s3_key")
@@ -214,28 +348,79 @@ class HoudiniRunner:
 
             logger.info(f"Loading HDA: {filename} (s3: {s3_key})")
 
-            # Download HDA from S3
-            local_hda_path = os.path.join(
-                os.environ.get("DATA_ROOT", "/tmp"), "user_tool.hda"
-            )
-
             input_bucket = self.input_bucket or os.environ.get("INPUT_BUCKET")
             if not input_bucket:
                 return {"error": "INPUT_BUCKET not configured — cannot download HDA."}
 
-            logger.info(f"Downloading HDA from s3://{input_bucket}/{s3_key}")
-            download_start = time.time()
-            self.s3_client.download_file(input_bucket, s3_key, local_hda_path)
-            download_time = time.time() - download_start
-            logger.info(f"HDA downloaded in {download_time:.2f}s")
+            instance = command.get("instance")
+            if command.get("add_instance"):
+                instance = self._new_instance_id()
+
+            # Instances kept side by side each need their own library file
+            local_hda_path = _download_hda(
+                self.s3_client,
+                input_bucket,
+                s3_key,
+                filename=f"user_tool_{instance}.hda" if instance else "user_tool.hda",
+            )
+            return self.load_hda(local_hda_path, instance)
+
+        except Exception as e:
+            logger.exception(f"Error extracting HDA parameters: {e}")
+            return {"error": f"Failed to extract parameters: {str(e)}"}
+
+    def load_hda(self, local_hda_path: str, instance: str = None) -> dict:
+        """Install an already-downloaded HDA and extract its parameters.
+
+        Without *instance* the HDA replaces every loaded instance; otherwise
+        it is loaded as (or replaces) that instance only, and becomes the
+        active one.
+
+        Returns:
+            A ``parameters_ready`` message.
 
-            # Install and instantiate the HDA (replaces previous one if any)
+        Raises:
+            Exception: Any install or extraction failure.
+        """
+        # A profile of the previous HDA is meaningless now
+        if self.profiler:
+            self.profiler.cancel()
+            self.profiler = None
+
+        replace = instance is None
+        instance = instance or DEFAULT_INSTANCE_NAME
+        if replace:
+            replaced = set(self._hda_libraries.values())
+            self._hda_libraries.clear()
+            self._parm_values.clear()
+        else:
+            replaced = {self._hda_libraries.pop(instance, local_hda_path)}
+            self._parm_values.pop(instance, None)
+        # Libraries still defining the replaced node types go with them
+        stale_files = sorted(replaced - set(self._hda_libraries.values()))
+        if replace:
+            self.instances.clear()
+            self._last_geometries.clear()
+            self.memory.forget()
+            self.update_budget.reset()
+        else:
+            self.instances.pop(instance, None)
+            self._last_geometries.pop(instance, None)
+        self.geometry_cache.clear()
+        self.speculator.cancel()
+
+        try:
+            # Install and instantiate the HDA (replaces previous one(s) if any)
             hda_start = time.time()
-            self.hda_node = install_and_instantiate_hda(local_hda_path)
+            self.instances[instance] = install_and_instantiate_hda(
+                local_hda_path, instance, replace, stale_files
+            )
+            self._hda_libraries[instance] = local_hda_path
+            self.active_instance = instance
             hda_time = time.time() - hda_start
             logger.info(f"HDA installed in {hda_time:.2f}s: {self.hda_node.path()}")
 
-            param_data = extract_hda_parameters(self.hda_node)
+            param_data = self.get_parameter_schema(self.hda_node)
 
             node_count = len(hou.node("/").allSubChildren())
             param_count = len(param_data["parameters"])
@@ -249,16 +434,102 @@ class HoudiniRunner:
 
             return {
                 "action": "parameters_ready",
+                "instance": instance,
+                "added": not replace,
                 "parameters": param_data,
                 "node_count": node_count,
                 "message": msg,
             }
 
+        except Exception:
+            self.instances.pop(instance, None)
+            self.active_instance = next(reversed(self.instances), None)
+            raise
+
+    def _new_instance_id(self) -> str:
+        """Unused instance id (node name) for an added HDA."""
+        if not self.instances:
+            return DEFAULT_INSTANCE_NAME
+        number = len(self.instances) + 1
+        while f"{DEFAULT_INSTANCE_NAME}_{number}" in self.instances:
+            number += 1
+        return f"{DEFAULT_INSTANCE_NAME}_{number}"
+
+    def remove_instance(self, command: dict) -> dict:
+        """Remove one HDA instance (``instance``) from the session."""
+        instance = command.get("instance")
+        node = self.instances.pop(instance, None)
+        if not node:
+            return {"error": f"Unknown HDA instance: {instance}"}
+
+        self._last_geometries.pop(instance, None)
+        self.memory.forget(instance)
+        self.speculator.cancel()
+        try:
+            node.destroy()
+        except hou.ObjectWasDeleted:
+            pass
+        self._parm_values.pop(instance, None)
+        library = self._hda_libraries.pop(instance, None)
+        if library and library not in self._hda_libraries.values():
+            uninstall_hda_file(library)
+        if self.active_instance == instance:
+            self.active_instance = next(reversed(self.instances), None)
+
+        logger.info(f"Removed HDA instance {instance}")
+        return {"action": "instance_removed", "instance": instance}
+
+    def preload_hda(self, local_hda_path: str, s3_key: str) -> list:
+        """Load the session's initial HDA and export its initial geometry.
+
+        Runs before the bridge connection exists; the returned messages are
+        pushed to the browser as soon as the runner connects. If the boot
+        prefetch did not produce *local_hda_path*, *s3_key* is downloaded.
+
+        Returns:
+            The ``parameters_ready`` and ``geometry_ready`` messages, or a
+            single error message.
+        """
+        preload_start = time.time()
+        try:
+            if not local_hda_path:
+                logger.warning("HDA prefetch unavailable, downloading now")
+                local_hda_path = _download_hda(
+                    self.s3_client, self.input_bucket, s3_key
+                )
+            param_result = self.load_hda(local_hda_path)
         except Exception as e:
-            logger.error(f"Error extracting HDA parameters: {e}")
-            traceback.print_exc()
-            self.hda_node = None
-            return {"error": f"Failed to extract parameters: {str(e)}"}
+            logger.exception(f"Error preloading HDA: {e}")
+            return [{"error": f"Failed to preload HDA: {str(e)}"}]
+
+        geo_result = self.export_geometry()
+        logger.info(f"HDA preloaded in {time.time() - preload_start:.2f}s")
+        return [param_result, self.geometry_ready(geo_result)]
+
+    def get_parameter_schema(self, hda_node) -> dict:
+        """Return the parameter schema for *hda_node*, using the schema cache.
+
+        On a hit only the live defaults are re-evaluated; on a miss (or if
+        the cached schema no longer matches the node) the parm templates
+        are walked and the result is cached.
+        """
+        schema_start = time.time()
+        definition_key = hda_definition_key(hda_node)
+
+        param_data = self.schema_cache.get(definition_key, hda_node.path())
+        if param_data and refresh_parameter_defaults(param_data, hda_node) == 0:
+            logger.info(
+                f"Parameter schema served from cache in "
+                f"{time.time() - schema_start:.3f}s"
+            )
+            return param_data
+
+        param_data = extract_hda_parameters(hda_node)
+        self.schema_cache.put(definition_key, param_data)
+        logger.info(
+            f"Parameter schema extracted in {time.time() - schema_start:.3f}s"
+        )
+        return param_data
 
     def update_parameter(self, command: dict) -> dict:
         """Update a Houdini parameter and export resulting geometry."""
@@ -269,6 +540,9 @@ class HoudiniRunner:
         if not param_path or value is None:
             return {"error": "Missing param or value"}
 
+        # Only the instance owning the parameter is re-cooked and re-exported
+        self.active_instance = self._instance_of(param_path) or self.active_instance
+
         try:
             update_start = time.time()
             logger.info(f"--- Parameter Update Start: {param_path} ---")
@@ -283,9 +557,11 @@ class HoudiniRunner:
                         logger.error(f"Parameter not found: {param_path}")
                         return {"error": f"Parameter not found: {param_path}"}
                     old_value = parm.eval()
+                    ui_only = is_ui_only_parm(parm)
                     parm.set(value[0])
                 else:
                     old_value = [p.eval() for p in parm_tuple]
+                    ui_only = all(is_ui_only_parm(p) for p in parm_tuple)
                     parm_tuple.set(value)
             else:
                 parm = hou.parm(param_path)
@@ -293,17 +569,44 @@ class HoudiniRunner:
                     logger.error(f"Parameter not found: {param_path}")
                     return {"error": f"Parameter not found: {param_path}"}
                 old_value = parm.eval()
+                ui_only = is_ui_only_parm(parm)
                 parm.set(value)
 
+            self._parm_values.setdefault(self.active_instance, {})[param_path] = value
+            self._record("parm_set", time.time() - update_start)
             logger.info(f"Parameter updated: {param_path} = {value} (was {old_value})")
 
-            # No explicit cook needed here — the GLTF ROP render in
-            # export_geometry() will cook the full dependency chain
-            # (EXPORT_NODE_REF -> HDA) automatically.
+            # An object transform only moves the exported meshes; the viewer
+            # applies the new matrix to the geometry it already has
+            transform_update = self._transform_update(param_path)
+            if transform_update:
+                logger.info(f"Transform-only update, moving {list(transform_update['transforms'])}")
+                return {
+                    **transform_update,
+                    "param": param_path,
+                    "old_value": old_value,
+                    "new_value": value,
+                }
 
-            # Export geometry via GLTF ROP
-            logger.info("Exporting geometry...")
-            geometry_result = self.export_geometry()
+            # No explicit cook needed here — export_geometry() cooks the HDA
+            # and the GLTF ROP render pulls the rest of the chain
+            # (EXPORT_NODE_REF -> HDA).
+
+            cached = self.geometry_cache.get(self._state_key())
+            # Setting any HDA parm dirties the HDA, so UI-only parms are
+            # recognised from their template; the cook check catches parms
+            # outside the export chain
+            if self._last_geometry and (ui_only or not self._export_needs_cook()):
+                logger.info("Export chain not dirtied, reusing last geometry")
+                geometry_result = self._reuse_geometry()
+            elif cached:
+                # Pre-cooked while idle, or a state visited before
+                logger.info("Serving geometry from the session cache")
+                geometry_result = self._cached_geometry(cached)
+            else:
+                # Export geometry via GLTF ROP
+                logger.info("Exporting geometry...")
+                geometry_result = self.export_geometry()
 
             update_time = time.time() - update_start
             logger.info(f"--- Parameter Update Complete ({update_time:.3f}s total) ---")
@@ -311,91 +614,248 @@ class HoudiniRunner:
             # Check if geometry export failed
             if "error" in geometry_result:
                 logger.error(f"Geometry export failed: {geometry_result['error']}")
-                return {
-                    "action": "geometry_ready",
-                    "status": "error",
-                    "error": f"Geometry export failed: {geometry_result['error']}",
-                    "param": param_path,
-                    "geometry": geometry_result,
-                }
+                return self.geometry_ready(
+                    geometry_result,
+                    status="error",
+                    error=f"Geometry export failed: {geometry_result['error']}",
+                    param=param_path,
+                )
 
-            return {
-                "action": "geometry_ready",
-                "status": "success",
-                "param": param_path,
-                "old_value": old_value,
-                "new_value": value,
-                "geometry": geometry_result,
-            }
+            if num_components == 1:
+                self._plan_speculation(param_path)
+
+            return self.geometry_ready(
+                geometry_result,
+                status="success",
+                param=param_path,
+                old_value=old_value,
+                new_value=value,
+            )
 
         except Exception as e:
             logger.error(f"Error updating parameter: {e}")
             return {"error": str(e)}
 
-    def export_geometry(self) -> dict:
-        """Export geometry via GLTF ROP and upload to S3."""
+    def geometry_ready(self, geometry: dict, **fields) -> dict:
+        """Build a ``geometry_ready`` message, with the current update budget."""
+        return {
+            "action": "geometry_ready",
+            "instance": self.active_instance,
+            **fields,
+            "geometry": geometry,
+            "update_budget": self.update_budget.describe(),
+        }
+
+    def _transform_update(self, param_path: str):
+        """
+        ``transform_update`` message if *param_path* only moves instances.
+
+        Applies to the standard transform parms of an instance's own object
+        or of an object containing it. Each moved instance gets the matrix
+        taking its last exported geometry to where it now is (row-major,
+        row vectors, i.e. three.js ``Matrix4.fromArray`` order). Returns
+        None, for a full export, when in doubt: any other parm, an instance
+        not exported yet, or an export that does not bake object transforms.
+        """
+        parm_tuple = hou.parmTuple(param_path)
+        if not parm_tuple:
+            parm = hou.parm(param_path)
+            parm_tuple = parm.tuple() if parm else None
+        if not parm_tuple or not is_transform_parm(parm_tuple):
+            return None
+
+        moved = parm_tuple.node().path()
+        transforms = {}
+        for instance, node in self.instances.items():
+            source = transform_object(node)
+            if not source or (source.path() != moved and not source.path().startswith(moved + "/")):
+                continue
+            last = self._last_geometries.get(instance)
+            current = export_transform(node)
+            if not last or last.get("transform") is None or current is None:
+                return None
+            exported = hou.Matrix4(last["transform"])
+            transforms[instance] = list((exported.inverted() * current).asTuple())
+
+        if not transforms:
+            return None
+        return {"action": "transform_update", "transforms": transforms}
+
+    def _state_key(self, override: tuple = None) -> str:
+        """
+        Geometry cache key of the active instance: its placement and the
+        parameter values set on it since it was loaded.
+
+        Only the parms the browser set are keyed (instead of evaluating
+        every parm of the HDA); *override* adds one more
+        ``(param_path, value)`` as if it had been set.
+        """
+        values = dict(self._parm_values.get(self.active_instance, {}))
+        if override:
+            values[override[0]] = override[1]
+        key = [self.hda_node.path() if self.hda_node else None]
+        if self.hda_node:
+            # Parms of containing objects move the exported geometry too
+            baked = export_transform(self.hda_node)
+            key.append(baked.asTuple() if baked else None)
+        key.append(json.dumps(values, sort_keys=True, default=str))
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def _plan_speculation(self, param_path: str) -> None:
+        """Queue the neighbouring values of *param_path* for pre-cooking."""
+        self.speculator.cancel()
+        if self.update_budget.describe()["min_interval_ms"] > MAX_SPECULATIVE_UPDATE_SECONDS * 1000:
+            return
+        # Pre-cooked states only add to the memory under pressure
+        if self.memory.rss_bytes > self.memory.budget_bytes * WARN_FRACTION:
+            return
+
+        try:
+            parm = hou.parm(param_path)
+            if not parm or parm.keyframes():
+                return
+            template = parm.parmTemplate()
+            template_type = template.type()
+            if template_type == hou.parmTemplateType.Toggle:
+                values = neighbour_values("toggle", parm.eval())
+            elif template_type == hou.parmTemplateType.Menu:
+                items = range(len(template.menuItems()))
+                values = neighbour_values("menu", parm.eval(), items=items)
+            elif template_type == hou.parmTemplateType.String and template.menuItems():
+                values = neighbour_values("menu", parm.eval(), items=template.menuItems())
+            elif template_type == hou.parmTemplateType.Int and not template.menuItems():
+                values = neighbour_values(
+                    "int",
+                    parm.eval(),
+                    minimum=int(template.minValue()),
+                    maximum=int(template.maxValue()),
+                )
+            else:
+                return
+        except Exception as e:
+            logger.debug(f"No speculation for {param_path}: {e}")
+            return
+
+        if values:
+            self.speculator.plan(param_path, values)
+
+    def speculate(self) -> None:
+        """Pre-cook one neighbouring value; run only while no command waits."""
+        candidate = self.speculator.next()
+        if not candidate:
+            return
+        param_path, value = candidate
+        instance = self._instance_of(param_path)
+        parm = hou.parm(param_path)
+        if not instance or not parm:
+            return
+
+        previous, self.active_instance = self.active_instance, instance
+        state_key = self._state_key((param_path, value))
+        if state_key in self.geometry_cache or self.speculator.interrupted():
+            self.active_instance = previous
+            return
+        is_string = parm.parmTemplate().type() == hou.parmTemplateType.String
+        original = parm.unexpandedString() if is_string else parm.eval()
+        start = time.time()
+        try:
+            parm.set(value)
+            result = self.export_geometry(speculative=True, state_key=state_key)
+            if "error" not in result:
+                logger.info(
+                    f"Pre-cooked {param_path} = {value} in {time.time() - start:.3f}s"
+                )
+        except Exception as e:
+            logger.warning(f"Speculative cook of {param_path} = {value} failed: {e}")
+        finally:
+            parm.set(original)
+            self.active_instance = previous
+
+    def export_geometry(self, speculative: bool = False, state_key: str = None) -> dict:
+        """
+        Export geometry via GLTF ROP, inline (small GLBs) or via S3.
+
+        Every export is cached for the current parameter state. A
+        *speculative* export leaves the last geometry and the update budget
+        alone; instead of being uploaded it is kept on local disk until a
+        real update picks it (see :meth:`_cached_geometry`), and it is not
+        cached at all if it needs sidecar files. It stops after the cook if
+        a command arrived meanwhile.
+
+        Args:
+            speculative: Pre-cook of a neighbouring value.
+            state_key:   Cache key of the exported state (default: the
+                         current one, see :meth:`_state_key`).
+        """
 
         try:
             export_start = time.time()
+            state_key = state_key or self._state_key()
 
             # Create a temp directory for the export
             export_dir = tempfile.mkdtemp(prefix="houdini_export_")
 
-            # Trigger the GLTF ROP render
-            logger.info("Triggering GLTF export ROP...")
+            # Cook the HDA first so the breakdown separates cook from render;
+            # the ROP render then reuses the cooked result
+            cook_time = 0.0
+            if self.hda_node:
+                set_export_source(self.hda_node)
+                cook_start = time.time()
+                self.hda_node.cook()
+                cook_time = time.time() - cook_start
+                self._record("cook", cook_time)
+                self.metrics.observe("cook_seconds", cook_time)
+
+            # A command waits for this job; skip the render and upload
+            if speculative and self.speculator.interrupted():
+                shutil.rmtree(export_dir, ignore_errors=True)
+                return {"error": "Speculation interrupted by a command"}
+
             render_start = time.time()
-            gltf_path = export_gltf(output_dir=export_dir)
+            gltf_path, sidecars, digest = self._render_export(export_dir)
             render_time = time.time() - render_start
-            logger.info(f"GLTF ROP rendered in {render_time:.3f}s")
-
-            if not gltf_path or not os.path.exists(gltf_path):
-                # Fallback: look for any .gltf or .glb in the export dir
-                for fname in os.listdir(export_dir):
-                    if fname.endswith((".gltf", ".glb")):
-                        gltf_path = os.path.join(export_dir, fname)
-                        break
-
-            if not gltf_path or not os.path.exists(gltf_path):
-                logger.error("GLTF export produced no output file")
+            if not gltf_path:
                 return {"error": "GLTF export produced no output file"}
-
             file_size = os.path.getsize(gltf_path)
             ext = os.path.splitext(gltf_path)[1]  # .gltf or .glb
-            logger.info(
-                f"Exported file: {gltf_path} ({file_size} bytes, {file_size/1024:.2f} KB)"
-            )
 
-            # Upload to S3
-            s3_key = f"interactive/{self.session_id}/geometry_{int(time.time())}{ext}"
-            logger.info(f"Uploading to S3: s3://{self.s3_output_bucket}/{s3_key}")
-            upload_start = time.time()
-            self.s3_client.upload_file(gltf_path, self.s3_output_bucket, s3_key)
-            upload_time = time.time() - upload_start
-            logger.info(f"S3 upload completed in {upload_time:.3f}s")
-
-            # Also upload any sidecar files (.bin, textures) that may be alongside the gltf
-            gltf_dir = os.path.dirname(gltf_path)
-            gltf_basename = os.path.basename(gltf_path)
-            for sidecar in os.listdir(gltf_dir):
-                if sidecar == gltf_basename:
-                    continue
-                sidecar_path = os.path.join(gltf_dir, sidecar)
-                if os.path.isfile(sidecar_path):
-                    sidecar_key = f"interactive/{self.session_id}/{sidecar}"
-                    self.s3_client.upload_file(
-                        sidecar_path, self.s3_output_bucket, sidecar_key
-                    )
-                    logger.info(f"Uploaded sidecar: {sidecar}")
-
-            # Generate presigned URL (valid for 1 hour)
-            logger.info("Generating presigned URL...")
-            geometry_url = self.s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.s3_output_bucket, "Key": s3_key},
-                ExpiresIn=3600,
+            # The export holds the topology and attribute buffers; if it is
+            # byte-identical to the last one, keep the last upload
+            if self._last_geometry and self._last_geometry["digest"] == digest:
+                shutil.rmtree(export_dir, ignore_errors=True)
+                self.geometry_cache.put(state_key, self._last_geometry)
+                logger.info("Exported geometry unchanged, skipping upload")
+                return self._reuse_geometry()
+
+            if speculative and sidecars:
+                shutil.rmtree(export_dir, ignore_errors=True)
+                return {"error": "Speculative exports with sidecar files are not cached"}
+
+            # Small self-contained GLBs go inline over the WebSocket; anything
+            # else is uploaded to S3 and fetched by the browser
+            inline = (
+                ext == ".glb"
+                and not sidecars
+                and file_size <= INLINE_GEOMETRY_MAX_BYTES
             )
 
-            self.last_geometry_url = geometry_url
+            upload_time = 0.0
+            local_path = None
+            if inline:
+                with open(gltf_path, "rb") as f:
+                    delivery = {"delivery": "inline", "data": f.read(), "size": file_size}
+                logger.info(f"Sending geometry inline ({file_size} bytes)")
+            elif speculative:
+                # Most pre-cooked states are never picked; upload on a hit only
+                if not self._speculation_dir:
+                    self._speculation_dir = tempfile.mkdtemp(prefix="houdini_speculation_")
+                local_path = os.path.join(self._speculation_dir, f"{uuid.uuid4().hex}{ext}")
+                shutil.move(gltf_path, local_path)
+                delivery = {}
+            else:
+                delivery = self._upload_geometry(gltf_path, ext, sidecars, digest)
+                upload_time = delivery.pop("upload_time")
+            self.last_geometry_url = delivery.get("url")
 
             # Try to get point/prim counts from the HDA output
             point_count = 0
@@ -418,21 +878,443 @@ class HoudiniRunner:
                 f"(render: {render_time:.3f}s, upload: {upload_time:.3f}s)"
             )
 
-            return {
+            result = {
                 "status": "success",
-                "url": geometry_url,
-                "geometry_url": geometry_url,
-                "s3_key": s3_key,
+                **delivery,
                 "format": "gltf",
                 "point_count": point_count,
                 "primitive_count": prim_count,
             }
+            baked = export_transform(self.hda_node) if self.hda_node else None
+            entry = {
+                "digest": digest,
+                "transform": baked.asTuple() if baked else None,
+                "result": {k: v for k, v in result.items() if k != "data"},
+                "data": result.get("data"),
+                "presigned_at": time.time(),
+            }
+            if local_path:
+                entry["local_path"] = local_path
+            self.geometry_cache.put(state_key, entry)
+            if not speculative:
+                self._last_geometry = entry
+                self.update_budget.observe(cook_time, render_time, upload_time)
+            return result
 
         except Exception as e:
-            logger.error(f"Error exporting geometry: {e}")
-            traceback.print_exc()
+            logger.exception(f"Error exporting geometry: {e}")
             return {"error": str(e)}
 
+    def _render_export(self, export_dir: str):
+        """
+        Render the GLTF ROP into *export_dir*.
+
+        Returns:
+            ``(gltf_path, sidecars, digest)``: the exported file (None if
+            the ROP wrote none), the other files it wrote, and the digest
+            of all of them.
+        """
+        logger.info("Triggering GLTF export ROP...")
+        render_start = time.time()
+        gltf_path = export_gltf(output_dir=export_dir)
+        render_time = time.time() - render_start
+        self._record("render", render_time)
+        logger.info(f"GLTF ROP rendered in {render_time:.3f}s")
+
+        if not gltf_path or not os.path.exists(gltf_path):
+            # Fallback: look for any .gltf or .glb in the export dir
+            for fname in os.listdir(export_dir):
+                if fname.endswith((".gltf", ".glb")):
+                    gltf_path = os.path.join(export_dir, fname)
+                    break
+
+        if not gltf_path or not os.path.exists(gltf_path):
+            logger.error("GLTF export produced no output file")
+            return None, [], None
+
+        file_size = os.path.getsize(gltf_path)
+        self.metrics.observe("export_bytes", file_size)
+        logger.info(
+            f"Exported file: {gltf_path} ({file_size} bytes, {file_size/1024:.2f} KB)"
+        )
+
+        gltf_dir = os.path.dirname(gltf_path)
+        gltf_basename = os.path.basename(gltf_path)
+        sidecars = sorted(
+            name
+            for name in os.listdir(gltf_dir)
+            if name != gltf_basename and os.path.isfile(os.path.join(gltf_dir, name))
+        )
+        digest = _file_digest([gltf_path] + [os.path.join(gltf_dir, name) for name in sidecars])
+        return gltf_path, sidecars, digest
+
+    def _export_needs_cook(self) -> bool:
+        """Whether the export chain was dirtied since the last export."""
+        export_ref = hou.node(EXPORT_NODE_REF_PATH)
+        try:
+            if not export_ref or not self.hda_node:
+                return True
+            # The merge may point at another instance; this instance's node
+            # is dirty if its parms changed since its own export
+            if export_ref.parm(OBJPATH_PARM).eval() != self.hda_node.path():
+                return self.hda_node.needsToCook()
+            return export_ref.needsToCook()
+        except Exception:
+            return True
+
+    def _reuse_geometry(self) -> dict:
+        """
+        Return the last export result, marked ``unchanged``.
+
+        Inline geometry is not resent (the browser still holds it).
+        """
+        return {**self._presigned_result(self._last_geometry), "unchanged": True}
+
+    def _cached_geometry(self, entry: dict) -> dict:
+        """Serve a cached export as the current geometry, marked ``cached``.
+
+        A speculative export still on local disk is uploaded first.
+        """
+        if self._last_geometry and self._last_geometry["digest"] == entry["digest"]:
+            return self._reuse_geometry()
+
+        if entry.get("local_path"):
+            local_path = entry["local_path"]
+            ext = os.path.splitext(local_path)[1]
+            delivery = self._upload_geometry(local_path, ext, [], entry["digest"])
+            delivery.pop("upload_time")
+            entry["result"].update(delivery)
+            entry["presigned_at"] = time.time()
+            _discard_local_export(entry)
+
+        result = self._presigned_result(entry)
+        self._last_geometry = entry
+        if entry.get("data") is not None:
+            result = {**result, "data": entry["data"]}
+        return {**result, "cached": True}
+
+    def _presigned_result(self, entry: dict) -> dict:
+        """
+        Return a cached export result (without inline data); an S3 URL
+        close to expiry is presigned again for the same object.
+        """
+        result = entry["result"]
+        if (
+            result.get("delivery") == "s3"
+            and time.time() - entry["presigned_at"] > PRESIGNED_URL_REUSE_SECONDS
+        ):
+            url = self.s3_client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.s3_output_bucket, "Key": result["s3_key"]},
+                ExpiresIn=3600,
+            )
+            result.update(url=url, geometry_url=url)
+            entry["presigned_at"] = time.time()
+        self.last_geometry_url = result.get("url")
+        return result
+
+    def _upload_geometry(
+        self, gltf_path: str, ext: str, sidecars: list, digest: str, subfolder: str = None
+    ) -> dict:
+        """Upload an exported file (and its sidecars) to S3 and presign it.
+
+        Exports whose sidecars must not replace the instance's current ones
+        (animation frames) go to a *subfolder* of the instance's prefix.
+        """
+        # Each instance exports under its own prefix; speculative exports
+        # can run within the same second as a real one
+        prefix = f"interactive/{self.session_id}/{self.active_instance or DEFAULT_INSTANCE_NAME}"
+        if subfolder:
+            prefix = f"{prefix}/{subfolder}"
+        s3_key = f"{prefix}/geometry_{int(time.time())}_{digest[:12]}{ext}"
+        logger.info(f"Uploading to S3: s3://{self.s3_output_bucket}/{s3_key}")
+        upload_start = time.time()
+        self.s3_client.upload_file(gltf_path, self.s3_output_bucket, s3_key)
+        upload_time = time.time() - upload_start
+        logger.info(f"S3 upload completed in {upload_time:.3f}s")
+        if upload_time > 0:
+            self.metrics.observe(
+                "upload_bytes_per_second", os.path.getsize(gltf_path) / upload_time
+            )
+
+        # Also upload any sidecar files (.bin, textures) alongside the gltf
+        gltf_dir = os.path.dirname(gltf_path)
+        for sidecar in sidecars:
+            sidecar_key = f"{prefix}/{sidecar}"
+            self.s3_client.upload_file(
+                os.path.join(gltf_dir, sidecar), self.s3_output_bucket, sidecar_key
+            )
+            logger.info(f"Uploaded sidecar: {sidecar}")
+        self._record("upload", time.time() - upload_start)
+
+        # Generate presigned URL (valid for 1 hour)
+        logger.info("Generating presigned URL...")
+        presign_start = time.time()
+        geometry_url = self.s3_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.s3_output_bucket, "Key": s3_key},
+            ExpiresIn=3600,
+        )
+        self._record("presign", time.time() - presign_start)
+
+        return {
+            "delivery": "s3",
+            "url": geometry_url,
+            "geometry_url": geometry_url,
+            "s3_key": s3_key,
+            "upload_time": upload_time,
+        }
+
+    def check_memory(self):
+        """
+        Sample memory after a command and enforce the session's budget.
+
+        Returns:
+            A ``memory_warning`` message for the browser, or None.
+        """
+        try:
+            warning = self.memory.check(self.instances, self.active_instance)
+        except Exception as e:
+            logger.error(f"Error checking memory: {e}")
+            return None
+        if warning:
+            self.speculator.cancel()
+        return warning
+
+    def start_profile(self, command: dict) -> dict:
+        """Profile the next N parameter updates (``updates``, default 5)."""
+        if not self.hda_node:
+            return {"error": "No HDA loaded to profile"}
+        if self.profiler:
+            return {"error": "A profile is already running"}
+
+        self.profiler = CookProfiler(command.get("updates", DEFAULT_PROFILE_UPDATES))
+        return {"action": "profile_started", "updates": self.profiler.updates}
+
+    def finish_profile(self) -> dict:
+        """Stop the running profile, upload the raw profiles and summarize."""
+        profiler, self.profiler = self.profiler, None
+        try:
+            summary = profiler.finish(self.hda_node)
+            files = summary.pop("files")
+
+            # Raw profiles for Houdini's Performance Monitor / pstats
+            prefix = f"interactive/{self.session_id}/profiles/{int(time.time())}"
+            downloads = {}
+            for path in files:
+                name = os.path.basename(path)
+                key = f"{prefix}/{name}"
+                self.s3_client.upload_file(path, self.s3_output_bucket, key)
+                downloads[name] = self.s3_client.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": self.s3_output_bucket, "Key": key},
+                    ExpiresIn=3600,
+                )
+            shutil.rmtree(os.path.dirname(files[0]), ignore_errors=True)
+            logger.info(f"Profile of {summary['updates']} updates uploaded to {prefix}")
+
+            return {"action": "profile_ready", **summary, "downloads": downloads}
+
+        except Exception as e:
+            logger.exception(f"Error finishing profile: {e}")
+            return {"action": "profile_ready", "error": str(e)}
+
+    def export_animation(self, command: dict) -> dict:
+        """
+        Start exporting the active instance over a frame range.
+
+        Frames are exported and sent one at a time by :meth:`animation_step`
+        while no command waits (see ``animation_export``). The command takes
+        ``frame_start`` and ``frame_end`` (default: the playbar range),
+        ``stride`` (1), ``fps`` (the scene's) and ``pack`` (also upload one
+        animated GLB at the end).
+        """
+        if not self.hda_node:
+            return {"action": "animation_started", "error": "No HDA loaded"}
+
+        playbar = hou.playbar.frameRange()
+        try:
+            stride = float(command.get("stride") or 1)
+            frames = plan_frames(
+                float(command.get("frame_start", playbar[0])),
+                float(command.get("frame_end", playbar[1])),
+                stride,
+            )
+            fps = float(command.get("fps") or hou.fps())
+        except (TypeError, ValueError) as e:
+            return {"action": "animation_started", "error": f"Invalid frame range: {e}"}
+
+        if self.animation:
+            self.animation.cancel()
+            self.animation.close()
+        self.speculator.cancel()
+        self.animation = AnimationExport(
+            animation_id=f"{self.active_instance}_{int(time.time() * 1000)}",
+            instance=self.active_instance,
+            frames=frames,
+            fps=fps,
+            stride=stride,
+            pack=bool(command.get("pack")),
+        )
+        frame_seconds = self.update_budget.describe()["min_interval_ms"] / 1000
+        logger.info(
+            f"Exporting animation {self.animation.animation_id}: "
+            f"frames {frames[0]:g}-{frames[-1]:g} every {stride:g} ({len(frames)} frames)"
+        )
+        return {
+            "action": "animation_started",
+            "animation_id": self.animation.animation_id,
+            "instance": self.active_instance,
+            "frames": frames,
+            "fps": fps,
+            "stride": stride,
+            "pack": self.animation.pack,
+            "preroll": preroll_frames(len(frames), frame_seconds, self.animation.frame_seconds),
+        }
+
+    def animation_step(self):
+        """
+        Export the next frame of the running animation, or finish it.
+
+        Run only while no command waits. The scene's current frame and
+        active instance are restored after each frame, so commands handled
+        between frames see the state they expect.
+
+        Returns:
+            An ``animation_frame`` or ``animation_ready`` message, or None.
+        """
+        animation = self.animation
+        if not animation:
+            return None
+        if animation.instance not in self.instances:
+            animation.cancel()
+        step = animation.next_frame()
+        if step is None:
+            self.animation = None
+            return self._finish_animation(animation)
+
+        index, frame = step
+        previous_instance, self.active_instance = self.active_instance, animation.instance
+        current_frame = hou.frame()
+        try:
+            hou.setFrame(frame)
+            return self._export_frame(animation, index, frame)
+        except Exception as e:
+            logger.exception(f"Error exporting frame {frame:g}: {e}")
+            animation.cancel()
+            return {
+                "action": "animation_frame",
+                "animation_id": animation.animation_id,
+                "instance": animation.instance,
+                "index": index,
+                "frame": frame,
+                "error": str(e),
+            }
+        finally:
+            hou.setFrame(current_frame)
+            self.active_instance = previous_instance
+
+    def _export_frame(self, animation: AnimationExport, index: int, frame: float) -> dict:
+        """Cook and export the active instance at the current frame."""
+        message = {
+            "action": "animation_frame",
+            "animation_id": animation.animation_id,
+            "instance": animation.instance,
+            "index": index,
+            "frame": frame,
+        }
+        export_dir = tempfile.mkdtemp(prefix="houdini_frame_")
+        try:
+            set_export_source(self.hda_node)
+            cook_start = time.time()
+            self.hda_node.cook()
+            self.metrics.observe("cook_seconds", time.time() - cook_start)
+
+            gltf_path, sidecars, digest = self._render_export(export_dir)
+            if not gltf_path:
+                raise RuntimeError("GLTF export produced no output file")
+            ext = os.path.splitext(gltf_path)[1]
+            file_size = os.path.getsize(gltf_path)
+            self_contained = ext == ".glb" and not sidecars
+
+            # A frame identical to the previous one is sent as a reference
+            if animation.add_frame(digest, gltf_path if self_contained else None):
+                message["same_as"] = index - 1
+                return message
+
+            if self_contained and file_size <= INLINE_GEOMETRY_MAX_BYTES:
+                with open(gltf_path, "rb") as f:
+                    delivery = {"delivery": "inline", "data": f.read(), "size": file_size}
+            else:
+                delivery = self._upload_geometry(
+                    gltf_path,
+                    ext,
+                    sidecars,
+                    digest,
+                    subfolder=f"{animation.animation_id}/frame_{index:04d}",
+                )
+                delivery.pop("upload_time")
+
+            geo = self.hda_node.geometry()
+            message["geometry"] = {
+                "status": "success",
+                **delivery,
+                "format": "gltf",
+                "point_count": geo.intrinsicValue("pointcount") if geo else 0,
+                "primitive_count": geo.intrinsicValue("primitivecount") if geo else 0,
+            }
+            logger.info(f"Exported frame {frame:g} ({index + 1}/{len(animation.frames)})")
+            return message
+        finally:
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+    def _finish_animation(self, animation: AnimationExport) -> dict:
+        """Pack and upload the animated GLB if requested; build ``animation_ready``."""
+        message = {
+            "action": "animation_ready",
+            "animation_id": animation.animation_id,
+            "instance": animation.instance,
+            "frames": len(animation.frames),
+            "exported": animation.exported,
+            "cancelled": animation.cancelled,
+        }
+        try:
+            if animation.pack and not animation.cancelled:
+                if not animation.packable:
+                    message["pack_error"] = "Frames are not self-contained GLBs, nothing packed"
+                else:
+                    packed = os.path.join(animation.work_dir, "animation.glb")
+                    pack_animated_glb(
+                        animation.files,
+                        animation.frame_seconds,
+                        packed,
+                        names=[f"frame_{frame:g}" for frame in animation.frames],
+                    )
+                    previous_instance, self.active_instance = self.active_instance, animation.instance
+                    try:
+                        delivery = self._upload_geometry(
+                            packed, ".glb", [], _file_digest([packed]), subfolder=animation.animation_id
+                        )
+                    finally:
+                        self.active_instance = previous_instance
+                    message.update(
+                        url=delivery["url"],
+                        s3_key=delivery["s3_key"],
+                        size=os.path.getsize(packed),
+                    )
+        except Exception as e:
+            logger.error(f"Error packing animation {animation.animation_id}: {e}")
+            message["pack_error"] = str(e)
+        finally:
+            animation.close()
+
+        logger.info(
+            f"Animation {animation.animation_id} "
+            f"{'cancelled' if animation.cancelled else 'done'}: "
+            f"{animation.exported}/{len(animation.frames)} frames"
+        )
+        return message
+
     def execute_python(self, command: dict) -> dict:
         """Execute arbitrary Python code in Houdini context."""
         code = command.get("code")
@@ -443,6 +1325,9 @@ class HoudiniRunner:
             # Execute in local context with hou available
             local_vars = {"hou": hou, "runner": self}
             exec(code, {"__builtins__": __builtins__}, local_vars)
+            # The code may have changed anything the cached geometry depends on
+            self.geometry_cache.clear()
+            self.speculator.cancel()
 
             # Get result if any
             result = local_vars.get("result", "Code executed successfully")
@@ -459,7 +1344,7 @@ class HoudiniRunner:
 # ======================================================================
 
 # Mapping from OS environment variable name → JSON config key.
-# The entrypoint writes config as JSON because env vars set after
+# The bootstrapper writes config as JSON because env vars set after
 # forking hython aren't visible to this process.
 _ENV_MAPPING = {
     "SESSION_ID": "session_id",
@@ -474,20 +1359,24 @@ _ENV_MAPPING = {
     "LOCAL_WS_PORT": "local_ws_port",
     "DATA_ROOT": "data_root",
     "AURORA_TOOLING_ROOT": "aurora_tooling_root",
+    "HDA_S3_KEY": "hda_s3_key",
+    "HDA_FILENAME": "hda_filename",
 }
 
 
 async def _wait_for_ready_signal(signal_path: str, timeout_seconds: int = 300) -> dict:
     """
-    Poll for the ready-signal file written by entrypoint.sh.
+    Wait for a signal file written by bootstrap.py.
 
-    The entrypoint launches hython early to overlap its cold-start with
-    licensing and S3 downloads. Once those are done it writes a JSON
-    config file to *signal_path*.
+    The bootstrapper launches hython early to overlap its cold-start with
+    licensing and S3 downloads. Once those are done it atomically writes a
+    JSON config file to *signal_path*. The wait is event driven (inotify),
+    so the config is picked up the moment it is published.
 
     Args:
-        signal_path:     Path to poll for.
-        timeout_seconds: Max seconds to wait before raising.
+        signal_path:     Path to wait for.
+        timeout_seconds: Max seconds to wait before raising, or ``None``
+                         to wait indefinitely (warm pool instances).
 
     Returns:
         The parsed JSON config dict.
@@ -495,25 +1384,85 @@ async def _wait_for_ready_signal(signal_path: str, timeout_seconds: int = 300) -
     Raises:
         TimeoutError: If the signal file is not created in time.
     """
-    logger.info(f"Waiting for environment ready signal: {signal_path}")
-    wait_start = time.time()
+    logger.info(f"Waiting for signal file: {signal_path}")
+    wait_time = await wait_for_file(signal_path, timeout_seconds)
+    logger.info(f"Signal file {signal_path} received after {wait_time:.2f}s wait")
 
-    while not os.path.exists(signal_path):
-        elapsed = time.time() - wait_start
-        if elapsed > timeout_seconds:
-            raise TimeoutError(
-                f"Timed out waiting for ready signal after {timeout_seconds}s"
-            )
-        if int(elapsed) % 10 == 0 and int(elapsed) > 0:
-            logger.info(f"  Still waiting for ready signal... ({elapsed:.0f}s)")
-        await asyncio.sleep(0.5)
+    return read_signal_file(signal_path)
+
+
+def _discard_local_export(entry: dict) -> None:
+    """Delete the local file of a speculative export that was never uploaded."""
+    local_path = entry.pop("local_path", None)
+    if local_path:
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+
+
+def _file_digest(paths: list) -> str:
+    """MD5 over the contents of *paths*, in order."""
+    digest = hashlib.md5()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _download_hda(
+    s3_client,
+    input_bucket: str,
+    s3_key: str,
+    data_root: str = None,
+    filename: str = "user_tool.hda",
+) -> str:
+    """Download an HDA from S3 to the session workspace and return its path."""
+    local_hda_path = os.path.join(
+        data_root or os.environ.get("DATA_ROOT", "/tmp"), filename
+    )
 
-    wait_time = time.time() - wait_start
-    logger.info(f"Ready signal received after {wait_time:.2f}s wait")
+    logger.info(f"Downloading HDA from s3://{input_bucket}/{s3_key}")
+    download_start = time.time()
+    s3_client.download_file(input_bucket, s3_key, local_hda_path)
+    download_time = time.time() - download_start
+    logger.info(f"HDA downloaded in {download_time:.2f}s")
 
-    logger.info("Reading configuration from ready signal file...")
-    with open(signal_path) as f:
-        return json.load(f)
+    return local_hda_path
+
+
+async def _prefetch_hda(signal_path: str) -> str:
+    """
+    Download the session's initial HDA while licensing is still running.
+
+    The bootstrapper writes a small prefetch config (bucket, key, region,
+    workspace) to *signal_path* as soon as the instance tags are known,
+    well before the ready signal.
+
+    Returns:
+        Local path of the downloaded HDA, or ``None`` if the session was
+        started without one or the download failed.
+    """
+    try:
+        prefetch = await _wait_for_ready_signal(signal_path, timeout_seconds=None)
+        if not prefetch.get("hda_s3_key"):
+            logger.info("No initial HDA to prefetch")
+            return None
+
+        s3_client = _create_s3_client(prefetch.get("aws_region"))
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            _download_hda,
+            s3_client,
+            prefetch["input_bucket"],
+            prefetch["hda_s3_key"],
+            prefetch.get("data_root"),
+        )
+    except Exception as e:
+        logger.error(f"HDA prefetch failed: {e}")
+        return None
 
 
 def _apply_config_to_env(config: dict) -> None:
@@ -555,7 +1504,7 @@ def _create_runner(config: dict, s3_client) -> "HoudiniRunner":
         SystemExit: If the HIP file fails to load.
     """
     runner = HoudiniRunner(
-        session_id=config["session_id"],
+        session_id=config.get("session_id"),
         session_hip=config.get("session_hip"),
         s3_output_bucket=config["s3_output_bucket"],
         s3_client=s3_client,
@@ -587,23 +1536,64 @@ class RunnerClient:
     - Dispatch incoming commands to the runner on a thread-pool executor.
     - Send back responses and forward pending Houdini logs.
     - Emit periodic heartbeats to keep API Gateway alive during long cooks.
+    - Pre-cook neighbouring parameter values while no command is waiting.
+    - Check the memory budget after each command and warn the browser.
     """
 
     MAX_RETRIES = 10
-    RETRY_DELAY = 2  # seconds
+    INITIAL_RETRY_DELAY = 0.1  # seconds, doubled per attempt
+    RETRY_DELAY = 2  # seconds, upper bound
+    BRIDGE_SIGNAL_TIMEOUT = 120  # seconds
     RECV_TIMEOUT = 0.5  # seconds
+    ANIMATION_POLL_TIMEOUT = 0.01  # seconds, between animation frames
     HEARTBEAT_INTERVAL = 60  # seconds
+    LOG_FLUSH_INTERVAL = 1.0  # seconds, between idle log flushes
+    METRICS_INTERVAL = 10.0  # seconds, between idle metrics pushes
 
-    def __init__(self, runner: HoudiniRunner, ws_url: str):
+    def __init__(
+        self,
+        runner: HoudiniRunner,
+        ws_url: str,
+        bridge_signal: str = None,
+        timeline: StartupTimeline = None,
+    ):
         self._runner = runner
         self._ws_url = ws_url
-
-    async def run(self, start_time: float = None) -> None:
-        """Connect to the handler and enter the message loop."""
+        self._bridge_signal = bridge_signal
+        self._timeline = timeline or StartupTimeline("houdini_runner")
+        self._last_log_flush = 0.0
+        self._last_metrics_push = 0.0
+        # JSON until the browser negotiates a binary encoding
+        self._codec = MessageCodec()
+        self._speculation = None  # running speculative pre-cook, if any
+
+    async def run(self, start_time: float = None, initial_messages=None) -> None:
+        """Connect to the handler and enter the message loop.
+
+        Args:
+            start_time:       Process start time, for the readiness log.
+            initial_messages: Optional awaitable resolving to a list of
+                              messages to push as soon as the bridge is
+                              connected (e.g. a preloaded HDA).
+        """
         start_time = start_time or time.time()
 
         logger.info("=" * 60)
+
+        # Wait until the bridge announces its local server is listening,
+        # so the first connection attempt succeeds
+        if self._bridge_signal:
+            try:
+                waited = await wait_for_file(
+                    self._bridge_signal, self.BRIDGE_SIGNAL_TIMEOUT
+                )
+                self._timeline.record("bridge_listen_wait", waited)
+                logger.info(f"Bridge listening signal received after {waited:.2f}s")
+            except TimeoutError:
+                logger.warning("No bridge listening signal, connecting with retries")
+
         logger.info(f"Connecting to WebSocket handler at {self._ws_url}")
+        retry_delay = self.INITIAL_RETRY_DELAY
 
         for attempt in range(self.MAX_RETRIES):
             try:
@@ -618,22 +1608,28 @@ class RunnerClient:
                         f"Connected to local WebSocket handler "
                         f"in {connect_time:.2f}s"
                     )
+                    self._timeline.record(
+                        "bridge_connect", connect_time, attempts=attempt + 1
+                    )
 
                     total = time.time() - start_time
                     logger.info("=" * 60)
                     logger.info(f"=== HOUDINI RUNNER READY (total: {total:.2f}s) ===")
                     logger.info("=" * 60)
+                    self._timeline.log_summary(logger)
+                    await self._send(ws, self._timeline.to_message())
 
                     self._runner.websocket = ws
-                    await self._message_loop(ws)
+                    await self._message_loop(ws, initial_messages)
                     return  # clean exit
 
             except ConnectionRefusedError:
                 if attempt < self.MAX_RETRIES - 1:
                     logger.warning(
-                        f"Connection refused, retrying in {self.RETRY_DELAY}s..."
+                        f"Connection refused, retrying in {retry_delay:.1f}s..."
                     )
-                    await asyncio.sleep(self.RETRY_DELAY)
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, self.RETRY_DELAY)
                 else:
                     logger.error(
                         "Failed to connect to local WebSocket handler "
@@ -644,35 +1640,67 @@ class RunnerClient:
             except Exception as e:
                 logger.error(f"Error in WebSocket connection: {e}")
                 if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(self.RETRY_DELAY)
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, self.RETRY_DELAY)
                 else:
                     sys.exit(1)
 
     # ------------------------------------------------------------------ #
 
-    async def _message_loop(self, ws) -> None:
+    async def _message_loop(self, ws, initial_messages=None) -> None:
         """Core command receive → execute → respond loop."""
         executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         keepalive = asyncio.create_task(self._keepalive(ws))
 
         try:
+            # Push preloaded results before handling any command, so they
+            # can't interleave with Houdini work triggered by the browser
+            if initial_messages is not None:
+                for msg in await initial_messages:
+                    await self._send(ws, msg)
+                    logger.info(f"Sent initial {msg.get('action') or 'error'}")
+                await self._flush_logs(ws)
+
             while self._runner.running:
                 try:
+                    # While an animation exports, only briefly look for
+                    # commands between its frames
                     message = await asyncio.wait_for(
-                        ws.recv(), timeout=self.RECV_TIMEOUT
+                        ws.recv(),
+                        timeout=(
+                            self.ANIMATION_POLL_TIMEOUT
+                            if self._runner.animation
+                            else self.RECV_TIMEOUT
+                        ),
                     )
 
                     command = json.loads(message)
                     action = command.get("action")
                     logger.info(f"Received command: {action}")
 
+                    # Transport setting, answered in plain JSON before switching
+                    if action == "negotiate_encoding":
+                        codec = MessageCodec.negotiate(
+                            command.get("encodings"), command.get("compression")
+                        )
+                        await self._send(ws, codec.describe())
+                        self._codec = codec
+                        logger.info(
+                            f"Encoding: {codec.encoding}, compression: {codec.compression}"
+                        )
+                        continue
+
+                    # A real command ends speculation; one already cooking
+                    # finishes first (the executor runs one job at a time)
+                    self._runner.speculator.cancel()
+
                     # Run blocking work in a thread to keep WS pings alive
                     loop = asyncio.get_event_loop()
                     result = await loop.run_in_executor(
                         executor, self._runner.process_command, command
                     )
 
-                    await ws.send(json.dumps(result))
+                    await self._send(ws, result)
                     logger.info(f"Sent response for {action}")
 
                     # Auto-export initial geometry after parameter extraction
@@ -685,20 +1713,33 @@ class RunnerClient:
                         geo_result = await loop.run_in_executor(
                             executor, self._runner.export_geometry
                         )
-                        await ws.send(
-                            json.dumps(
-                                {
-                                    "action": "geometry_ready",
-                                    "geometry": geo_result,
-                                }
-                            )
-                        )
+                        await self._send(ws, self._runner.geometry_ready(geo_result))
                         logger.info("Sent initial geometry_ready")
 
+                    # Report a profile once its last update has been sent
+                    if self._runner.profiler and self._runner.profiler.done:
+                        report = await loop.run_in_executor(
+                            executor, self._runner.finish_profile
+                        )
+                        await self._send(ws, report)
+                        logger.info("Sent profile_ready")
+
+                    warning = await loop.run_in_executor(
+                        executor, self._runner.check_memory
+                    )
+                    if warning:
+                        await self._send(ws, warning)
+
+                    await self._push_metrics(ws)
                     await self._flush_logs(ws)
 
                 except asyncio.TimeoutError:
-                    await self._flush_logs(ws)
+                    if self._runner.animation:
+                        await self._animation_step(ws, executor)
+                    else:
+                        self._speculate(executor)
+                    await self._push_metrics(ws, force=False)
+                    await self._flush_logs(ws, force=False)
 
                 except websockets.exceptions.ConnectionClosed:
                     logger.info("WebSocket connection closed")
@@ -709,29 +1750,101 @@ class RunnerClient:
             keepalive.cancel()
             executor.shutdown(wait=False)
 
+    def _speculate(self, executor) -> None:
+        """Start the next speculative pre-cook if idle and none is running."""
+        if self._speculation and not self._speculation.done():
+            return
+        if self._runner.profiler or not self._runner.speculator.has_work():
+            return
+        self._speculation = asyncio.get_event_loop().run_in_executor(
+            executor, self._runner.speculate
+        )
+
+    async def _animation_step(self, ws, executor) -> None:
+        """Export the next animation frame (or finish the animation) and send it."""
+        message = await asyncio.get_event_loop().run_in_executor(
+            executor, self._runner.animation_step
+        )
+        if message:
+            await self._send(ws, message)
+
+    async def _send(self, ws, message: dict) -> None:
+        """Send *message* with the negotiated encoding.
+
+        Messages too large for one API Gateway frame are sent as chunks
+        before this returns, so messages that depend on them (the
+        ``geometry_ready`` after a ``parameters_ready``) stay in order.
+        Only heartbeats, sent from their own task, can fall in between
+        chunks; the browser reassembles by ``message_id``.
+        """
+        frames = encode_frames(message, self._codec)
+        if len(frames) > 1:
+            logger.info(f"Streaming {message.get('action')} as {len(frames)} chunks")
+        for frame in frames:
+            await ws.send(frame)
+            if len(frames) > 1:
+                await asyncio.sleep(0)  # let a heartbeat in between chunks
+
     async def _keepalive(self, ws) -> None:
         """Periodic heartbeat to prevent API Gateway idle disconnect."""
         while self._runner.running:
             await asyncio.sleep(self.HEARTBEAT_INTERVAL)
             try:
-                await ws.send(
-                    json.dumps(
-                        {
-                            "action": "heartbeat",
-                            "timestamp": time.time(),
-                        }
-                    )
-                )
+                await self._send(ws, {"action": "heartbeat", "timestamp": time.time()})
             except Exception:
                 break
 
-    async def _flush_logs(self, ws) -> None:
-        """Forward any queued Houdini log messages to the handler."""
-        for log_msg in self._runner.get_pending_logs():
-            try:
-                await ws.send(json.dumps(log_msg))
-            except Exception as e:
-                logger.error(f"Error sending log: {e}")
+    async def _flush_logs(self, ws, force: bool = True) -> None:
+        """
+        Forward queued Houdini logs to the handler as one ``logs`` message.
+
+        Args:
+            ws:    Connection to the handler.
+            force: Flush even if the last flush was under
+                   ``LOG_FLUSH_INTERVAL`` ago (used after commands, so
+                   their logs arrive with their result).
+        """
+        now = time.time()
+        if not force and now - self._last_log_flush < self.LOG_FLUSH_INTERVAL:
+            return
+        self._last_log_flush = now
+
+        logs = self._runner.get_pending_logs()
+        if not logs:
+            return
+        try:
+            await self._send(ws, logs)
+        except Exception as e:
+            logger.error(f"Error sending logs: {e}")
+
+    async def _push_metrics(self, ws, force: bool = True) -> None:
+        """
+        Push the runner's metrics to the bridge's metrics endpoint.
+
+        Sent as plain JSON whatever the negotiated encoding: the bridge
+        consumes it and does not forward it to the browser.
+
+        Args:
+            ws:    Connection to the handler.
+            force: Push even if the last push was under ``METRICS_INTERVAL``
+                   ago (used after commands).
+        """
+        now = time.time()
+        if not force and now - self._last_metrics_push < self.METRICS_INTERVAL:
+            return
+        self._last_metrics_push = now
+
+        report = self._runner.metrics.drain(
+            log_queue_size=len(self._runner.log_batcher),
+            hython_rss_bytes=process_rss_bytes(),
+            # Sampled on the Houdini thread after the last command
+            sop_cache_bytes=self._runner.memory.sop_cache_bytes,
+            memory_budget_bytes=self._runner.memory.budget_bytes,
+        )
+        try:
+            await ws.send(encode_frame(report))
+        except Exception as e:
+            logger.error(f"Error pushing metrics: {e}")
 
 
 # ======================================================================
@@ -742,38 +1855,81 @@ class RunnerClient:
 async def main():
     """Main entry point — connects to local WebSocket handler."""
     start_time = time.time()
+    timeline = StartupTimeline("houdini_runner", start_time)
     logger.info("=" * 60)
     logger.info("=== HOUDINI RUNNER STARTING ===")
     logger.info("=" * 60)
 
-    # Wait for the entrypoint to finish licensing / env setup
-    ready_signal = os.getenv("HYTHON_READY_SIGNAL", "/tmp/houdini_boot_ready")
-    config = await _wait_for_ready_signal(ready_signal)
-    _apply_config_to_env(config)
-    logger.info(f"Config loaded: {json.dumps(config, indent=2)}")
+    # Start downloading the initial HDA (if any) as soon as the bootstrapper
+    # knows it, overlapping the download with licensing
+    prefetch_signal = os.getenv("HYTHON_PREFETCH_SIGNAL", "/tmp/houdini_hda_prefetch")
+    prefetch_task = asyncio.create_task(_prefetch_hda(prefetch_signal))
+
+    # Wait for the bootstrapper to finish licensing / workspace setup.
+    # The warm config has everything needed to load the session HIP but
+    # no session yet (warm pool instances wait here for a claim).
+    warm_signal = os.getenv("HYTHON_WARM_SIGNAL", "/tmp/houdini_warm")
+    wait_start = time.time()
+    warm_config = await _wait_for_ready_signal(warm_signal)
+    timeline.record_since("warm_signal_wait", wait_start)
 
     # Validate required fields
-    if not config.get("s3_output_bucket"):
+    if not warm_config.get("s3_output_bucket"):
         logger.error("S3_OUTPUT_BUCKET not set. Cannot start.")
         sys.exit(1)
 
+    # Init S3 and Houdini runner
+    s3_client = _create_s3_client(warm_config.get("aws_region"))
+    load_start = time.time()
+    runner = _create_runner(warm_config, s3_client)
+    timeline.record_since("session_hip_load", load_start)
+    write_signal_file(
+        os.getenv("HYTHON_LOADED_SIGNAL", "/tmp/houdini_session_loaded"),
+        {"pid": os.getpid()},
+    )
+
+    # Wait for the session itself
+    ready_signal = os.getenv("HYTHON_READY_SIGNAL", "/tmp/houdini_boot_ready")
+    wait_start = time.time()
+    config = await _wait_for_ready_signal(ready_signal, timeout_seconds=None)
+    timeline.record_since("ready_signal_wait", wait_start)
+    _apply_config_to_env(config)
+    runner.session_id = config["session_id"]
+    logger.info(f"Config loaded: {json.dumps(config, indent=2)}")
+
     local_ws_port = int(config.get("local_ws_port", 7007))
     logger.info(f"Configuration:")
     logger.info(f"  Session ID: {config.get('session_id')}")
     logger.info(f"  Session HIP: {config.get('session_hip')}")
     logger.info(f"  S3 bucket: {config.get('s3_output_bucket')}")
     logger.info(f"  Input bucket: {config.get('input_bucket')}")
+    logger.info(f"  Initial HDA: {config.get('hda_s3_key') or '(none)'}")
     logger.info(f"  Local WebSocket port: {local_ws_port}")
 
-    # Init S3 and Houdini runner
-    s3_client = _create_s3_client(config.get("aws_region"))
-    runner = _create_runner(config, s3_client)
+    # Install the prefetched HDA in the background; results are pushed
+    # as soon as the bridge connection is up
+    initial_messages = None
+    if config.get("hda_s3_key"):
+        prefetch_start = time.time()
+        local_hda_path = await prefetch_task
+        timeline.record_since("hda_prefetch_wait", prefetch_start)
+        loop = asyncio.get_event_loop()
+        initial_messages = loop.run_in_executor(
+            None, runner.preload_hda, local_hda_path, config["hda_s3_key"]
+        )
+    else:
+        prefetch_task.cancel()
 
     # Connect and run
-    client = RunnerClient(runner, f"ws://127.0.0.1:{local_ws_port}")
+    client = RunnerClient(
+        runner,
+        f"ws://127.0.0.1:{local_ws_port}",
+        bridge_signal=os.getenv("BRIDGE_READY_SIGNAL", "/tmp/aurora_bridge_listening"),
+        timeline=timeline,
+    )
 
     try:
-        await client.run(start_time=start_time)
+        await client.run(start_time=start_time, initial_messages=initial_messages)
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
 
@@ -0,0 +1,104 @@
+"""
+Batched, rate-limited forwarding of Houdini log entries.
+
+Houdini's log callback can fire thousands of times per cook. Instead of
+one WebSocket frame (and one API Gateway message + Lambda invocation)
+per entry, entries are collected in a bounded buffer and drained as a
+single ``logs`` message per flush:
+
+- Identical entries (same level, context and message) are merged into
+  one entry with a ``count``.
+- ``info`` and ``warning`` entries are sampled once their per-flush
+  budget is spent; errors and system messages are always kept.
+- The buffer holds at most ``max_entries`` distinct entries; the oldest
+  are evicted when it is full.
+
+Sampled-out and evicted entries are reported per level in ``dropped`` so
+the browser can show that output was suppressed.
+
+This module has no ``hou`` dependency.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+MAX_BUFFERED_ENTRIES = 500
+
+# Distinct entries forwarded per flush before sampling kicks in, and the
+# sampling rate (keep 1 in N) after that. Levels not listed are never sampled.
+SAMPLE_BUDGETS = {"info": 50, "warning": 100}
+SAMPLE_EVERY = {"info": 20, "warning": 10}
+
+
+class LogBatcher:
+    """Thread-safe buffer of log entries, drained as ``logs`` messages."""
+
+    def __init__(self, max_entries: int = MAX_BUFFERED_ENTRIES):
+        self.max_entries = max_entries
+        # Houdini calls the log callback from whichever thread is cooking
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._seen: Dict[str, int] = {}
+        self._dropped: Dict[str, int] = {}
+
+    def add(self, level: str, message: str, context: str = "") -> None:
+        """Buffer one log entry."""
+        key = (level, context, message)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry["count"] += 1
+                entry["last_timestamp"] = now
+                return
+
+            seen = self._seen.get(level, 0) + 1
+            self._seen[level] = seen
+            budget = SAMPLE_BUDGETS.get(level)
+            if budget is not None and seen > budget:
+                if (seen - budget) % SAMPLE_EVERY[level]:
+                    self._drop(level)
+                    return
+
+            if len(self._entries) >= self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._drop(evicted["level"], evicted["count"])
+
+            self._entries[key] = {
+                "level": level,
+                "message": message,
+                "context": context,
+                "timestamp": now,
+                "count": 1,
+            }
+
+    def __len__(self) -> int:
+        """Number of distinct entries currently buffered."""
+        return len(self._entries)
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        """
+        Take everything buffered since the last drain.
+
+        Returns:
+            A ``logs`` message, or None if nothing was logged.
+        """
+        with self._lock:
+            if not self._entries and not self._dropped:
+                return None
+            entries = list(self._entries.values())
+            dropped = self._dropped
+            self._entries = OrderedDict()
+            self._seen = {}
+            self._dropped = {}
+
+        message = {"action": "logs", "entries": entries}
+        if dropped:
+            message["dropped"] = dropped
+        return message
+
+    def _drop(self, level: str, count: int = 1) -> None:
+        self._dropped[level] = self._dropped.get(level, 0) + count
@@ -0,0 +1,218 @@
+"""
+Memory budget of a long-running interactive session.
+
+After each command the runner's :class:`MemoryManager` samples the hython
+resident memory and the size of Houdini's SOP cache, and compares the
+resident memory with the session's budget:
+
+- above ``WARN_FRACTION`` of the budget the browser is warned (once per
+  excursion) that updates may slow down,
+- above ``RECLAIM_FRACTION`` memory is reclaimed, cheapest first: the
+  SOP cache is cleared, then the cooked data of the HDA instances idle
+  the longest is unloaded (they re-cook on their next update), then HDA
+  libraries without instances are uninstalled.
+
+The budget is ``MEMORY_BUDGET_MB`` if set, otherwise ``DEFAULT_BUDGET_FRACTION``
+of the process's data limit (the slot's memory cap, see ``bootstrap``) or
+of physical memory.
+"""
+
+import logging
+import os
+import re
+import resource
+import time
+from typing import Any, Dict, List, Optional
+
+import hou
+
+from session_metrics import process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_FRACTION = 0.85
+WARN_FRACTION = 0.75
+RECLAIM_FRACTION = 0.9
+
+# Minimum time between two reclaim rounds; freed memory is not always
+# returned to the OS at once, so RSS can stay high right after one
+RECLAIM_INTERVAL = 30  # seconds
+
+# Only libraries the runner downloaded are uninstalled
+SESSION_LIBRARY_PREFIX = "user_tool"
+
+_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1024,
+    "kb": 1024,
+    "m": 1024 ** 2,
+    "mb": 1024 ** 2,
+    "g": 1024 ** 3,
+    "gb": 1024 ** 3,
+}
+
+
+def memory_limit_bytes() -> int:
+    """The process's data limit, or physical memory when uncapped (0 if unknown)."""
+    soft, _ = resource.getrlimit(resource.RLIMIT_DATA)
+    if soft not in (resource.RLIM_INFINITY, -1):
+        return soft
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def sop_cache_bytes() -> int:
+    """
+    Memory held by the SOP cache, from ``sopcache -l`` (0 if unknown).
+
+    The listing is free text that differs between Houdini versions; the
+    first size on a line mentioning current or used memory is taken.
+    """
+    try:
+        output, _ = hou.hscript("sopcache -l")
+    except Exception:
+        return 0
+    for line in output.splitlines():
+        lowered = line.lower()
+        if "current" not in lowered and "used" not in lowered:
+            continue
+        match = re.search(r"([\d.]+)\s*([kmg]?b?)\b", lowered)
+        if match:
+            return int(float(match.group(1)) * _UNITS.get(match.group(2), 1))
+    return 0
+
+
+class MemoryManager:
+    """Samples session memory and keeps it under a budget."""
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        if budget_bytes is None and os.environ.get("MEMORY_BUDGET_MB"):
+            budget_bytes = int(os.environ["MEMORY_BUDGET_MB"]) * 1024 * 1024
+        self.budget_bytes = budget_bytes or int(memory_limit_bytes() * DEFAULT_BUDGET_FRACTION)
+        self.rss_bytes = 0
+        self.sop_cache_bytes = 0
+        self._last_used: Dict[str, float] = {}
+        self._last_reclaim = 0.0
+        self._warned = False
+        logger.info(f"Memory budget: {self.budget_bytes / 1024 ** 2:.0f} MB")
+
+    def touch(self, instance: Optional[str]) -> None:
+        """Mark an HDA instance as just used."""
+        if instance:
+            self._last_used[instance] = time.time()
+
+    def forget(self, instance: Optional[str] = None) -> None:
+        """Stop tracking an instance (all of them when None)."""
+        if instance is None:
+            self._last_used.clear()
+        else:
+            self._last_used.pop(instance, None)
+
+    def sample(self) -> None:
+        """Update :attr:`rss_bytes` and :attr:`sop_cache_bytes`."""
+        self.rss_bytes = process_rss_bytes()
+        self.sop_cache_bytes = sop_cache_bytes()
+
+    def check(self, instances: Dict[str, "hou.Node"], active: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Sample memory and enforce the budget.
+
+        Args:
+            instances: Loaded HDA instance nodes by id.
+            active:    Id of the instance in use (never unloaded).
+
+        Returns:
+            A ``memory_warning`` message for the browser, or None.
+        """
+        self.sample()
+        if not self.budget_bytes:
+            return None
+
+        reclaimed: List[str] = []
+        now = time.time()
+        if (
+            self.rss_bytes > self.budget_bytes * RECLAIM_FRACTION
+            and now - self._last_reclaim > RECLAIM_INTERVAL
+        ):
+            self._last_reclaim = now
+            reclaimed = self._reclaim(instances, active)
+            self.sample()
+
+        fraction = self.rss_bytes / self.budget_bytes
+        if fraction < WARN_FRACTION:
+            self._warned = False
+            return None
+        if self._warned and not reclaimed:
+            return None
+        self._warned = True
+
+        message = (
+            f"Houdini is using {self.rss_bytes / 1024 ** 2:.0f} MB of its "
+            f"{self.budget_bytes / 1024 ** 2:.0f} MB memory budget; updates may slow down"
+        )
+        logger.warning(message)
+        return {
+            "action": "memory_warning",
+            "rss_bytes": self.rss_bytes,
+            "sop_cache_bytes": self.sop_cache_bytes,
+            "budget_bytes": self.budget_bytes,
+            "fraction": round(fraction, 3),
+            "reclaimed": reclaimed,
+            "message": message,
+        }
+
+    def _reclaim(self, instances: Dict[str, "hou.Node"], active: Optional[str]) -> List[str]:
+        """Free memory, cheapest first, until under the reclaim threshold."""
+        reclaimed = []
+        target = self.budget_bytes * RECLAIM_FRACTION
+
+        _, error = hou.hscript("sopcache -c")
+        if not error:
+            reclaimed.append(f"cleared SOP cache ({self.sop_cache_bytes / 1024 ** 2:.0f} MB)")
+        self.sample()
+
+        idle = sorted(
+            (instance for instance in instances if instance != active),
+            key=lambda instance: self._last_used.get(instance, 0.0),
+        )
+        for instance in idle:
+            if self.rss_bytes <= target:
+                break
+            try:
+                _, error = hou.hscript(f'opunload -R "{instances[instance].path()}"')
+            except hou.ObjectWasDeleted:
+                continue
+            if not error:
+                reclaimed.append(f"unloaded {instance}")
+            self.sample()
+
+        if self.rss_bytes > target:
+            reclaimed += self._uninstall_unused_libraries()
+
+        logger.warning(f"Memory over {RECLAIM_FRACTION:.0%} of budget, reclaimed: {reclaimed}")
+        return reclaimed
+
+    def _uninstall_unused_libraries(self) -> List[str]:
+        """Uninstall downloaded HDA libraries none of whose types has instances."""
+        uninstalled = []
+        for path in hou.hda.loadedFiles():
+            if not os.path.basename(path).startswith(SESSION_LIBRARY_PREFIX):
+                continue
+            try:
+                in_use = any(
+                    definition.nodeType() and definition.nodeType().instances()
+                    for definition in hou.hda.definitionsInFile(path)
+                )
+                if not in_use:
+                    hou.hda.uninstallFile(path)
+                    uninstalled.append(f"uninstalled {os.path.basename(path)}")
+            except hou.OperationFailed as e:
+                logger.warning(f"Could not uninstall {path}: {e}")
+        return uninstalled
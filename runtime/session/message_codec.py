@@ -0,0 +1,104 @@
+"""
+Negotiated binary encoding for runner → browser messages.
+
+JSON text stays the default. Once the browser sends
+``negotiate_encoding`` with the encodings and compressions it can
+decode, the runner answers ``encoding_selected`` and encodes every
+following message as::
+
+    <encoding id: 1 byte> <compression id: 1 byte> <body>
+
+The body is MessagePack (when the ``msgpack`` package is available) or
+UTF-8 JSON, deflated (zlib format) when it is large enough to be worth
+it. The bridge forwards these bytes as binary frames on the direct
+channel and base64-wrapped in a small JSON envelope through API Gateway
+(see ``wrap_encoded``), so the routing Lambda keeps reading
+``session_id`` / ``action`` as JSON.
+
+Byte strings (such as inline GLB geometry) are MessagePack ``bin``
+values; the JSON encoding carries them as base64 strings (see
+``json_default``).
+
+The browser-side decoder is ``webapp/aurora/codec.js``.
+
+This module has no ``hou`` dependency.
+"""
+
+import base64
+import json
+import zlib
+from typing import Any, Dict, Iterable, List
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODING_IDS = {"json": 0, "msgpack": 1}
+COMPRESSION_IDS = {"none": 0, "deflate": 1}
+
+# Bodies below this size aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 6
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook that encodes byte strings as base64 text."""
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def supported_encodings() -> List[str]:
+    """Encodings this process can produce, most compact first."""
+    return ["msgpack", "json"] if msgpack else ["json"]
+
+
+class MessageCodec:
+    """Encoding (and compression) agreed with the browser."""
+
+    def __init__(self, encoding: str = "json", compression: str = "none"):
+        self.encoding = encoding
+        self.compression = compression
+
+    @classmethod
+    def negotiate(
+        cls, encodings: Iterable[str], compressions: Iterable[str]
+    ) -> "MessageCodec":
+        """Pick the most compact encoding and compression both sides support."""
+        encodings = set(encodings or ())
+        encoding = next((e for e in supported_encodings() if e in encodings), "json")
+        compression = "deflate" if "deflate" in set(compressions or ()) else "none"
+        return cls(encoding, compression)
+
+    @property
+    def binary(self) -> bool:
+        """Whether messages are sent as encoded bytes rather than JSON text."""
+        return self.encoding != "json" or self.compression != "none"
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the ``encoding_selected`` message for this codec."""
+        return {
+            "action": "encoding_selected",
+            "encoding": self.encoding,
+            "compression": self.compression,
+        }
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """Encode *message*, compressing it if it is large enough."""
+        if self.encoding == "msgpack":
+            body = msgpack.packb(message, use_bin_type=True)
+        else:
+            body = json.dumps(message, default=json_default).encode("utf-8")
+
+        compression = "none"
+        if self.compression == "deflate" and len(body) >= COMPRESS_MIN_BYTES:
+            body = zlib.compress(body, COMPRESS_LEVEL)
+            compression = "deflate"
+
+        return bytes((ENCODING_IDS[self.encoding], COMPRESSION_IDS[compression])) + body
+
+
+def wrap_encoded(payload: bytes, **fields: Any) -> str:
+    """Wrap an encoded payload in a JSON text envelope for API Gateway."""
+    return json.dumps({**fields, "encoded": base64.b64encode(payload).decode("ascii")})
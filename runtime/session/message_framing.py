@@ -0,0 +1,129 @@
+"""
+Framing for messages between the Houdini runner and the WebSocket bridge.
+
+The runner sends each message as a small JSON header line followed by
+the JSON payload::
+
+    {"action": "parameters_ready"}\\n{"action": "parameters_ready", ...}
+
+The bridge reads only the header (for logging and routing) and forwards
+the payload bytes untouched, splicing the routing metadata
+(``session_id``, ``timestamp``) into the front of the payload object
+instead of decoding and re-encoding it. ``json.dumps`` never emits a raw
+newline, so the first newline always ends the header.
+
+Once a binary encoding is negotiated (see ``message_codec``) the frame is
+sent as bytes: the same JSON header line followed by the encoded payload.
+
+Payloads above ``MAX_PAYLOAD_BYTES`` (API Gateway accepts at most 128 KB
+per message), or ``MAX_BINARY_PAYLOAD_BYTES`` for binary ones, are split
+into ``chunk`` messages::
+
+    {"action": "chunk", "message_id": "...", "seq": 0, "total": 3,
+     "offset": 0, "size": 150000, "binary": false, "data": "<base64>"}
+
+Each chunk is an ordinary JSON text frame, so the bridge and the routing
+Lambda forward it like any other message; the browser reassembles the
+payload and decodes it as if it had arrived whole. The last chunk also
+carries the message's ``request_id`` (in its header too), so the bridge
+sees a chunked reply complete exactly once.
+
+This module has no ``hou`` dependency.
+"""
+
+import base64
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from message_codec import MessageCodec, json_default
+
+HEADER_SEPARATOR = "\n"
+
+# Payload keys copied into the header
+HEADER_KEYS = ("action", "status", "error", "request_id")
+
+# Largest payload sent in one frame. Chunk data is base64 (4/3 larger) and
+# the bridge adds metadata, which must still fit API Gateway's 128 KB.
+MAX_PAYLOAD_BYTES = 64 * 1024
+CHUNK_BYTES = 48 * 1024
+
+# Binary payloads reach API Gateway base64-wrapped by the bridge (see
+# ``message_codec.wrap_encoded``); below this size the envelope stays under
+# the routing Lambda's MAX_PAYLOAD_BYTES, so it is never chunked a second time
+ENVELOPE_RESERVE_BYTES = 1024
+MAX_BINARY_PAYLOAD_BYTES = MAX_PAYLOAD_BYTES * 3 // 4 - ENVELOPE_RESERVE_BYTES
+
+
+def encode_frame(
+    message: Dict[str, Any], codec: Optional[MessageCodec] = None
+) -> Union[str, bytes]:
+    """Serialize *message* as a header line + payload frame.
+
+    Returns bytes when *codec* uses a binary encoding, text otherwise.
+    """
+    header = json.dumps({key: message[key] for key in HEADER_KEYS if key in message})
+    if codec and codec.binary:
+        return header.encode("utf-8") + HEADER_SEPARATOR.encode() + codec.encode(message)
+    return header + HEADER_SEPARATOR + json.dumps(message, default=json_default)
+
+
+def split_frame(frame: Union[str, bytes]) -> Tuple[Dict[str, Any], Union[str, bytes]]:
+    """
+    Split a frame into its decoded header and raw payload.
+
+    Frames without a header (plain JSON) are returned with an empty header.
+    """
+    separator = HEADER_SEPARATOR.encode() if isinstance(frame, bytes) else HEADER_SEPARATOR
+    header, found, payload = frame.partition(separator)
+    if not found:
+        return {}, frame
+    return json.loads(header), payload
+
+
+def add_metadata(payload: str, **fields: Any) -> str:
+    """
+    Prepend *fields* to a JSON object payload without decoding it.
+
+    Keys already in the payload win, as with ``{**fields, **payload}``,
+    because JSON parsers keep the last duplicate key.
+    """
+    body = payload.lstrip()[1:]
+    prefix = ", ".join(
+        f"{json.dumps(key)}: {json.dumps(value)}" for key, value in fields.items()
+    )
+    separator = "" if body.lstrip().startswith("}") else ", "
+    return "{" + prefix + separator + body
+
+
+def encode_frames(
+    message: Dict[str, Any], codec: Optional[MessageCodec] = None
+) -> List[Union[str, bytes]]:
+    """Frame *message*, splitting it into ``chunk`` frames if it is too large."""
+    frame = encode_frame(message, codec)
+    limit = MAX_BINARY_PAYLOAD_BYTES if isinstance(frame, bytes) else MAX_PAYLOAD_BYTES
+    if len(frame) <= limit:
+        return [frame]
+
+    _, payload = split_frame(frame)
+    binary = isinstance(payload, bytes)
+    data = payload if binary else payload.encode("utf-8")
+    message_id = uuid.uuid4().hex
+    offsets = range(0, len(data), CHUNK_BYTES)
+
+    frames = []
+    for seq, offset in enumerate(offsets):
+        chunk = {
+            "action": "chunk",
+            "message_id": message_id,
+            "seq": seq,
+            "total": len(offsets),
+            "offset": offset,
+            "size": len(data),
+            "binary": binary,
+            "data": base64.b64encode(data[offset : offset + CHUNK_BYTES]).decode("ascii"),
+        }
+        if seq == len(offsets) - 1 and "request_id" in message:
+            chunk["request_id"] = message["request_id"]
+        frames.append(encode_frame(chunk))
+    return frames
@@ -0,0 +1,116 @@
+"""
+Per-request latency breakdown for session commands.
+
+The browser tags each command with a ``request_id`` and its send time
+(``sent_at``). Every hop adds what it can measure on its own clock:
+
+- the routing Lambda adds ``route_ms`` (its handling time),
+- the bridge adds ``bridge_received_at``,
+- the runner measures queue wait (bridge receipt → execution start) and
+  the stages of the command itself (parm set, cook, ROP render, upload,
+  presign).
+
+The runner's response carries the same ``request_id`` and a ``timings``
+object::
+
+    {"stages": {"route": 12.1, "queue_wait": 0.4, "parm_set": 0.2,
+                "cook": 85.0, "render": 40.3, "upload": 61.7, "presign": 1.2},
+     "completed_at": 1700000000.123}
+
+Stage durations are in milliseconds. The bridge's ``timestamp`` minus
+``completed_at`` gives the forward time; the browser adds the round trip
+and keeps per-session percentiles (``webapp/aurora/session.js``).
+
+:class:`UpdateBudget` keeps moving averages of the cook, export and
+upload times of the current HDA and turns them into the
+``update_budget`` advertised in every ``geometry_ready``, which the
+browser uses to pace parameter updates.
+
+This module has no ``hou`` dependency.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+# Weight of the newest sample in the moving averages
+BUDGET_SMOOTHING = 0.3
+
+# Bounds of the recommended trailing-edge debounce
+MIN_DEBOUNCE_MS = 30
+MAX_DEBOUNCE_MS = 1000
+
+
+class RequestTimer:
+    """Stage timings for one command, keyed by its ``request_id``."""
+
+    def __init__(self, command: Dict[str, Any]):
+        self.request_id: Optional[str] = command.get("request_id")
+        self.started = time.time()
+        self.stages: Dict[str, float] = {}
+
+        if command.get("route_ms") is not None:
+            self.stages["route"] = float(command["route_ms"]) / 1000
+        if command.get("bridge_received_at"):
+            self.add("queue_wait", max(0.0, self.started - command["bridge_received_at"]))
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add *seconds* to *stage* (stages may be entered more than once)."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def summary(self) -> str:
+        """One-line breakdown for the log."""
+        return ", ".join(f"{stage}: {seconds:.3f}s" for stage, seconds in self.stages.items())
+
+    def attach(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return *result* tagged with the request id and its timings."""
+        if not self.request_id:
+            return result
+        return {
+            **result,
+            "request_id": self.request_id,
+            "timings": {
+                "stages": {
+                    stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()
+                },
+                "completed_at": time.time(),
+            },
+        }
+
+
+class UpdateBudget:
+    """Moving averages of update cost, advertised as an ``update_budget``."""
+
+    def __init__(self):
+        self.averages: Dict[str, float] = {}  # seconds, by phase
+
+    def reset(self) -> None:
+        """Forget the averages (e.g. when a different HDA is loaded)."""
+        self.averages = {}
+
+    def observe(self, cook: float, export: float, upload: float) -> None:
+        """Add the phase times (seconds) of one export."""
+        for phase, seconds in (("cook", cook), ("export", export), ("upload", upload)):
+            previous = self.averages.get(phase)
+            self.averages[phase] = (
+                seconds
+                if previous is None
+                else previous + BUDGET_SMOOTHING * (seconds - previous)
+            )
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Return the budget for the browser.
+
+        ``min_interval_ms`` is the average cost of one update (the rate the
+        runner can sustain); ``debounce_ms`` how long the browser should
+        wait for the user to settle before sending; ``preview_lod`` whether
+        updates are exported at a reduced preview level of detail (not
+        implemented yet, so always false).
+        """
+        total_ms = sum(self.averages.values()) * 1000
+        return {
+            "min_interval_ms": round(total_ms),
+            "debounce_ms": round(min(MAX_DEBOUNCE_MS, max(MIN_DEBOUNCE_MS, total_ms / 2))),
+            "preview_lod": False,
+            **{f"{phase}_ms": round(seconds * 1000, 1) for phase, seconds in self.averages.items()},
+        }
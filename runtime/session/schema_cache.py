@@ -0,0 +1,153 @@
+"""
+HDA parameter schema cache.
+
+Walking a large ``parmTemplateGroup`` is slow, and the resulting schema
+only depends on the HDA definition. This module caches schemas keyed by
+definition (see :func:`hda_utils.hda_definition_key`):
+
+- In memory, for repeat loads within the same session.
+- As a JSON sidecar in S3, so later sessions can reuse the schema
+  without walking the templates again.
+
+Schemas are stored with parameter paths relative to the HDA node, so a
+cached schema can be rebased onto whichever node it is applied to.
+
+The offline HDA indexer (``runtime/batch/hda_indexer.py``) publishes
+into the same S3 layout, along with a default-state preview GLB and an
+index keyed by the MD5 of the HDA file (the ETag of a single-part S3
+upload), so the WebSocket Lambda can find a schema before any session
+instance is running.
+
+This module has no ``hou`` or ``boto3`` dependency.
+"""
+
+import copy
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# S3 prefix for schema sidecars (in the session output bucket)
+SCHEMA_PREFIX = "hda_schemas"
+
+# Bump when the schema layout produced by extract_hda_parameters changes
+SCHEMA_FORMAT_VERSION = 1
+
+
+def schema_s3_key(definition_key: str) -> str:
+    """Return the S3 key of the sidecar JSON for *definition_key*."""
+    return f"{SCHEMA_PREFIX}/v{SCHEMA_FORMAT_VERSION}/{definition_key}.json"
+
+
+def preview_s3_key(definition_key: str) -> str:
+    """Return the S3 key of the default-state preview GLB for *definition_key*."""
+    return f"{SCHEMA_PREFIX}/v{SCHEMA_FORMAT_VERSION}/{definition_key}.glb"
+
+
+def content_index_s3_key(file_md5: str) -> str:
+    """Return the S3 key of the index entry for an HDA file with MD5 *file_md5*."""
+    return f"{SCHEMA_PREFIX}/v{SCHEMA_FORMAT_VERSION}/by_md5/{file_md5}.json"
+
+
+def to_relative_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip the HDA node path from every parameter key in *schema*."""
+    node_path = schema.get("hda_node_path", "")
+    prefix = node_path + "/"
+    relative = copy.deepcopy(schema)
+    relative["parameters"] = {
+        (path[len(prefix):] if path.startswith(prefix) else path): entry
+        for path, entry in schema.get("parameters", {}).items()
+    }
+    relative.pop("hda_node_path", None)
+    return relative
+
+
+def to_absolute_schema(schema: Dict[str, Any], node_path: str) -> Dict[str, Any]:
+    """Rebase a relative schema onto the HDA node at *node_path*."""
+    absolute = copy.deepcopy(schema)
+    absolute["hda_node_path"] = node_path
+    absolute["parameters"] = {
+        f"{node_path}/{name}": entry
+        for name, entry in schema.get("parameters", {}).items()
+    }
+    return absolute
+
+
+class SchemaCache:
+    """
+    Two-level (memory + S3) cache of HDA parameter schemas.
+
+    S3 access is best-effort: any failure is logged and treated as a
+    cache miss, so a missing bucket or permission never blocks loading
+    an HDA.
+    """
+
+    def __init__(self, s3_client=None, bucket: Optional[str] = None):
+        self._s3_client = s3_client
+        self._bucket = bucket
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, definition_key: str, node_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a schema and rebase it onto *node_path*.
+
+        Returns:
+            The schema dict, or ``None`` on a miss.
+        """
+        relative = self._memory.get(definition_key)
+        source = "memory"
+
+        if relative is None:
+            relative = self._load_from_s3(definition_key)
+            source = "s3"
+            if relative is not None:
+                self._memory[definition_key] = relative
+
+        if relative is None:
+            logger.info(f"Schema cache miss: {definition_key}")
+            return None
+
+        logger.info(f"Schema cache hit ({source}): {definition_key}")
+        return to_absolute_schema(relative, node_path)
+
+    def put(self, definition_key: str, schema: Dict[str, Any]) -> None:
+        """Store *schema* in memory and upload it as an S3 sidecar."""
+        relative = to_relative_schema(schema)
+        self._memory[definition_key] = relative
+        self._save_to_s3(definition_key, relative)
+
+    # ------------------------------------------------------------------ #
+
+    def _load_from_s3(self, definition_key: str) -> Optional[Dict[str, Any]]:
+        if not self._s3_client or not self._bucket:
+            return None
+
+        key = schema_s3_key(definition_key)
+        try:
+            response = self._s3_client.get_object(Bucket=self._bucket, Key=key)
+            return json.loads(response["Body"].read())
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring corrupt schema sidecar s3://{self._bucket}/{key}: {e}")
+        except Exception as e:
+            # Without s3:ListBucket a missing key surfaces as AccessDenied
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code not in ("NoSuchKey", "AccessDenied", "404", "403"):
+                logger.warning(f"Failed to read schema sidecar s3://{self._bucket}/{key}: {e}")
+        return None
+
+    def _save_to_s3(self, definition_key: str, relative: Dict[str, Any]) -> None:
+        if not self._s3_client or not self._bucket:
+            return
+
+        key = schema_s3_key(definition_key)
+        try:
+            self._s3_client.put_object(
+                Bucket=self._bucket,
+                Key=key,
+                Body=json.dumps(relative).encode("utf-8"),
+                ContentType="application/json",
+            )
+            logger.info(f"Uploaded schema sidecar: s3://{self._bucket}/{key}")
+        except Exception as e:
+            logger.warning(f"Failed to upload schema sidecar: {e}")
@@ -0,0 +1,187 @@
+"""
+Live performance metrics of a session, in Prometheus text format.
+
+The bridge owns a :class:`SessionMetrics` registry and serves it on a
+localhost HTTP endpoint (``METRICS_PORT``) for a CloudWatch agent or any
+Prometheus scraper. It counts what it forwards itself; the runner
+collects its own observations in a :class:`MetricsReport` and pushes
+them over the local WebSocket as plain JSON ``metrics`` messages::
+
+    {"action": "metrics",
+     "observations": [["cook_seconds", 0.84, {}],
+                      ["command_seconds", 1.2, {"action": "update_parameter"}]],
+     "gauges": {"log_queue_size": 12, "hython_rss_bytes": 2147483648,
+                "sop_cache_bytes": 536870912, "memory_budget_bytes": 13958643712}}
+
+The bridge applies these and does not forward them to the browser.
+
+This module has no ``hou`` dependency.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+METRIC_PREFIX = "aurora_session_"
+
+# name -> (help, bucket upper bounds)
+HISTOGRAMS = {
+    "command_seconds": (
+        "Time to process a command in the runner",
+        (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    ),
+    "cook_seconds": (
+        "HDA cook time",
+        (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    ),
+    "export_bytes": (
+        "Size of exported geometry",
+        (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6),
+    ),
+    "upload_bytes_per_second": (
+        "S3 upload throughput of exported geometry",
+        (1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6),
+    ),
+}
+
+# name -> help
+COUNTERS = {
+    "forwarded_messages_total": "Messages forwarded by the bridge",
+    "forwarded_bytes_total": "Payload bytes forwarded by the bridge",
+    "reconnects_total": "Connections re-established after the first",
+}
+
+GAUGES = {
+    "queue_depth": "Commands forwarded to the runner and not yet answered",
+    "log_queue_size": "Distinct log entries buffered in the runner",
+    "hython_rss_bytes": "Resident memory of the hython process",
+    "sop_cache_bytes": "Memory held by Houdini's SOP cache",
+    "memory_budget_bytes": "Memory budget of the hython process",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, Any]]) -> Labels:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def process_rss_bytes() -> int:
+    """Resident memory of this process (0 where ``/proc`` is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class SessionMetrics:
+    """Registry of the bridge's counters, gauges and histograms."""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[Labels, float]] = {name: {} for name in COUNTERS}
+        self._gauges: Dict[str, Dict[Labels, float]] = {name: {} for name in GAUGES}
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {
+            name: {} for name in HISTOGRAMS
+        }
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increment a counter."""
+        series = self._counters[name]
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge."""
+        self._gauges[name][_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one observation in a histogram."""
+        buckets = HISTOGRAMS[name][1]
+        state = self._histograms[name].setdefault(
+            _labels(labels), [0] * len(buckets) + [0.0, 0]
+        )
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def apply_report(self, report: Dict[str, Any]) -> None:
+        """Apply a runner ``metrics`` message; unknown names are ignored."""
+        for name, value, labels in report.get("observations", ()):
+            if name in HISTOGRAMS:
+                self.observe(name, value, **labels)
+        for name, value in (report.get("gauges") or {}).items():
+            if name in GAUGES:
+                self.set(name, value)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        for name, series in self._counters.items():
+            lines += [
+                f"# HELP {METRIC_PREFIX}{name} {COUNTERS[name]}",
+                f"# TYPE {METRIC_PREFIX}{name} counter",
+            ]
+            for labels, value in series.items():
+                lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, series in self._gauges.items():
+            lines += [
+                f"# HELP {METRIC_PREFIX}{name} {GAUGES[name]}",
+                f"# TYPE {METRIC_PREFIX}{name} gauge",
+            ]
+            for labels, value in series.items():
+                lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, series in self._histograms.items():
+            help_text, buckets = HISTOGRAMS[name]
+            metric = METRIC_PREFIX + name
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for labels, state in series.items():
+                for bound, count in zip(buckets, state):
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{metric}_bucket{_format_labels(labels, le)} {count}")
+                inf = (("le", "+Inf"),)
+                lines.append(f"{metric}_bucket{_format_labels(labels, inf)} {state[-1]}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {state[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsReport:
+    """Thread-safe buffer of runner observations, drained as ``metrics`` messages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._observations: List[Tuple[str, float, Dict[str, Any]]] = []
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Buffer one histogram observation."""
+        with self._lock:
+            self._observations.append((name, value, labels))
+
+    def drain(self, **gauges: float) -> Dict[str, Any]:
+        """Take the buffered observations as a ``metrics`` message with *gauges*."""
+        with self._lock:
+            observations, self._observations = self._observations, []
+        return {"action": "metrics", "observations": observations, "gauges": gauges}
@@ -0,0 +1,134 @@
+"""
+Signal-file hand-off between the session bootstrapper, bridge and runner.
+
+Boot stages communicate through small JSON files (ready signal, HDA
+prefetch signal, bridge-listening signal). Writers publish them
+atomically (write to ``<path>.tmp`` then rename); readers wait for them
+with inotify so they wake up the moment the file appears instead of
+polling. If inotify is unavailable (non-Linux), waiting falls back to
+polling.
+
+This module has no ``hou`` dependency.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+POLL_INTERVAL = 0.5  # seconds, fallback only
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # noqa: B018 — raises AttributeError if missing
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+def write_signal_file(path: str, data: dict) -> None:
+    """Atomically publish *data* as JSON at *path*."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_signal_file(path: str) -> dict:
+    """Read a JSON signal file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+async def wait_for_file(path: str, timeout_seconds: Optional[float] = None) -> float:
+    """
+    Wait until *path* exists.
+
+    Args:
+        path:            File to wait for.
+        timeout_seconds: Max seconds to wait, or ``None`` to wait forever.
+
+    Returns:
+        Seconds spent waiting.
+
+    Raises:
+        TimeoutError: If the file does not appear in time.
+    """
+    wait_start = time.time()
+    if os.path.exists(path):
+        return 0.0
+
+    waiter = _wait_inotify(path) if _libc else None
+    if waiter is None:
+        waiter = _wait_poll(path)
+
+    try:
+        await asyncio.wait_for(waiter, timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        raise TimeoutError(
+            f"Timed out waiting for {path} after {timeout_seconds}s"
+        ) from None
+
+    return time.time() - wait_start
+
+
+def _wait_inotify(path: str):
+    """Return an awaitable that resolves when *path* appears, or ``None``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+
+    mask = _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE
+    if _libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+        os.close(fd)
+        return None
+
+    return _inotify_loop(fd, path)
+
+
+async def _inotify_loop(fd: int, path: str) -> None:
+    loop = asyncio.get_event_loop()
+    appeared = loop.create_future()
+
+    def on_readable():
+        # Drain the events; the file check below is the source of truth
+        try:
+            os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        if os.path.exists(path) and not appeared.done():
+            appeared.set_result(None)
+
+    loop.add_reader(fd, on_readable)
+    try:
+        # The file may have been created before the watch was added
+        if os.path.exists(path):
+            return
+        await appeared
+    finally:
+        loop.remove_reader(fd)
+        os.close(fd)
+
+
+async def _wait_poll(path: str) -> None:
+    while not os.path.exists(path):
+        await asyncio.sleep(POLL_INTERVAL)
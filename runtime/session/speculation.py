@@ -0,0 +1,168 @@
+"""
+Speculative pre-cooking of neighbouring parameter values.
+
+For menus, toggles and small integer ranges the next state the user
+picks is one of very few: the adjacent menu item, the flipped toggle, the
+value one step up or down. While the runner is idle, a
+:class:`Speculator` hands out those neighbours of the parameter the user
+last touched, one at a time; the runner cooks and exports each and keeps
+the result in a :class:`GeometryCache` keyed by the full parameter state,
+so that picking that value next is served without a cook. Speculative
+exports are not uploaded: they stay on local disk until a real update
+picks them, and are deleted when the cache evicts them.
+
+Speculation has a wall-time budget per touched parameter and is
+cancelled as soon as a real command arrives. A speculative cook already
+running is not interrupted, but the runner checks :meth:`Speculator.interrupted`
+after it and skips the render and export; it only speculates on HDAs
+whose updates are cheap.
+
+This module has no ``hou`` dependency.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Geometry results kept in the cache (speculative and real exports)
+MAX_CACHED_STATES = 32
+
+# Integer parameters are only speculated on when their UI range is this small
+MAX_INT_RANGE = 100
+
+
+def neighbour_values(
+    kind: str,
+    value: Any,
+    items: Optional[Sequence[Any]] = None,
+    minimum: Optional[int] = None,
+    maximum: Optional[int] = None,
+) -> List[Any]:
+    """
+    Return the likely next values of a parameter, most likely first.
+
+    Args:
+        kind:    ``"toggle"``, ``"menu"`` or ``"int"`` (others have none).
+        value:   Current value (for menus, one of *items*).
+        items:   Menu values, in menu order.
+        minimum: Lower bound of an integer's UI range.
+        maximum: Upper bound of an integer's UI range.
+    """
+    if kind == "toggle":
+        return [0 if value else 1]
+
+    if kind == "menu" and items:
+        items = list(items)
+        if value not in items:
+            return []
+        index = items.index(value)
+        return [items[i] for i in (index + 1, index - 1) if 0 <= i < len(items)]
+
+    if kind == "int" and minimum is not None and maximum is not None:
+        if maximum - minimum > MAX_INT_RANGE:
+            return []
+        return [v for v in (value + 1, value - 1) if minimum <= v <= maximum]
+
+    return []
+
+
+class GeometryCache:
+    """LRU of export results keyed by parameter state.
+
+    *on_evict* is called with each entry dropped from the cache (e.g. to
+    delete the local file of a speculative export).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MAX_CACHED_STATES,
+        on_evict: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __contains__(self, state_key: str) -> bool:
+        return state_key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, state_key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for *state_key* (marking it recently used), or None."""
+        entry = self._entries.get(state_key)
+        if entry is not None:
+            self._entries.move_to_end(state_key)
+        return entry
+
+    def put(self, state_key: str, entry: Dict[str, Any]) -> None:
+        """Store *entry*, evicting the least recently used beyond ``max_entries``."""
+        replaced = self._entries.get(state_key)
+        if replaced is not None and replaced is not entry:
+            self._evicted(replaced)
+        self._entries[state_key] = entry
+        self._entries.move_to_end(state_key)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._evicted(evicted)
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. when the HDA is replaced)."""
+        entries = {id(entry): entry for entry in self._entries.values()}
+        self._entries.clear()
+        for entry in entries.values():
+            self._evicted(entry)
+
+    def _evicted(self, entry: Dict[str, Any]) -> None:
+        # The same entry can be cached under several states
+        if self.on_evict and not any(e is entry for e in self._entries.values()):
+            self.on_evict(entry)
+
+
+class Speculator:
+    """
+    Queue of speculative ``(param_path, value)`` candidates.
+
+    :meth:`plan` and :meth:`next` are called from the runner's Houdini
+    thread; :meth:`cancel` from the event loop when a command arrives.
+    """
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self._lock = threading.Lock()
+        self._pending: "deque[Tuple[str, Any]]" = deque()
+        self._deadline = 0.0
+        self._generation = 0  # bumped by cancel()
+        self._taken = 0  # generation of the candidate last taken
+
+    def plan(self, param_path: str, values: Sequence[Any]) -> None:
+        """Replace the queue with *values* of *param_path*, with a fresh budget."""
+        with self._lock:
+            self._pending = deque((param_path, value) for value in values)
+            self._deadline = time.time() + self.budget_seconds
+
+    def cancel(self) -> None:
+        """Drop all pending candidates."""
+        with self._lock:
+            self._pending.clear()
+            self._generation += 1
+
+    def interrupted(self) -> bool:
+        """Whether :meth:`cancel` was called since the last :meth:`next`."""
+        with self._lock:
+            return self._generation != self._taken
+
+    def has_work(self) -> bool:
+        """Whether a candidate is pending and the budget is not spent."""
+        with self._lock:
+            return bool(self._pending) and time.time() < self._deadline
+
+    def next(self) -> Optional[Tuple[str, Any]]:
+        """Take the next candidate, or None when idle or out of budget."""
+        with self._lock:
+            if not self._pending or time.time() >= self._deadline:
+                self._pending.clear()
+                return None
+            self._taken = self._generation
+            return self._pending.popleft()
@@ -0,0 +1,56 @@
+"""
+Per-step startup timeline for session processes.
+
+Each boot stage records how long it took (and when it finished relative
+to process start) so slow steps are visible in the logs and can be sent
+to the browser as a ``startup_timeline`` message.
+
+This module has no ``hou`` dependency.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+
+class StartupTimeline:
+    """Ordered list of ``(step, duration, offset)`` records."""
+
+    def __init__(self, process: str, start_time: Optional[float] = None):
+        self.process = process
+        self.start_time = start_time or time.time()
+        self._steps: List[Dict[str, Any]] = []
+
+    def record(self, step: str, duration: float, **details) -> None:
+        """Record a step that just finished after *duration* seconds."""
+        self._steps.append(
+            {
+                "step": step,
+                "duration": round(duration, 3),
+                "offset": round(time.time() - self.start_time, 3),
+                **details,
+            }
+        )
+
+    def record_since(self, step: str, started: float, **details) -> float:
+        """Record a step that started at *started* and return its duration."""
+        duration = time.time() - started
+        self.record(step, duration, **details)
+        return duration
+
+    def to_message(self) -> Dict[str, Any]:
+        """Return the timeline as a ``startup_timeline`` message."""
+        return {
+            "action": "startup_timeline",
+            "process": self.process,
+            "total": round(time.time() - self.start_time, 3),
+            "steps": list(self._steps),
+        }
+
+    def log_summary(self, logger: logging.Logger) -> None:
+        """Log one line per step."""
+        logger.info(f"=== STARTUP TIMELINE ({self.process}) ===")
+        for step in self._steps:
+            logger.info(
+                f"  {step['offset']:8.3f}s  {step['step']:<28} {step['duration']:.3f}s"
+            )
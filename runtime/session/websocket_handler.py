@@ -2,35 +2,95 @@
 Aurora Session WebSocket handler - manages connection to API Gateway.
 This runs in a pure Python asyncio process (NO hou imports).
 Forwards messages between browser clients and local Houdini runner.
+
+Payloads are forwarded without being decoded: runner messages carry a
+small header (see ``message_framing``) and browser messages are only
+parsed when they may be a control message the bridge handles itself.
+
+Optionally the bridge also serves a TLS WebSocket the browser connects
+to directly (see ``direct_channel``). While a direct client is
+connected, runner output goes to it instead of API Gateway, and API
+Gateway is left to the control messages handled by the Lambda.
+
+With ``METRICS_PORT`` set, live metrics (see ``session_metrics``) are
+served in Prometheus text format on ``http://127.0.0.1:<port>/metrics``.
 """
 
 import json
-import logging
 import os
+import re
+import ssl
 import sys
 import time
 import asyncio
 import websockets
 from typing import Optional, Set
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
+from direct_channel import token_from_path, verify_token
+from message_codec import wrap_encoded
+from message_framing import add_metadata, split_frame
+from session_metrics import SessionMetrics
+from signal_files import write_signal_file
+from startup_timeline import StartupTimeline
+
+# The shared runtime package lives at the repository root
+_TOOLING_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _TOOLING_ROOT not in sys.path:
+    sys.path.insert(0, _TOOLING_ROOT)
+
+from runtime.shared.logging_config import set_log_context, setup_logging  # noqa: E402
+
+# Setup logging (non-blocking, structured)
+logger = setup_logging(__name__)
+
+# Control messages (from the Lambda) lead with their action, so it is read
+# from the start of the payload without decoding the rest
+CONTROL_ACTION_PREFIX = re.compile(r'\s*\{\s*"action"\s*:\s*"([a-z_]+)"')
+CONTROL_ACTIONS = {"terminate", "direct_channel_key"}
 
 
 class WebSocketBridge:
     """Bridges API Gateway WebSocket with local Houdini runner."""
 
-    def __init__(self, session_id: str, websocket_url: str, local_port: int = 7007):
+    def __init__(
+        self,
+        session_id: str,
+        websocket_url: str,
+        local_port: int = 7007,
+        ready_signal: Optional[str] = None,
+        direct_port: int = 0,
+        direct_host: str = "",
+        direct_ssl: Optional[ssl.SSLContext] = None,
+        metrics_port: int = 0,
+    ):
         self.session_id = session_id
         self.websocket_url = websocket_url
         self.local_port = local_port
+        self.ready_signal = ready_signal
         self.api_gateway_ws: Optional[websockets.WebSocketClientProtocol] = None
         self.houdini_clients: Set[websockets.WebSocketServerProtocol] = set()
+
+        # Direct browser channel (disabled unless a port and TLS context are set)
+        self.direct_port = direct_port
+        self.direct_host = direct_host
+        self.direct_ssl = direct_ssl
+        self.direct_key: Optional[str] = None  # sent by the Lambda
+        self.direct_clients: Set[websockets.WebSocketServerProtocol] = set()
+        self._direct_server = None
+
+        # Prometheus endpoint (disabled unless a port is set)
+        self.metrics_port = metrics_port
+        self.metrics = SessionMetrics()
+        self._metrics_server = None
+        self._connections = {"runner": 0, "direct": 0}
+        self._in_flight = 0  # timed commands sent to the runner, unanswered
+
         self.running = True
         self.ready = False
+        self.timeline = StartupTimeline("websocket_bridge")
+        self._server = None
+        # Set once API Gateway is connected; Houdini traffic waits on it
+        self._gateway_connected = asyncio.Event()
 
         logger.info(f"Initializing WebSocket bridge for session {session_id}")
         logger.info(f"API Gateway URL: {websocket_url}")
@@ -55,6 +115,11 @@ class WebSocketBridge:
                 connect_time = time.time() - connect_start
                 logger.info(f"Connected to API Gateway WebSocket in {connect_time:.2f}s")
                 logger.info("=== API GATEWAY CONNECTION COMPLETE ===")
+                self.timeline.record(
+                    "api_gateway_connect", connect_time, attempts=attempt + 1
+                )
+                if attempt:
+                    self.metrics.inc("reconnects_total", attempt, peer="api_gateway")
 
                 # Send initial ready status once Houdini is connected
                 return True
@@ -74,16 +139,59 @@ class WebSocketBridge:
 
     async def send_to_browser(self, message: dict):
         """Send message to browser via API Gateway."""
+        await self.forward_to_browser(json.dumps(message))
+        logger.debug(
+            f"Sent to browser: {message.get('status') or message.get('action')}"
+        )
+
+    async def forward_to_browser(self, payload: str, via_gateway: bool = False):
+        """Send a raw JSON payload to the browser, tagged with the session id.
+
+        Uses the direct channel when a direct client is connected (unless
+        *via_gateway*), falling back to API Gateway.
+        """
+        message = add_metadata(payload, session_id=self.session_id, timestamp=time.time())
+        self._count_forwarded("to_browser", len(message))
+
+        if not via_gateway:
+            for client in list(self.direct_clients):
+                try:
+                    await client.send(message)
+                    return
+                except Exception as e:
+                    logger.warning(f"Direct channel send failed, falling back: {e}")
+                    self.direct_clients.discard(client)
+
         try:
             if self.api_gateway_ws:
-                message_with_metadata = {
-                    "session_id": self.session_id,
-                    "timestamp": time.time(),
-                    **message,
-                }
-                await self.api_gateway_ws.send(json.dumps(message_with_metadata))
-                logger.debug(
-                    f"Sent to browser: {message.get('status') or message.get('action')}"
+                await self.api_gateway_ws.send(message)
+        except Exception as e:
+            logger.error(f"Error sending to browser: {e}")
+
+    async def forward_encoded_to_browser(self, payload: bytes, header: dict):
+        """Send a binary-encoded payload to the browser.
+
+        Direct clients get the bytes as a binary frame; through API Gateway
+        they are base64-wrapped in a JSON envelope the Lambda can route.
+        """
+        self._count_forwarded("to_browser", len(payload))
+        for client in list(self.direct_clients):
+            try:
+                await client.send(payload)
+                return
+            except Exception as e:
+                logger.warning(f"Direct channel send failed, falling back: {e}")
+                self.direct_clients.discard(client)
+
+        try:
+            if self.api_gateway_ws:
+                await self.api_gateway_ws.send(
+                    wrap_encoded(
+                        payload,
+                        session_id=self.session_id,
+                        timestamp=time.time(),
+                        action=header.get("action") or header.get("status"),
+                    )
                 )
         except Exception as e:
             logger.error(f"Error sending to browser: {e}")
@@ -94,8 +202,13 @@ class WebSocketBridge:
         """Handle connection from local Houdini runner."""
         logger.info("=== HOUDINI RUNNER CONNECTED ===")
         self.houdini_clients.add(websocket)
+        self._count_connection("runner")
 
         try:
+            # The runner may connect before API Gateway does; hold its
+            # traffic (and the ready notification) until the browser is reachable
+            await self._gateway_connected.wait()
+
             # Send ready notification to browser when Houdini connects
             if not self.ready:
                 self.ready = True
@@ -105,28 +218,29 @@ class WebSocketBridge:
                 )
                 logger.info("Ready notification sent to browser")
 
-            # Forward messages from Houdini to browser
+            # Forward messages from Houdini to browser; only the header is decoded
             async for message in websocket:
                 try:
-                    data = json.loads(message)
-                    action = data.get("action") or data.get("status")
-                    logger.info(f"Received from Houdini: {action}")
-
-                    # Log geometry data if present (check nested structure)
-                    if "geometry" in data and isinstance(data["geometry"], dict):
-                        geom = data["geometry"]
-                        if "url" in geom or "geometry_url" in geom:
-                            url = geom.get("url") or geom.get("geometry_url")
-                            logger.info(f"  → Geometry URL: {url[:80]}...")
-                        if "point_count" in geom:
-                            logger.info(
-                                f"  → Points: {geom['point_count']}, Primitives: {geom.get('primitive_count')}"
-                            )
-
-                    await self.send_to_browser(data)
-                    logger.info(f"Forwarded to browser successfully")
+                    header, payload = split_frame(message)
+                    action = header.get("action") or header.get("status")
+
+                    # Runner metrics feed the local endpoint, not the browser
+                    if action == "metrics":
+                        self.metrics.apply_report(json.loads(payload))
+                        continue
+
+                    logger.debug("Received from Houdini: %s (%d bytes)", action, len(payload))
+                    # A chunked reply carries its request_id on the last chunk only
+                    if header.get("request_id"):
+                        self._set_in_flight(self._in_flight - 1)
+
+                    if isinstance(payload, bytes):
+                        await self.forward_encoded_to_browser(payload, header)
+                    else:
+                        await self.forward_to_browser(payload)
+                    logger.debug("Forwarded to browser")
                 except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON from Houdini: {e}")
+                    logger.error(f"Invalid frame header from Houdini: {e}")
 
         except websockets.exceptions.ConnectionClosed:
             logger.info("Houdini runner disconnected")
@@ -135,23 +249,107 @@ class WebSocketBridge:
             self.ready = False
 
     async def start_local_server(self):
-        """Start local WebSocket server for Houdini runner."""
+        """Start local WebSocket server for Houdini runner.
+
+        Once listening, publishes the ready-signal file (if configured) so
+        the runner can connect immediately instead of retrying.
+        """
         logger.info(f"=== STARTING LOCAL WEBSOCKET SERVER ===")
         logger.info(f"Binding to 127.0.0.1:{self.local_port}")
 
-        async with websockets.serve(
+        listen_start = time.time()
+        self._server = await websockets.serve(
             self.handle_houdini_client,
             "127.0.0.1",
             self.local_port,
             ping_interval=30,
             ping_timeout=10,
-        ):
-            logger.info(
-                f"Local WebSocket server ready on ws://127.0.0.1:{self.local_port}"
+        )
+        self.timeline.record_since("local_server_listen", listen_start)
+        logger.info(
+            f"Local WebSocket server ready on ws://127.0.0.1:{self.local_port}"
+        )
+
+        if self.ready_signal:
+            write_signal_file(
+                self.ready_signal, {"port": self.local_port, "pid": os.getpid()}
             )
-            logger.info("Waiting for Houdini runner to connect...")
-            # Keep server running
-            await asyncio.Future()
+            logger.info(f"Listening signal written to {self.ready_signal}")
+
+        logger.info("Waiting for Houdini runner to connect...")
+
+    async def handle_browser_message(self, message: str, via_gateway: bool = True) -> bool:
+        """Handle one browser message (from API Gateway or the direct channel).
+
+        Args:
+            message:     JSON text of the message.
+            via_gateway: Whether it arrived over the API Gateway connection
+                         (which also carries the Lambda's control messages).
+
+        Returns:
+            False once the session is terminating.
+        """
+        try:
+            # Only a possible control message is worth decoding
+            action = None
+            match = CONTROL_ACTION_PREFIX.match(message)
+            if match and match.group(1) in CONTROL_ACTIONS:
+                action = json.loads(message).get("action")
+            logger.debug("Received from browser (%d bytes)", len(message))
+
+            # Timed requests get the receive time for the runner's queue wait
+            timed = '"request_id"' in message
+            if timed:
+                message = add_metadata(message, bridge_received_at=time.time())
+
+            # Key for direct channel tokens, sent by the Lambda. Set once,
+            # before any direct client is accepted; a browser must not be
+            # able to replace it
+            if action == "direct_channel_key":
+                if via_gateway and self.direct_key is None:
+                    self.direct_key = json.loads(message).get("key")
+                    logger.info("Direct channel key received")
+                else:
+                    logger.warning("Ignored direct_channel_key")
+                return True
+
+            # Handle terminate action
+            if action == "terminate":
+                self.running = False
+                # Notify Houdini to shut down
+                for client in list(self.houdini_clients):
+                    try:
+                        await client.send(message)
+                    except:
+                        pass
+                return False
+
+            # Forward to all connected Houdini clients
+            if self.houdini_clients:
+                self._count_forwarded("to_runner", len(message))
+                if timed:
+                    self._set_in_flight(self._in_flight + 1)
+                for client in list(self.houdini_clients):
+                    try:
+                        await client.send(message)
+                        logger.debug("Forwarded to Houdini")
+                    except Exception as e:
+                        logger.error(f"Error forwarding to Houdini: {e}")
+                        self.houdini_clients.discard(client)
+            else:
+                # No Houdini runner connected
+                await self.send_to_browser(
+                    {
+                        "error": "Houdini runner not connected",
+                        "action": json.loads(message).get("action"),
+                    }
+                )
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON from browser: {e}")
+            await self.send_to_browser({"error": "Invalid JSON"})
+
+        return True
 
     async def forward_browser_to_houdini(self):
         """Forward messages from browser to Houdini runner."""
@@ -164,45 +362,8 @@ class WebSocketBridge:
                     message = await asyncio.wait_for(
                         self.api_gateway_ws.recv(), timeout=1.0
                     )
-
-                    # Parse command
-                    try:
-                        command = json.loads(message)
-                        action = command.get("action")
-                        logger.info(f"Received from browser: {action}")
-
-                        # Handle terminate action
-                        if action == "terminate":
-                            self.running = False
-                            # Notify Houdini to shut down
-                            for client in list(self.houdini_clients):
-                                try:
-                                    await client.send(message)
-                                except:
-                                    pass
-                            break
-
-                        # Forward to all connected Houdini clients
-                        if self.houdini_clients:
-                            for client in list(self.houdini_clients):
-                                try:
-                                    await client.send(message)
-                                    logger.debug(f"Forwarded to Houdini: {action}")
-                                except Exception as e:
-                                    logger.error(f"Error forwarding to Houdini: {e}")
-                                    self.houdini_clients.discard(client)
-                        else:
-                            # No Houdini runner connected
-                            await self.send_to_browser(
-                                {
-                                    "error": "Houdini runner not connected",
-                                    "action": action,
-                                }
-                            )
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Invalid JSON from browser: {e}")
-                        await self.send_to_browser({"error": "Invalid JSON"})
+                    if not await self.handle_browser_message(message, via_gateway=True):
+                        break
 
                 except asyncio.TimeoutError:
                     # No message, continue loop
@@ -220,22 +381,147 @@ class WebSocketBridge:
         finally:
             logger.info("Browser message forwarder stopped")
 
+    async def handle_direct_client(self, websocket):
+        """Handle a browser connected directly, authenticated by a signed token."""
+        # websockets < 14 exposes the path on the connection, newer on the request
+        path = getattr(websocket, "path", None) or websocket.request.path
+        if not self.direct_key:
+            await websocket.close(1013, "Direct channel not ready")
+            return
+        if not verify_token(self.direct_key, token_from_path(path), self.session_id):
+            logger.warning("Rejected direct connection with an invalid token")
+            await websocket.close(4401, "Unauthorized")
+            return
+
+        logger.info("=== DIRECT BROWSER CHANNEL CONNECTED ===")
+        self.direct_clients.add(websocket)
+        self._count_connection("direct")
+        try:
+            async for message in websocket:
+                # The browser only sends JSON text
+                if not isinstance(message, str):
+                    logger.warning("Rejected binary frame on the direct channel")
+                    await websocket.close(1003, "Text frames only")
+                    break
+                if not await self.handle_browser_message(message, via_gateway=False):
+                    break
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.direct_clients.discard(websocket)
+            logger.info("Direct browser channel closed, using API Gateway")
+
+    async def start_direct_server(self):
+        """Serve the direct browser channel and offer it via the Lambda."""
+        self._direct_server = await websockets.serve(
+            self.handle_direct_client,
+            "0.0.0.0",
+            self.direct_port,
+            ssl=self.direct_ssl,
+            ping_interval=30,
+            ping_timeout=10,
+        )
+        logger.info(f"Direct channel listening on wss://{self.direct_host}:{self.direct_port}")
+
+        # The Lambda answers with a direct_channel_key (to us) and a signed
+        # token (to the browser)
+        await self.send_to_gateway(
+            {
+                "action": "direct_channel_available",
+                "url": f"wss://{self.direct_host}:{self.direct_port}",
+            }
+        )
+
+    async def handle_metrics_request(self, reader, writer):
+        """Answer one HTTP request on the metrics endpoint."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain the request headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.metrics.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    async def start_metrics_server(self):
+        """Serve metrics on localhost for a local agent or scraper."""
+        self._metrics_server = await asyncio.start_server(
+            self.handle_metrics_request, "127.0.0.1", self.metrics_port
+        )
+        logger.info(f"Metrics endpoint on http://127.0.0.1:{self.metrics_port}/metrics")
+
+    def _count_forwarded(self, direction: str, size: int) -> None:
+        self.metrics.inc("forwarded_messages_total", direction=direction)
+        self.metrics.inc("forwarded_bytes_total", size, direction=direction)
+
+    def _count_connection(self, peer: str) -> None:
+        self._connections[peer] += 1
+        if self._connections[peer] > 1:
+            self.metrics.inc("reconnects_total", peer=peer)
+
+    def _set_in_flight(self, count: int) -> None:
+        self._in_flight = max(0, count)
+        self.metrics.set("queue_depth", self._in_flight)
+
+    async def send_to_gateway(self, message: dict):
+        """Send a control message that must go through API Gateway."""
+        await self.forward_to_browser(json.dumps(message), via_gateway=True)
+
     async def run(self):
         """Main run loop for the bridge."""
-        # Connect to API Gateway
-        if not await self.connect_to_api_gateway():
-            logger.error("Failed to connect to API Gateway. Exiting.")
-            return False
-
-        # Start local server and browser forwarder concurrently
         try:
-            await asyncio.gather(
-                self.start_local_server(), self.forward_browser_to_houdini()
-            )
+            # Listen locally first so the runner can connect while the
+            # API Gateway handshake is still in flight
+            await self.start_local_server()
+
+            if self.metrics_port:
+                try:
+                    await self.start_metrics_server()
+                except Exception as e:
+                    logger.error(f"Metrics endpoint unavailable: {e}")
+
+            # Connect to API Gateway
+            if not await self.connect_to_api_gateway():
+                logger.error("Failed to connect to API Gateway. Exiting.")
+                return False
+            self._gateway_connected.set()
+
+            self.timeline.log_summary(logger)
+            await self.send_to_browser(self.timeline.to_message())
+
+            if self.direct_port and self.direct_ssl:
+                try:
+                    await self.start_direct_server()
+                except Exception as e:
+                    logger.error(f"Direct channel unavailable: {e}")
+
+            await self.forward_browser_to_houdini()
         except Exception as e:
             logger.error(f"Error in bridge: {e}")
         finally:
             # Clean up
+            if self._server:
+                self._server.close()
+            if self._direct_server:
+                self._direct_server.close()
+            if self._metrics_server:
+                self._metrics_server.close()
             if self.api_gateway_ws:
                 await self.api_gateway_ws.close()
 
@@ -257,6 +543,12 @@ async def main():
     session_id = os.getenv("SESSION_ID")
     websocket_url = os.getenv("WEBSOCKET_URL")
     local_port = int(os.getenv("LOCAL_WS_PORT", "7007"))
+    ready_signal = os.getenv("BRIDGE_READY_SIGNAL")
+    direct_port = int(os.getenv("DIRECT_WS_PORT") or 0)
+    direct_host = os.getenv("DIRECT_WS_HOST", "")
+    direct_cert = os.getenv("DIRECT_WS_CERT")
+    direct_key = os.getenv("DIRECT_WS_KEY")
+    metrics_port = int(os.getenv("METRICS_PORT") or 0)
 
     if not all([session_id, websocket_url]):
         logger.error("Missing required configuration. Cannot start.")
@@ -264,13 +556,26 @@ async def main():
         logger.error(f"WEBSOCKET_URL: {websocket_url}")
         sys.exit(1)
 
+    set_log_context(session_id=session_id)
     logger.info(f"Starting WebSocket bridge for session: {session_id}")
     logger.info(f"API Gateway URL: {websocket_url}")
     logger.info(f"Local port: {local_port}")
 
+    direct_ssl = None
+    if direct_port and direct_host and direct_cert and direct_key:
+        direct_ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        direct_ssl.load_cert_chain(direct_cert, direct_key)
+
     # Create and run bridge
     bridge = WebSocketBridge(
-        session_id=session_id, websocket_url=websocket_url, local_port=local_port
+        session_id=session_id,
+        websocket_url=websocket_url,
+        local_port=local_port,
+        ready_signal=ready_signal,
+        direct_port=direct_port,
+        direct_host=direct_host,
+        direct_ssl=direct_ssl,
+        metrics_port=metrics_port,
     )
 
     try:
@@ -3,45 +3,241 @@ Aurora shared logging configuration.
 
 Provides a consistent logging setup across all Aurora modules.
 
+Records are handed to a bounded in-memory queue and written to stdout by
+a background thread (:class:`logging.handlers.QueueListener`), so the
+asyncio loops and the Houdini thread never block on stdout or the
+CloudWatch agent. When the queue is full, records are dropped and the
+count is reported on the next record that gets through.
+
+Output is one JSON object per line by default (``AURORA_LOG_FORMAT=text``
+restores the classic format) with the standard fields plus, when set:
+
+- ``session_id`` / ``request_id`` from :func:`set_log_context` (process
+  wide) or :func:`log_context` (current thread / task),
+- ``phase`` and ``duration_ms`` passed per call via ``extra``.
+
+Records below WARNING are rate-limited per logger (token bucket) and can
+be sampled per logger (keep 1 in N); warnings and errors always pass.
+
 Usage:
-    from runtime.shared.logging_config import setup_logging
+    from runtime.shared.logging_config import setup_logging, log_context
 
-    logger = setup_logging(__name__)
-    logger.info("Ready")
+    logger = setup_logging(__name__, session_id="abc")
+    with log_context(request_id="42"):
+        logger.info("Cooked", extra={"phase": "cook", "duration_ms": 85.0})
 """
 
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
 
 _LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 _configured = False
 
+# Records waiting for the writer thread; beyond this they are dropped
+QUEUE_SIZE = 10000
+
+# Per-logger limit for records below WARNING: sustained rate and burst
+DEFAULT_RATE_LIMIT = 200  # records per second
+DEFAULT_RATE_BURST = 1000
+
+# Fields copied from the record into structured output when present
+CONTEXT_FIELDS = ("session_id", "request_id", "phase", "duration_ms")
+
+_process_context: Dict[str, Any] = {}
+_task_context: contextvars.ContextVar = contextvars.ContextVar(
+    "aurora_log_context", default={}
+)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def set_log_context(**fields: Any) -> None:
+    """Set fields (e.g. ``session_id``) added to every record of this process."""
+    _process_context.update(fields)
+
+
+@contextlib.contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Add fields (e.g. ``request_id``) to records of the current thread / task."""
+    token = _task_context.set({**_task_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _task_context.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Attach the process and task context to records, in the emitting thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in {**_process_context, **_task_context.get()}.items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class _RateLimitFilter(logging.Filter):
+    """Per-logger token bucket and sampling for records below WARNING."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: float = DEFAULT_RATE_BURST,
+        rate_limits: Optional[Dict[str, float]] = None,
+        sampling: Optional[Dict[str, int]] = None,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.rate_limits = rate_limits or {}
+        self.sampling = sampling or {}
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, list] = {}  # logger -> [tokens, last refill]
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        name = record.name
+        with self._lock:
+            every = self.sampling.get(name)
+            if every and every > 1:
+                seen = self._seen.get(name, 0)
+                self._seen[name] = seen + 1
+                if seen % every:
+                    return False
+
+            rate = self.rate_limits.get(name, self.rate)
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(name, [self.burst, now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: records are dropped when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments and render the traceback in the emitting thread.
+
+        Unlike the base class the message is not pre-formatted, so the
+        writer's formatter still sees the fields; the traceback is kept as
+        ``exc_text`` (frames are not held on to while the record is queued).
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            record.dropped = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.dropped = 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS + ("dropped",):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _stop_listener() -> None:
+    if _listener:
+        _listener.stop()
+
 
 def setup_logging(
     name: str = None,
     level: int = logging.INFO,
     fmt: str = _LOG_FORMAT,
+    structured: Optional[bool] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+    sampling: Optional[Dict[str, int]] = None,
+    **context: Any,
 ) -> logging.Logger:
     """
     Return a logger, ensuring the root handler is configured exactly once.
 
     Args:
-        name:  Logger name (typically ``__name__``).
-        level: Minimum log level.
-        fmt:   Log format string.
+        name:        Logger name (typically ``__name__``).
+        level:       Minimum log level.
+        fmt:         Log format string (text output only).
+        structured:  JSON output; defaults to ``AURORA_LOG_FORMAT != "text"``.
+        rate_limits: Records per second allowed below WARNING, by logger
+                     name (others get ``DEFAULT_RATE_LIMIT``).
+        sampling:    Keep 1 in N records below WARNING, by logger name.
+        context:     Fields added to every record (see :func:`set_log_context`).
 
     Returns:
         A configured :class:`logging.Logger`.
     """
-    global _configured
+    global _configured, _listener
+    set_log_context(**context)
+
     if not _configured:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(logging.Formatter(fmt))
+        if structured is None:
+            structured = os.getenv("AURORA_LOG_FORMAT", "json").lower() != "text"
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if structured else logging.Formatter(fmt))
+
+        log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+        handler = _DroppingQueueHandler(log_queue)
+        handler.addFilter(_ContextFilter())
+        handler.addFilter(_RateLimitFilter(rate_limits=rate_limits, sampling=sampling))
+
         root = logging.getLogger()
         root.setLevel(level)
-        # Avoid duplicate handlers if basicConfig was already called
-        if not root.handlers:
-            root.addHandler(handler)
+        # Replace handlers from an earlier basicConfig
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream)
+        _listener.start()
+        atexit.register(_stop_listener)
         _configured = True
 
     return logging.getLogger(name)
@@ -0,0 +1,121 @@
+/**
+ * Aurora AnimationPlayer — plays animation frames while they stream in.
+ *
+ * Frames of an `export_animation` arrive one by one; the player loads each
+ * into a scene and starts playing once the first `preroll` frames are in
+ * (the backend picks it so playback does not catch up with the export).
+ * If it does catch up, it holds the last frame until the next arrives.
+ *
+ * Usage:
+ *   import { AnimationPlayer } from './aurora/animation.js';
+ *   const player = new AnimationPlayer(viewport, startedMessage);
+ *   session.on('animation_frame', data => player.addFrame(data));
+ *   session.on('animation_ready', data => player.finish(data.exported));
+ *   player.on('playing', () => { ... });
+ *   player.stop();
+ */
+
+import { EventEmitter } from './events.js';
+
+export class AnimationPlayer extends EventEmitter {
+    /**
+     * @param {import('./viewport.js').AuroraViewport} viewport
+     * @param {object}   opts  — the `animation_started` message
+     * @param {string}   opts.animation_id
+     * @param {string}   opts.instance
+     * @param {number[]} opts.frames
+     * @param {number}   opts.fps
+     * @param {number}   opts.stride
+     * @param {number}   opts.preroll
+     */
+    constructor(viewport, { animation_id, instance, frames, fps, stride, preroll }) {
+        super();
+        this.animationId = animation_id;
+        this.instance = instance;
+        this.frames = frames;
+        this.count = frames.length;
+        this.preroll = Math.max(1, Math.min(preroll || 1, frames.length));
+        this.playing = false;
+
+        /** @private */
+        this._viewport = viewport;
+        /** @private */
+        this._intervalMs = 1000 * (stride || 1) / (fps || 24);
+        /** @private Loading (then loaded) scene of each frame */
+        this._loads = [];
+        /** @private */
+        this._scenes = [];
+        /** @private */
+        this._current = -1;
+        /** @private */
+        this._timer = null;
+        /** @private Whether all frames have been received */
+        this._complete = false;
+    }
+
+    /** Frames loaded in order from the first, without a gap. */
+    get buffered() {
+        let n = 0;
+        while (n < this.count && this._scenes[n]) n++;
+        return n;
+    }
+
+    /**
+     * Add a streamed frame (an `animation_frame` message).
+     * @param {object} data
+     */
+    addFrame({ index, geometry, same_as }) {
+        const load = same_as != null
+            ? this._loads[same_as]
+            : geometry?.url && this._viewport.loadScene(geometry.url);
+        if (!load) return;
+        this._loads[index] = load;
+        load.then((scene) => {
+            this._scenes[index] = scene;
+            const buffered = this.buffered;
+            this._emit('progress', { buffered, count: this.count });
+            if (!this.playing && buffered >= this.preroll) this.play();
+        }).catch((err) => console.error('[AnimationPlayer] Frame failed to load:', err));
+    }
+
+    /**
+     * No more frames will arrive.
+     * @param {number} exported — frames the backend exported (fewer if cancelled)
+     */
+    finish(exported) {
+        this.count = Math.min(this.count, exported);
+        this._complete = true;
+        if (!this.playing && this.count && this.buffered >= this.count) this.play();
+    }
+
+    /** Start (or resume) playback. */
+    play() {
+        if (this.playing || !this.count) return;
+        this.playing = true;
+        this._timer = setInterval(() => this._tick(), this._intervalMs);
+        this._tick();
+        this._emit('playing', { animationId: this.animationId });
+    }
+
+    /** Stop playback; the frame shown stays in the viewport. */
+    stop() {
+        if (this._timer) clearInterval(this._timer);
+        this._timer = null;
+        this.playing = false;
+    }
+
+    /** @private */
+    _tick() {
+        let next = this._current + 1;
+        // Loop once every frame is in; otherwise wait for the next one
+        if (next >= this.count) {
+            if (!this._complete) return;
+            next = 0;
+        }
+        const scene = this._scenes[next];
+        if (!scene) return;
+        this._current = next;
+        this._viewport.showModel(this.instance, scene);
+        this._emit('frame', { index: next, frame: this.frames[next] });
+    }
+}
@@ -23,6 +23,9 @@
  *   'parameters:ready'    — HDA parameters have been loaded (payload: data)
  *   'geometry:ready'      — New geometry received (payload: geo)
  *   'geometry:loaded'     — Geometry loaded into the viewport (payload: { url })
+ *   'timing'              — Latency breakdown of a command (payload: { action, round_trip, stages })
+ *   'instance:removed'    — An added HDA instance was removed (payload: { instance })
+ *   'animation:ready'     — An animation export finished (payload: animation_ready message)
  *
  * Extending:
  *   Subclass AuroraApp and override any _show* or _wire* method to
@@ -33,6 +36,7 @@ import { EventEmitter } from './events.js';
 import { AuroraSession } from './session.js';
 import { AuroraViewport } from './viewport.js';
 import { AuroraParameters } from './parameters.js';
+import { AnimationPlayer } from './animation.js';
 
 export class AuroraApp extends EventEmitter {
     /**
@@ -57,11 +61,21 @@ export class AuroraApp extends EventEmitter {
         this._viewport = null;
         /** @type {AuroraParameters|null} */
         this._paramUI = null;
+        /**
+         * Parameter UIs of HDAs added next to the loaded one, by instance id.
+         * @type {Map<string, {ui: AuroraParameters, section: HTMLElement}>}
+         */
+        this._instanceUIs = new Map();
 
         // State
         this._currentGeometryUrl = null;
         this._pendingSave = false;
         this._pendingNewHDA = false;
+        this._cachedPreview = false;
+        this._addingInstance = false;
+        /** @type {AnimationPlayer|null} */
+        this._animation = null;
+        this._pendingAnimationSave = false;
 
         // DOM references (populated by mount())
         this._el = {};
@@ -122,8 +136,14 @@ export class AuroraApp extends EventEmitter {
             menuStatus:          $('menuStatus'),
             menuHdaName:         $('menuHdaName'),
             menuLoadHDABtn:      $('menuLoadHDABtn'),
+            menuAddHDABtn:       $('menuAddHDABtn'),
             menuTerminateBtn:    $('menuTerminateBtn'),
             menuExportBtn:       $('menuExportBtn'),
+            menuProfileBtn:      $('menuProfileBtn'),
+            menuAnimateBtn:      $('menuAnimateBtn'),
+            menuExportAnimationBtn: $('menuExportAnimationBtn'),
+            profileSection:      $('profileSection'),
+            profileResults:      $('profileResults'),
             logConsole:          $('logConsole'),
             logMessages:         $('logMessages'),
         };
@@ -156,8 +176,9 @@ export class AuroraApp extends EventEmitter {
 
     /**
      * Connect to the backend and start a new Houdini session.
+     * @param {File} [hdaFile] — optional .hda to preload while the instance boots
      */
-    async startSession() {
+    async startSession(hdaFile = null) {
         this._el.initializeBtn.disabled = true;
         this._el.uploadError.textContent = '';
 
@@ -172,10 +193,16 @@ export class AuroraApp extends EventEmitter {
             await this._session.connect();
             this._addLog('system', 'WebSocket connected', 'Client');
 
-            this._session.startSession({
+            if (hdaFile) {
+                this._addLog('info', `Preloading HDA: ${hdaFile.name}`, 'Client');
+            }
+
+            const started = await this._session.startSession({
                 idle_timeout_minutes: this._config.idle_timeout_minutes || 15,
                 idle_warning_minutes: this._config.idle_warning_minutes || 2,
+                hdaFile,
             });
+            if (!started) throw new Error('Failed to upload HDA');
 
             this._updateLoadingMessage('Starting EC2 instance...');
             this._setStatus('Starting...');
@@ -203,14 +230,27 @@ export class AuroraApp extends EventEmitter {
     /**
      * Upload and load a new HDA file into the active session.
      * @param {File} file — a .hda file
+     * @param {object}  [opts]
+     * @param {boolean} [opts.addInstance=false] — add it next to the loaded
+     *   HDAs instead of replacing them
      */
-    async loadHDA(file) {
+    async loadHDA(file, opts = {}) {
         if (!file) return;
         if (!file.name.endsWith('.hda')) {
             alert('Invalid file type. Please use a .hda (Houdini Digital Asset) file.');
             return;
         }
 
+        if (opts.addInstance) {
+            this._showGeometryLoader();
+            this._addLog('info', `Adding HDA: ${file.name}`, 'Client');
+            if (!await this._session.uploadHDA(file, { addInstance: true })) {
+                this._hideGeometryLoader();
+                alert('Failed to upload HDA file. Please try again.');
+            }
+            return;
+        }
+
         this._showLoadingHDA();
         this._updateLoadingMessage('Uploading HDA file to S3...');
         this._addLog('info', `Loading HDA: ${file.name}`, 'Client');
@@ -237,6 +277,79 @@ export class AuroraApp extends EventEmitter {
         this._pendingSave = true;
     }
 
+    /**
+     * Profile the next parameter updates and show the heaviest nodes.
+     * @param {number} [updates=5]
+     */
+    profileUpdates(updates = 5) {
+        this._setMenuEnabled('profile', false);
+        this._session.profile(updates);
+    }
+
+    /**
+     * Export the active HDA over the scene's frame range and play the
+     * frames as they stream in.
+     * @param {object}  [opts]  — see AuroraSession.exportAnimation
+     * @param {boolean} [opts.pack=false] — also download one animated GLB
+     */
+    playAnimation(opts = {}) {
+        this._stopAnimation();
+        this._pendingAnimationSave = !!opts.pack;
+        this._showGeometryLoader();
+        this._session.exportAnimation(opts);
+    }
+
+    /** @private */
+    _stopAnimation() {
+        this._animation?.stop();
+        this._animation = null;
+    }
+
+    /**
+     * Show a profile summary: heaviest nodes by cook time and memory, and
+     * the Python hot spots.
+     * @param {object} data  `profile_ready` message
+     * @private
+     */
+    _showProfile(data) {
+        const container = this._el.profileResults;
+        if (!container) return;
+        container.replaceChildren();
+
+        const table = (title, rows, columns) => {
+            if (!rows?.length) return;
+            const heading = document.createElement('h4');
+            heading.textContent = title;
+            const el = document.createElement('table');
+            el.className = 'profile-table';
+            for (const row of rows) {
+                const tr = el.insertRow();
+                columns.forEach((format, i) => {
+                    const td = tr.insertCell();
+                    td.textContent = format(row);
+                    if (i === 0) td.title = td.textContent;
+                });
+            }
+            container.append(heading, el);
+        };
+
+        const ms = (value) => `${value.toFixed(1)} ms`;
+        const mb = (value) => `${(value / 1048576).toFixed(1)} MB`;
+        table('Cook time', data.top_cook?.slice(0, 8), [(n) => n.path, (n) => ms(n.cook_ms)]);
+        table('Memory', data.top_memory?.slice(0, 8), [(n) => n.path, (n) => mb(n.memory_bytes)]);
+        table('Python', data.python_hotspots?.slice(0, 5), [(f) => f.function, (f) => ms(f.self_ms)]);
+
+        for (const [name, url] of Object.entries(data.downloads || {})) {
+            const link = document.createElement('a');
+            link.href = url;
+            link.textContent = `Download ${name}`;
+            link.className = 'profile-download';
+            container.append(link);
+        }
+
+        if (this._el.profileSection) this._el.profileSection.style.display = 'block';
+    }
+
     /* ================================================================== */
     /*  UI state management                                                */
     /* ================================================================== */
@@ -258,29 +371,93 @@ export class AuroraApp extends EventEmitter {
 
         this._showSection('loading');
         this._setMenuEnabled('load', false);
+        this._setMenuEnabled('add', false);
         this._setMenuEnabled('terminate', false);
         this._setMenuEnabled('export', false);
+        this._setMenuEnabled('profile', false);
+        this._setMenuEnabled('animate', false);
+        this._setMenuEnabled('exportAnimation', false);
 
         if (!this._viewport) {
             this._viewport = new AuroraViewport(this._el.viewerMount);
         }
 
         if (!this._paramUI) {
-            this._paramUI = new AuroraParameters(this._el.parametersContainer);
-            this._paramUI.on('change', ({ paramPath, value, numComponents }) => {
-                this._showGeometryLoader();
-                this._session.updateParameter(paramPath, value, numComponents);
-            });
+            this._paramUI = this._createParameterUI(this._el.parametersContainer);
         }
     }
 
+    /**
+     * Parameter UI whose changes are sent to the session.
+     * @param {HTMLElement} container
+     * @returns {AuroraParameters}
+     * @private
+     */
+    _createParameterUI(container) {
+        const ui = new AuroraParameters(container);
+        ui.on('change', ({ paramPath, value, numComponents }) => {
+            this._showGeometryLoader();
+            this._session.updateParameter(paramPath, value, numComponents);
+        });
+        return ui;
+    }
+
+    /**
+     * Show the parameters of an added HDA instance in their own section,
+     * with a button to remove the instance.
+     * @param {object} data  `parameters_ready` message of the instance
+     * @private
+     */
+    _showInstanceParameters(data) {
+        this._removeInstanceUI(data.instance);
+
+        const section = document.createElement('div');
+        section.className = 'instance-parameters';
+        const header = document.createElement('div');
+        header.className = 'instance-header';
+        const title = document.createElement('h4');
+        const remove = document.createElement('button');
+        remove.className = 'instance-remove';
+        remove.textContent = '✕';
+        remove.title = 'Remove this HDA';
+        remove.addEventListener('click', () => this._session?.removeInstance(data.instance));
+        header.append(title, remove);
+        const container = document.createElement('div');
+        section.append(header, container);
+        this._el.parametersSection?.appendChild(section);
+
+        const ui = this._createParameterUI(container);
+        ui.load(data.parameters);
+        title.textContent = ui.toolLabel || data.instance;
+        title.title = ui.toolDescription;
+        this._instanceUIs.set(data.instance, { ui, section });
+    }
+
+    /** @private */
+    _removeInstanceUI(instance) {
+        const entry = this._instanceUIs.get(instance);
+        if (!entry) return;
+        entry.ui.dispose();
+        entry.section.remove();
+        this._instanceUIs.delete(instance);
+    }
+
+    /** @private */
+    _clearInstances() {
+        for (const instance of [...this._instanceUIs.keys()]) this._removeInstanceUI(instance);
+    }
+
     /** @private */
     _showSessionReady() {
         this._showSection('empty');
         this._setStatus('Session Active');
         this._setMenuEnabled('load', true);
+        this._setMenuEnabled('add', false);
         this._setMenuEnabled('terminate', true);
         this._setMenuEnabled('export', false);
+        this._setMenuEnabled('profile', false);
+        this._setMenuEnabled('animate', false);
+        this._setMenuEnabled('exportAnimation', false);
     }
 
     /** @private */
@@ -325,15 +502,19 @@ export class AuroraApp extends EventEmitter {
 
     /**
      * Enable or disable a menu action button.
-     * @param {'load'|'terminate'|'export'} action
+     * @param {'load'|'add'|'terminate'|'export'|'profile'|'animate'|'exportAnimation'} action
      * @param {boolean} enabled
      * @private
      */
     _setMenuEnabled(action, enabled) {
         const btnMap = {
             load:      this._el.menuLoadHDABtn,
+            add:       this._el.menuAddHDABtn,
             terminate: this._el.menuTerminateBtn,
             export:    this._el.menuExportBtn,
+            profile:   this._el.menuProfileBtn,
+            animate:   this._el.menuAnimateBtn,
+            exportAnimation: this._el.menuExportAnimationBtn,
         };
         const btn = btnMap[action];
         if (btn) btn.disabled = !enabled;
@@ -375,6 +556,11 @@ export class AuroraApp extends EventEmitter {
 
             switch (name) {
                 case 'load-hda':
+                    this._addingInstance = false;
+                    this._el.hdaFileInput?.click();
+                    break;
+                case 'add-hda':
+                    this._addingInstance = true;
                     this._el.hdaFileInput?.click();
                     break;
                 case 'terminate':
@@ -383,6 +569,15 @@ export class AuroraApp extends EventEmitter {
                 case 'export':
                     this.exportScene();
                     break;
+                case 'profile':
+                    this.profileUpdates();
+                    break;
+                case 'animate':
+                    this.playAnimation();
+                    break;
+                case 'export-animation':
+                    this.playAnimation({ pack: true });
+                    break;
             }
         }
     }
@@ -424,9 +619,10 @@ export class AuroraApp extends EventEmitter {
      * @param {string} level   — info | warning | error | fatal | system
      * @param {string} message
      * @param {string} [context]
+     * @param {number} [count]   — times the entry was repeated
      * @private
      */
-    _addLog(level, message, context) {
+    _addLog(level, message, context, count = 1) {
         const container = this._el.logMessages;
         if (!container) return;
 
@@ -435,10 +631,11 @@ export class AuroraApp extends EventEmitter {
 
         const ts = new Date().toLocaleTimeString();
         const ctx = context ? `[${context}] ` : '';
+        const repeat = count > 1 ? ` <span class="log-count">(×${count})</span>` : '';
         entry.innerHTML =
             `<span class="log-time">${ts}</span>` +
             `<span class="log-level">${level.toUpperCase()}</span>` +
-            `<span class="log-message">${ctx}${message}</span>`;
+            `<span class="log-message">${ctx}${message}${repeat}</span>`;
 
         container.appendChild(entry);
         container.scrollTop = container.scrollHeight;
@@ -453,8 +650,13 @@ export class AuroraApp extends EventEmitter {
     /*  Geometry                                                           */
     /* ================================================================== */
 
-    /** @private */
-    _loadGeometry(url) {
+    /**
+     * Load geometry into the viewport, replacing only its instance's model.
+     * @param {string} url
+     * @param {string} [instance]
+     * @private
+     */
+    _loadGeometry(url, instance) {
         if (!this._viewport) {
             console.warn('[AuroraApp] Viewport not initialised');
             return;
@@ -462,7 +664,7 @@ export class AuroraApp extends EventEmitter {
         const resetView = this._pendingNewHDA;
         this._pendingNewHDA = false;
 
-        this._viewport.loadModel(url, { resetView })
+        this._viewport.loadModel(url, { resetView, instance })
             .then(() => this._emit('geometry:loaded', { url }))
             .catch(err => console.error('[AuroraApp] Error loading geometry:', err));
     }
@@ -498,8 +700,10 @@ export class AuroraApp extends EventEmitter {
     /** @private */
     _onHDAFileSelected(e) {
         const file = e.target.files[0];
+        const addInstance = this._addingInstance;
+        this._addingInstance = false;
         this._el.hdaFileInput.value = '';
-        if (file) this.loadHDA(file);
+        if (file) this.loadHDA(file, { addInstance });
     }
 
     /* ================================================================== */
@@ -518,35 +722,69 @@ export class AuroraApp extends EventEmitter {
         s.on('session_ready', () => {
             this._addLog('system', 'Houdini session ready', 'Client');
             this._showSessionReady();
+            if (this._cachedPreview) this._showParameters();
             this._emit('session:ready');
         });
 
         s.on('parameters_ready', (data) => {
             const paramCount = Object.keys(data.parameters?.parameters || {}).length;
-            this._addLog('info',
-                `Parameters extracted from HDA (${paramCount} params, ${data.node_count} nodes)`,
-                'Client');
-            this._pendingNewHDA = true;
-
-            // Reset geometry state
-            this._currentGeometryUrl = null;
-            this._setMenuEnabled('export', false);
-            if (this._el.geometryInfo) this._el.geometryInfo.style.display = 'none';
-            if (this._el.pointCount) this._el.pointCount.textContent = '-';
-            if (this._el.primCount) this._el.primCount.textContent = '-';
-            if (this._viewport) this._viewport.clearModel();
-
-            // Build parameter UI
+
+            // An HDA added next to the loaded ones gets its own section
+            if (data.added) {
+                this._addLog('info', `HDA added as ${data.instance} (${paramCount} params)`, 'Client');
+                this._showInstanceParameters(data);
+                this._emit('parameters:ready', data);
+                return;
+            }
+
+            // A cached (pre-indexed) schema is later replaced by the live one
+            // from Houdini; keep the preview geometry on screen until then.
+            const replacingPreview = this._cachedPreview && !data.cached;
+            this._cachedPreview = !!data.cached;
+
+            if (data.cached) {
+                this._addLog('info',
+                    `Showing cached parameters (${paramCount} params) while Houdini starts`,
+                    'Client');
+            } else {
+                this._addLog('info',
+                    `Parameters extracted from HDA (${paramCount} params, ${data.node_count} nodes)`,
+                    'Client');
+            }
+
+            if (!replacingPreview) {
+                this._pendingNewHDA = true;
+
+                // Reset geometry state
+                this._currentGeometryUrl = null;
+                this._setMenuEnabled('export', false);
+                this._setMenuEnabled('profile', false);
+                this._setMenuEnabled('animate', false);
+                this._setMenuEnabled('exportAnimation', false);
+                this._stopAnimation();
+                if (this._el.profileSection) this._el.profileSection.style.display = 'none';
+                if (this._el.geometryInfo) this._el.geometryInfo.style.display = 'none';
+                if (this._el.pointCount) this._el.pointCount.textContent = '-';
+                if (this._el.primCount) this._el.primCount.textContent = '-';
+                if (this._viewport) this._viewport.clearModel();
+                this._clearInstances();
+            }
+
+            // Build parameter UI (read-only until Houdini has the HDA loaded)
             this._paramUI.load(data.parameters);
+            if (this._el.parametersContainer) this._el.parametersContainer.inert = this._cachedPreview;
             if (this._paramUI.toolLabel) {
                 this._setHdaName(this._paramUI.toolLabel, this._paramUI.toolDescription);
             }
+            this._setMenuEnabled('add', !this._cachedPreview);
             this._showParameters();
             this._emit('parameters:ready', data);
         });
 
         s.on('geometry_ready', (geo) => {
             this._hideGeometryLoader();
+            // New geometry replaces whatever frame was playing
+            this._stopAnimation();
 
             if (geo.error) {
                 this._addLog('error', `Geometry export failed: ${geo.error}`, 'Houdini');
@@ -558,16 +796,23 @@ export class AuroraApp extends EventEmitter {
             if (geo.url) {
                 this._currentGeometryUrl = geo.url;
                 this._setMenuEnabled('export', true);
+                this._setMenuEnabled('profile', true);
+                this._setMenuEnabled('animate', true);
+                this._setMenuEnabled('exportAnimation', true);
 
                 if (this._pendingSave) {
                     this._pendingSave = false;
                     this._downloadGeometry(geo.url);
-                } else {
-                    this._loadGeometry(geo.url);
+                } else if (!geo.unchanged) {
+                    // Unchanged geometry is already in the viewport
+                    this._loadGeometry(geo.url, geo.instance);
                 }
 
-                this._addLog('info',
-                    `Geometry ready: ${geo.point_count} points, ${geo.primitive_count} primitives`,
+                this._addLog('info', geo.unchanged
+                    ? 'Geometry unchanged'
+                    : `Geometry ready: ${geo.point_count} points, ${geo.primitive_count} primitives` +
+                      (geo.delivery === 'inline' ? ` (inline, ${(geo.size / 1024).toFixed(1)} KB)` : '') +
+                      (geo.cached ? ' (pre-cooked)' : ''),
                     'Houdini');
             }
 
@@ -578,6 +823,92 @@ export class AuroraApp extends EventEmitter {
             this._emit('geometry:ready', geo);
         });
 
+        s.on('transform_update', ({ transforms, param }) => {
+            this._hideGeometryLoader();
+            this._stopAnimation();
+            // Only the placement changed; move the meshes already loaded
+            for (const [instance, matrix] of Object.entries(transforms || {})) {
+                this._viewport?.setModelTransform(instance, matrix);
+            }
+            this._addLog('info', `Transform updated (${param}), geometry not re-exported`, 'Houdini');
+        });
+
+        s.on('animation_started', (data) => {
+            if (data.error) {
+                this._hideGeometryLoader();
+                this._addLog('error', `Animation export failed: ${data.error}`, 'Houdini');
+                return;
+            }
+            this._animation = new AnimationPlayer(this._viewport, data);
+            this._animation.on('playing', () => this._hideGeometryLoader());
+            this._addLog('info',
+                `Exporting ${data.frames.length} frames (${data.frames[0]}-${data.frames.at(-1)}), ` +
+                `playing after ${data.preroll}`,
+                'Houdini');
+        });
+
+        s.on('animation_frame', (data) => {
+            if (data.error) {
+                this._hideGeometryLoader();
+                this._addLog('error', `Frame ${data.frame} failed: ${data.error}`, 'Houdini');
+                return;
+            }
+            if (this._animation?.animationId === data.animation_id) this._animation.addFrame(data);
+        });
+
+        s.on('animation_ready', (data) => {
+            this._hideGeometryLoader();
+            if (this._animation?.animationId === data.animation_id) this._animation.finish(data.exported);
+            this._addLog('info', data.cancelled
+                ? `Animation export cancelled after ${data.exported} of ${data.frames} frames`
+                : `Animation exported: ${data.frames} frames`,
+                'Houdini');
+            if (data.pack_error) this._addLog('warning', `Animated GLB not packed: ${data.pack_error}`, 'Houdini');
+            if (this._pendingAnimationSave && data.url) this._downloadGeometry(data.url);
+            this._pendingAnimationSave = false;
+            this._emit('animation:ready', data);
+        });
+
+        s.on('instance_removed', ({ instance }) => {
+            if (this._animation?.instance === instance) this._stopAnimation();
+            this._removeInstanceUI(instance);
+            this._viewport?.removeModel(instance);
+            this._addLog('info', `Removed HDA ${instance}`, 'Client');
+            this._emit('instance:removed', { instance });
+        });
+
+        s.on('memory_warning', ({ message, reclaimed }) => {
+            this._addLog('warning',
+                message + (reclaimed?.length ? ` (${reclaimed.join(', ')})` : ''),
+                'Houdini');
+        });
+
+        s.on('profile_started', ({ updates }) => {
+            this._addLog('info', `Profiling the next ${updates} parameter updates`, 'Client');
+        });
+
+        s.on('profile_ready', (data) => {
+            this._setMenuEnabled('profile', true);
+            if (data.error) {
+                this._addLog('error', `Profiling failed: ${data.error}`, 'Houdini');
+                return;
+            }
+            const heaviest = data.top_cook?.[0];
+            this._addLog('info',
+                `Profile of ${data.updates} updates ready` +
+                (heaviest ? ` — heaviest node ${heaviest.path} (${Math.round(heaviest.cook_ms)} ms)` : ''),
+                'Houdini');
+            this._showProfile(data);
+        });
+
+        s.on('timing', ({ action, round_trip, stages }) => {
+            const breakdown = Object.entries(stages)
+                .map(([stage, ms]) => `${stage} ${Math.round(ms)}`)
+                .join(', ');
+            this._addLog('info', `${action} took ${Math.round(round_trip)} ms (${breakdown})`, 'Client');
+            this._emit('timing', { action, round_trip, stages });
+        });
+
         s.on('idle_warning', (data) => {
             const minutes = Math.ceil(data.seconds_remaining / 60);
             this._setStatus(`⚠️ Idle - ${minutes} min left`);
@@ -593,8 +924,8 @@ export class AuroraApp extends EventEmitter {
             }, 2000);
         });
 
-        s.on('log', ({ level, message, context }) => {
-            this._addLog(level, message, context);
+        s.on('log', ({ level, message, context, count }) => {
+            this._addLog(level, message, context, count);
         });
 
         s.on('error', (err) => {
@@ -617,9 +948,14 @@ export class AuroraApp extends EventEmitter {
     _teardownModules() {
         if (this._session)  { this._session.dispose();  this._session = null; }
         if (this._viewport) { this._viewport.dispose();  this._viewport = null; }
+        this._stopAnimation();
+        this._clearInstances();
         if (this._paramUI)  { this._paramUI.dispose();   this._paramUI = null; }
         this._currentGeometryUrl = null;
         this._pendingSave = false;
         this._pendingNewHDA = false;
+        this._cachedPreview = false;
+        this._addingInstance = false;
+        this._pendingAnimationSave = false;
     }
 }
@@ -0,0 +1,142 @@
+/**
+ * Aurora Codec — decoder for binary-encoded session messages.
+ *
+ * Once negotiated (see `runtime/session/message_codec.py`), the session
+ * instance sends messages as
+ *
+ *   <encoding id: 1 byte> <compression id: 1 byte> <body>
+ *
+ * where the body is MessagePack or UTF-8 JSON, optionally deflated (zlib
+ * format). Through API Gateway the bytes arrive base64-wrapped in a JSON
+ * envelope (`{ ..., encoded: '<base64>' }`); on the direct channel as a
+ * binary frame.
+ *
+ * Usage:
+ *   import { decodeMessage, supportedCompression } from './aurora/codec.js';
+ *
+ *   const message = await decodeMessage(bytes);
+ */
+
+const ENCODING_JSON = 0;
+const ENCODING_MSGPACK = 1;
+const COMPRESSION_DEFLATE = 1;
+
+export const supportedEncodings = ['msgpack', 'json'];
+
+/** Compressions this browser can decode (Compression Streams API). */
+export const supportedCompression = typeof DecompressionStream !== 'undefined' ? ['deflate'] : [];
+
+/**
+ * Decode an encoded message.
+ * @param {Uint8Array} bytes
+ * @returns {Promise<object>}
+ */
+export async function decodeMessage(bytes) {
+    const encoding = bytes[0];
+    let body = bytes.subarray(2);
+
+    if (bytes[1] === COMPRESSION_DEFLATE) {
+        const stream = new Blob([body]).stream().pipeThrough(new DecompressionStream('deflate'));
+        body = new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+
+    if (encoding === ENCODING_MSGPACK) return decodeMsgpack(body);
+    if (encoding === ENCODING_JSON) return JSON.parse(new TextDecoder().decode(body));
+    throw new Error(`[AuroraCodec] Unknown encoding ${encoding}`);
+}
+
+/**
+ * Decode base64 (the API Gateway envelope) to bytes.
+ * @param {string} text
+ * @returns {Uint8Array}
+ */
+export function fromBase64(text) {
+    const binary = atob(text);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return bytes;
+}
+
+/* ================================================================== */
+/*  MessagePack                                                        */
+/* ================================================================== */
+
+/**
+ * Decode a MessagePack value (the subset produced by msgpack-python:
+ * nil, bool, int, float, str, bin, array, map).
+ * @param {Uint8Array} bytes
+ * @returns {*}
+ */
+export function decodeMsgpack(bytes) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const text = new TextDecoder();
+    let pos = 0;
+
+    const str = (length) => {
+        const value = text.decode(bytes.subarray(pos, pos + length));
+        pos += length;
+        return value;
+    };
+    const bin = (length) => {
+        const value = bytes.slice(pos, pos + length);
+        pos += length;
+        return value;
+    };
+    const array = (length) => {
+        const value = new Array(length);
+        for (let i = 0; i < length; i++) value[i] = read();
+        return value;
+    };
+    const map = (length) => {
+        const value = {};
+        for (let i = 0; i < length; i++) {
+            const key = read();
+            value[key] = read();
+        }
+        return value;
+    };
+    const u8 = () => view.getUint8(pos++);
+    const u16 = () => { const v = view.getUint16(pos); pos += 2; return v; };
+    const u32 = () => { const v = view.getUint32(pos); pos += 4; return v; };
+
+    function read() {
+        const type = u8();
+
+        if (type <= 0x7f) return type;                          // positive fixint
+        if (type >= 0xe0) return type - 0x100;                  // negative fixint
+        if ((type & 0xf0) === 0x80) return map(type & 0x0f);    // fixmap
+        if ((type & 0xf0) === 0x90) return array(type & 0x0f);  // fixarray
+        if ((type & 0xe0) === 0xa0) return str(type & 0x1f);    // fixstr
+
+        let value;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(u8());
+            case 0xc5: return bin(u16());
+            case 0xc6: return bin(u32());
+            case 0xca: value = view.getFloat32(pos); pos += 4; return value;
+            case 0xcb: value = view.getFloat64(pos); pos += 8; return value;
+            case 0xcc: return u8();
+            case 0xcd: return u16();
+            case 0xce: return u32();
+            case 0xcf: value = Number(view.getBigUint64(pos)); pos += 8; return value;
+            case 0xd0: value = view.getInt8(pos); pos += 1; return value;
+            case 0xd1: value = view.getInt16(pos); pos += 2; return value;
+            case 0xd2: value = view.getInt32(pos); pos += 4; return value;
+            case 0xd3: value = Number(view.getBigInt64(pos)); pos += 8; return value;
+            case 0xd9: return str(u8());
+            case 0xda: return str(u16());
+            case 0xdb: return str(u32());
+            case 0xdc: return array(u16());
+            case 0xdd: return array(u32());
+            case 0xde: return map(u16());
+            case 0xdf: return map(u32());
+            default:
+                throw new Error(`[AuroraCodec] Unsupported MessagePack type 0x${type.toString(16)}`);
+        }
+    }
+
+    return read();
+}
@@ -12,4 +12,5 @@ export { EventEmitter } from './events.js';
 export { AuroraSession } from './session.js';
 export { AuroraViewport } from './viewport.js';
 export { AuroraParameters } from './parameters.js';
+export { AnimationPlayer } from './animation.js';
 export { AuroraApp } from './app.js';
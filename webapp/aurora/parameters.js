@@ -232,11 +232,9 @@ export class AuroraParameters extends EventEmitter {
         valueSpan.className = 'param-value';
         valueSpan.textContent = parseFloat(slider.value).toFixed(decimals);
 
+        // Emitted while dragging; the session paces updates to the backend's budget
         slider.addEventListener('input', () => {
             valueSpan.textContent = parseFloat(slider.value).toFixed(decimals);
-        });
-
-        slider.addEventListener('change', () => {
             this._emitChange(paramPath, parseFloat(slider.value), paramDef.num_components || 1);
         });
 
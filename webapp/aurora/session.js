@@ -12,24 +12,61 @@
  *   session.on('connected',        ()    => { ... });
  *   session.on('session_ready',    ()    => { ... });
  *   session.on('parameters_ready', data  => { ... });
- *   session.on('geometry_ready',   data  => { ... });
+ *   session.on('geometry_ready',   data  => { ... });  // data.instance: HDA instance it belongs to
+ *   session.on('transform_update', data  => { ... });  // { transforms: { instance: matrix } }
+ *   session.on('animation_started', data => { ... });  // { animation_id, frames, fps, stride, preroll }
+ *   session.on('animation_frame',  data  => { ... });  // { index, frame, geometry | same_as }
+ *   session.on('animation_ready',  data  => { ... });  // { exported, cancelled, url? (packed GLB) }
+ *   session.on('instance_removed', data  => { ... });  // { instance }
+ *   session.on('memory_warning',   data  => { ... });  // { message, rss_bytes, budget_bytes, reclaimed }
  *   session.on('status',           text  => { ... });  // human-readable status
- *   session.on('log',              entry => { ... });
+ *   session.on('log',              entry => { ... });  // { level, message, context, count }
  *   session.on('error',            err   => { ... });
  *   session.on('idle_warning',     data  => { ... });
  *   session.on('idle_timeout',     data  => { ... });
  *   session.on('terminated',       ()    => { ... });
+ *   session.on('direct_channel',   info  => { ... });  // { connected }
+ *   session.on('timing',           t     => { ... });  // { request_id, action, round_trip, stages }
+ *   session.on('profile_started',  data  => { ... });  // { updates }
+ *   session.on('profile_ready',    data  => { ... });  // { top_cook, top_memory, python_hotspots, downloads }
  *
  *   await session.connect();
  *   session.startSession({ idle_timeout_minutes: 15 });
+ *   session.startSession({ hdaFile: file });   // preload an HDA while booting
  *   await session.uploadHDA(file);
- *   session.updateParameter(paramPath, value, numComponents);
+ *   await session.uploadHDA(file, { addInstance: true });  // add next to the loaded HDAs
+ *   session.removeInstance(instance);
+ *   session.updateParameter(paramPath, value, numComponents);  // throttled, latest wins
  *   session.requestGeometry({ purpose: 'save' });
+ *   session.profile(5);                         // profile the next 5 updates
+ *   session.exportAnimation({ frameStart: 1, frameEnd: 48, stride: 2, pack: true });
+ *   session.cancelAnimation();
+ *   session.latencyPercentiles();               // { stage: { p50, p95, p99, count } }
  *   session.terminate();
  *   session.dispose();
  */
 
 import { EventEmitter } from './events.js';
+import { decodeMessage, fromBase64, supportedCompression, supportedEncodings } from './codec.js';
+
+// Handled by the backend Lambda, so always sent through API Gateway
+const CONTROL_ACTIONS = new Set([
+    'get_session_id',
+    'request_upload_url',
+    'start_session',
+    'terminate_session',
+    'request_direct_channel',
+]);
+
+// Partially received chunked messages are dropped after this long
+const CHUNK_TIMEOUT_MS = 60000;
+
+// Latency samples kept per stage, and how long an unanswered request is tracked
+const LATENCY_SAMPLES = 200;
+const REQUEST_TIMEOUT_MS = 300000;
+
+// Parameter update pacing until the backend advertises an update_budget
+const DEFAULT_UPDATE_BUDGET = { min_interval_ms: 0, debounce_ms: 30, preview_lod: false };
 
 export class AuroraSession extends EventEmitter {
     /**
@@ -49,8 +86,60 @@ export class AuroraSession extends EventEmitter {
         /** @type {WebSocket|null} */
         this._ws = null;
 
+        /**
+         * Direct channel to the session instance, bypassing API Gateway
+         * (only when the backend offers one).
+         * @type {WebSocket|null}
+         */
+        this._direct = null;
+
         /** @type {string|null} */
         this.sessionId = null;
+
+        // Incoming messages are decoded in arrival order (decoding can be async)
+        this._inbox = Promise.resolve();
+
+        /**
+         * Partially received chunked messages, by message_id.
+         * @type {Map<string, {bytes: Uint8Array, received: number, total: number, updated: number}>}
+         */
+        this._chunks = new Map();
+
+        /**
+         * Object URL of each HDA instance's last inline geometry, revoked
+         * when replaced (and of the frames of the last animation export).
+         * @type {Map<string, string>}
+         */
+        this._inlineGeometryUrls = new Map();
+
+        /**
+         * Commands awaiting a response, by request_id.
+         * @type {Map<string, {action: string, sentAt: number}>}
+         */
+        this._requests = new Map();
+
+        /**
+         * Recent latency samples (ms) per stage, for percentiles.
+         * @type {Map<string, number[]>}
+         */
+        this._latency = new Map();
+
+        /**
+         * Pacing advertised by the backend with each geometry_ready
+         * (average cost of an update and the recommended debounce).
+         * @type {{min_interval_ms: number, debounce_ms: number, preview_lod: boolean}}
+         */
+        this.updateBudget = { ...DEFAULT_UPDATE_BUDGET };
+
+        /**
+         * Parameter updates not sent yet, latest value per parameter.
+         * @type {Map<string, {value: *, numComponents: number}>}
+         */
+        this._pendingUpdates = new Map();
+        this._updateTimer = null;
+        this._lastUpdateSent = 0;
+        /** @private When the oldest unsent update was made */
+        this._pendingSince = 0;
     }
 
     /* ================================================================== */
@@ -77,9 +166,7 @@ export class AuroraSession extends EventEmitter {
                         ws.removeEventListener('message', handler);
 
                         // Install permanent message handler
-                        ws.onmessage = (event) => {
-                            this._handleMessage(JSON.parse(event.data));
-                        };
+                        ws.onmessage = (event) => this._receive(event.data);
 
                         this._emit('connected', { sessionId: this.sessionId });
                         resolve();
@@ -109,9 +196,18 @@ export class AuroraSession extends EventEmitter {
 
     /**
      * Send an arbitrary JSON command over the WebSocket.
+     * Session traffic uses the direct channel while it is open.
      * @param {object} command
      */
     send(command) {
+        // Houdini commands are tagged for the latency breakdown
+        if (!CONTROL_ACTIONS.has(command.action) && !command.request_id) {
+            command = this._track(command);
+        }
+        if (this._direct?.readyState === WebSocket.OPEN && !CONTROL_ACTIONS.has(command.action)) {
+            this._direct.send(JSON.stringify(command));
+            return;
+        }
         if (!this.connected) {
             console.warn('[AuroraSession] WebSocket not connected');
             return;
@@ -121,17 +217,41 @@ export class AuroraSession extends EventEmitter {
 
     /**
      * Ask the backend to start a Houdini session on EC2.
+     *
+     * When `hdaFile` is given it is uploaded first, and the instance
+     * downloads and installs it while Houdini boots; its parameters and
+     * initial geometry arrive as soon as the session is ready.
+     *
      * @param {object} [opts]
      * @param {number} [opts.idle_timeout_minutes=15]
      * @param {number} [opts.idle_warning_minutes=2]
+     * @param {File}   [opts.hdaFile]  HDA to preload during boot
+     * @returns {Promise<boolean>} true if the start request was sent
      */
-    startSession(opts = {}) {
-        this.send({
+    async startSession(opts = {}) {
+        const command = {
             action: 'start_session',
             idle_timeout_minutes: opts.idle_timeout_minutes ?? 15,
             idle_warning_minutes: opts.idle_warning_minutes ?? 2
-        });
+        };
+
+        if (opts.hdaFile) {
+            this._emit('status', 'Uploading HDA…');
+            try {
+                const urlData = await this._uploadToS3(opts.hdaFile);
+                command.s3_key = urlData.s3_key;
+                command.filename = opts.hdaFile.name;
+            } catch (error) {
+                console.error('[AuroraSession] Error uploading HDA:', error);
+                this._emit('log', { level: 'error', message: `Failed to upload HDA: ${error.message}`, context: 'Client' });
+                this._emit('error', error.message);
+                return false;
+            }
+        }
+
+        this.send(command);
         this._emit('status', 'Starting EC2 instance…');
+        return true;
     }
 
     /**
@@ -139,31 +259,22 @@ export class AuroraSession extends EventEmitter {
      * backend to extract its parameters.
      *
      * @param {File} file — the .hda file chosen by the user.
+     * @param {object}  [opts]
+     * @param {boolean} [opts.addInstance=false] — add it as another instance
+     *   instead of replacing the loaded HDAs
      * @returns {Promise<boolean>} true on success
      */
-    async uploadHDA(file) {
+    async uploadHDA(file, opts = {}) {
         try {
-            // 1. Request presigned URL from the backend
-            const urlData = await this._requestUploadUrl(file);
-
-            // 2. PUT the file to S3
-            const uploadResponse = await fetch(urlData.upload_url, {
-                method: 'PUT',
-                body: file,
-                headers: { 'Content-Type': file.type || 'application/octet-stream' }
-            });
-
-            if (!uploadResponse.ok) {
-                throw new Error(`Upload failed: ${uploadResponse.status} ${uploadResponse.statusText}`);
-            }
-
-            this._emit('log', { level: 'info', message: `HDA uploaded to S3: ${file.name}`, context: 'Client' });
+            // 1-2. Upload the file to S3 via a presigned URL
+            const urlData = await this._uploadToS3(file);
 
             // 3. Tell the backend to load it
             this.send({
                 action: 'extract_parameters',
                 filename: file.name,
-                s3_key: urlData.s3_key
+                s3_key: urlData.s3_key,
+                ...(opts.addInstance ? { add_instance: true } : {})
             });
 
             return true;
@@ -177,17 +288,38 @@ export class AuroraSession extends EventEmitter {
 
     /**
      * Send a parameter update to the Houdini session.
+     *
+     * Updates are paced by the backend's `updateBudget`: they are sent
+     * `debounce_ms` after the last call, but no later than
+     * `max(min_interval_ms, debounce_ms)` after the first unsent one (so a
+     * drag keeps updating) and at least `min_interval_ms` apart. Only the
+     * latest value of each parameter is sent. Safe to call on every slider
+     * `input` event.
      * @param {string}       paramPath
      * @param {*}            value
      * @param {number}       [numComponents=1]
      */
     updateParameter(paramPath, value, numComponents = 1) {
-        this.send({
-            action: 'update_parameter',
-            param: paramPath,
-            value,
-            num_components: numComponents
-        });
+        const now = Date.now();
+        if (!this._pendingUpdates.size) this._pendingSince = now;
+        this._pendingUpdates.set(paramPath, { value, numComponents });
+
+        const { min_interval_ms, debounce_ms } = this.updateBudget;
+        const maxWait = Math.max(min_interval_ms, debounce_ms);
+        const due = Math.max(
+            this._lastUpdateSent + min_interval_ms,
+            Math.min(now + debounce_ms, this._pendingSince + maxWait)
+        );
+        clearTimeout(this._updateTimer);
+        this._updateTimer = setTimeout(() => this._flushUpdates(), Math.max(0, due - now));
+    }
+
+    /**
+     * Remove one HDA instance from the session; confirmed by `instance_removed`.
+     * @param {string} instance
+     */
+    removeInstance(instance) {
+        this.send({ action: 'remove_instance', instance });
     }
 
     /**
@@ -199,6 +331,59 @@ export class AuroraSession extends EventEmitter {
         this.send({ action: 'get_geometry', ...opts });
     }
 
+    /**
+     * Export the active HDA instance over a frame range. Frames stream in
+     * as `animation_frame` as they are cooked; `animation_ready` ends it.
+     * Parameter changes cancel the frames not exported yet.
+     * @param {object}  [opts]
+     * @param {number}  [opts.frameStart] — default: the scene's playbar range
+     * @param {number}  [opts.frameEnd]
+     * @param {number}  [opts.stride=1]
+     * @param {number}  [opts.fps] — default: the scene's
+     * @param {boolean} [opts.pack=false] — also upload one animated GLB
+     */
+    exportAnimation({ frameStart, frameEnd, stride = 1, fps, pack = false } = {}) {
+        this.send({
+            action: 'export_animation',
+            frame_start: frameStart,
+            frame_end: frameEnd,
+            stride,
+            fps,
+            pack,
+        });
+    }
+
+    /** Stop an animation export; frames already received stay valid. */
+    cancelAnimation() {
+        this.send({ action: 'cancel_animation' });
+    }
+
+    /**
+     * Profile the next parameter updates (Houdini Performance Monitor and
+     * Python cProfile); results arrive as `profile_ready`.
+     * @param {number} [updates=5]
+     */
+    profile(updates = 5) {
+        this.send({ action: 'profile', updates });
+    }
+
+    /**
+     * Per-stage latency percentiles over this session's recent requests
+     * (ms). Stages are those reported by the backend (route, queue_wait,
+     * parm_set, cook, render, upload, presign), plus forward, network and
+     * round_trip measured here.
+     * @returns {Object<string, {p50: number, p95: number, p99: number, count: number}>}
+     */
+    latencyPercentiles() {
+        const result = {};
+        for (const [stage, samples] of this._latency) {
+            const sorted = [...samples].sort((a, b) => a - b);
+            const at = (p) => sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+            result[stage] = { p50: at(0.5), p95: at(0.95), p99: at(0.99), count: sorted.length };
+        }
+        return result;
+    }
+
     /**
      * Send a terminate command and close the WebSocket.
      */
@@ -214,7 +399,11 @@ export class AuroraSession extends EventEmitter {
      * Full teardown — close the WebSocket and remove all listeners.
      */
     dispose() {
+        clearTimeout(this._updateTimer);
+        this._pendingUpdates.clear();
         this._close();
+        for (const url of this._inlineGeometryUrls.values()) URL.revokeObjectURL(url);
+        this._inlineGeometryUrls.clear();
         this.removeAllListeners();
     }
 
@@ -222,11 +411,166 @@ export class AuroraSession extends EventEmitter {
     /*  Internal — message routing                                         */
     /* ================================================================== */
 
+    /**
+     * Decode a raw frame — JSON text, a JSON envelope with a base64
+     * `encoded` payload, or binary (direct channel) — and handle it.
+     * @param {string|ArrayBuffer} raw
+     * @private
+     */
+    _receive(raw) {
+        this._inbox = this._inbox
+            .then(async () => {
+                if (raw instanceof ArrayBuffer) {
+                    return decodeMessage(new Uint8Array(raw));
+                }
+                const data = JSON.parse(raw);
+                // A chunked message may itself be an `encoded` envelope
+                // (re-chunked by the routing Lambda)
+                if (data.action === 'chunk') return this._unwrap(await this._reassemble(data));
+                return this._unwrap(data);
+            })
+            .then((data) => data && this._handleMessage(data))
+            .catch((err) => console.error('[AuroraSession] Failed to handle message', err));
+    }
+
+    /**
+     * Decode a JSON envelope carrying a base64 `encoded` payload; other
+     * messages (and null) are returned as they are.
+     * @param {object|null} data
+     * @returns {Promise<object|null>}
+     * @private
+     */
+    async _unwrap(data) {
+        if (!data?.encoded) return data;
+        const { encoded, ...envelope } = data;
+        return { ...envelope, ...(await decodeMessage(fromBase64(encoded))) };
+    }
+
+    /**
+     * Add a `chunk` message to its partial payload; once all chunks have
+     * arrived, decode the payload. See `runtime/session/message_framing.py`.
+     * @param {object} chunk
+     * @returns {Promise<object|null>} The message, or null if incomplete
+     * @private
+     */
+    async _reassemble(chunk) {
+        const now = Date.now();
+        for (const [id, partial] of this._chunks) {
+            if (now - partial.updated > CHUNK_TIMEOUT_MS) this._chunks.delete(id);
+        }
+
+        let partial = this._chunks.get(chunk.message_id);
+        if (!partial) {
+            partial = { bytes: new Uint8Array(chunk.size), received: 0, total: chunk.total, updated: now };
+            this._chunks.set(chunk.message_id, partial);
+        }
+        partial.bytes.set(fromBase64(chunk.data), chunk.offset);
+        partial.received++;
+        partial.updated = now;
+
+        if (partial.received < partial.total) return null;
+        this._chunks.delete(chunk.message_id);
+
+        const message = chunk.binary
+            ? await decodeMessage(partial.bytes)
+            : JSON.parse(new TextDecoder().decode(partial.bytes));
+        return chunk.session_id ? { session_id: chunk.session_id, ...message } : message;
+    }
+
+    /**
+     * Give inline geometry (GLB bytes sent in the message instead of via
+     * S3) an object URL, so it loads like S3-delivered geometry.
+     * @param {object} geometry
+     * @param {string} [instance] — HDA instance the geometry belongs to
+     * @returns {object}
+     * @private
+     */
+    _resolveGeometry(geometry, instance = '') {
+        if (geometry.delivery !== 'inline') return geometry;
+        // Unchanged inline geometry is not resent; reuse what we hold
+        if (!geometry.data) return { ...geometry, url: this._inlineGeometryUrls.get(instance) };
+
+        this._revokeInlineGeometry(instance);
+        const { data, ...rest } = geometry;
+        const bytes = typeof data === 'string' ? fromBase64(data) : data;
+        const url = URL.createObjectURL(new Blob([bytes], { type: 'model/gltf-binary' }));
+        this._inlineGeometryUrls.set(instance, url);
+        return { ...rest, url };
+    }
+
+    /** @private */
+    _revokeInlineGeometry(instance) {
+        const url = this._inlineGeometryUrls.get(instance);
+        if (url) URL.revokeObjectURL(url);
+        this._inlineGeometryUrls.delete(instance);
+    }
+
+    /** @private */
+    _revokeAnimationFrames() {
+        for (const key of [...this._inlineGeometryUrls.keys()]) {
+            if (key.startsWith('animation:')) this._revokeInlineGeometry(key);
+        }
+    }
+
+    /**
+     * Tag a command with a request_id and send time.
+     * @param {object} command
+     * @returns {object}
+     * @private
+     */
+    _track(command) {
+        const now = Date.now();
+        for (const [id, request] of this._requests) {
+            if (now - request.sentAt > REQUEST_TIMEOUT_MS) this._requests.delete(id);
+        }
+
+        const requestId = crypto.randomUUID();
+        this._requests.set(requestId, { action: command.action, sentAt: now });
+        return { ...command, request_id: requestId, sent_at: now / 1000 };
+    }
+
+    /**
+     * Complete the latency breakdown of a response to a tracked command
+     * and add it to the session's samples.
+     * @param {object} data
+     * @private
+     */
+    _recordTiming(data) {
+        const request = this._requests.get(data.request_id);
+        if (!request) return;
+        this._requests.delete(data.request_id);
+
+        const roundTrip = Date.now() - request.sentAt;
+        const stages = { ...(data.timings?.stages || {}) };
+        // Bridge send time minus runner completion, both on the instance's clock
+        if (data.timestamp && data.timings?.completed_at) {
+            stages.forward = Math.max(0, (data.timestamp - data.timings.completed_at) * 1000);
+        }
+        const measured = Object.values(stages).reduce((sum, ms) => sum + ms, 0);
+        stages.network = Math.max(0, roundTrip - measured);
+
+        for (const [stage, ms] of Object.entries({ ...stages, round_trip: roundTrip })) {
+            const samples = this._latency.get(stage) || [];
+            samples.push(ms);
+            if (samples.length > LATENCY_SAMPLES) samples.shift();
+            this._latency.set(stage, samples);
+        }
+
+        this._emit('timing', {
+            request_id: data.request_id,
+            action: request.action,
+            round_trip: roundTrip,
+            stages,
+        });
+    }
+
     /** @private */
     _handleMessage(data) {
         // Heartbeats are silent
         if (data.action === 'heartbeat') return;
 
+        if (data.request_id) this._recordTiming(data);
+
         // Session ID (in case it arrives again)
         if (data.session_id && !this.sessionId) {
             this.sessionId = data.session_id;
@@ -234,7 +578,7 @@ export class AuroraSession extends EventEmitter {
 
         // Route by action / status
         if (data.action === 'session_started') {
-            this._emit('status', 'EC2 instance starting…');
+            this._emit('status', data.warm ? 'Warm instance claimed, connecting…' : 'EC2 instance starting…');
         }
 
         if (data.status === 'ec2_connected') {
@@ -245,12 +589,53 @@ export class AuroraSession extends EventEmitter {
             this._emit('session_ready');
         }
 
+        // Offer binary encodings once Houdini is there to answer
+        if (data.status === 'ready') {
+            this.send({
+                action: 'negotiate_encoding',
+                encodings: supportedEncodings,
+                compression: supportedCompression,
+            });
+        }
+
         if (data.action === 'parameters_ready') {
             this._emit('parameters_ready', data);
         }
 
+        if (data.action === 'geometry_ready' && data.update_budget) {
+            this.updateBudget = { ...DEFAULT_UPDATE_BUDGET, ...data.update_budget };
+        }
+
         if (data.action === 'geometry_ready' && data.geometry) {
-            this._emit('geometry_ready', data.geometry);
+            const geometry = this._resolveGeometry(data.geometry, data.instance ?? '');
+            this._emit('geometry_ready', { ...geometry, instance: data.instance });
+        }
+
+        if (data.action === 'animation_started') {
+            this._revokeAnimationFrames();
+            this._emit('animation_started', data);
+        }
+
+        if (data.action === 'animation_frame') {
+            const geometry = data.geometry && this._resolveGeometry(data.geometry, `animation:${data.index}`);
+            this._emit('animation_frame', { ...data, geometry });
+        }
+
+        if (data.action === 'animation_ready') {
+            this._emit('animation_ready', data);
+        }
+
+        if (data.action === 'transform_update') {
+            this._emit('transform_update', data);
+        }
+
+        if (data.action === 'memory_warning') {
+            this._emit('memory_warning', data);
+        }
+
+        if (data.action === 'instance_removed') {
+            this._revokeInlineGeometry(data.instance);
+            this._emit('instance_removed', data);
         }
 
         if (data.action === 'terminating') {
@@ -258,6 +643,14 @@ export class AuroraSession extends EventEmitter {
             this._emit('terminated', data);
         }
 
+        if (data.action === 'profile_started') {
+            this._emit('profile_started', data);
+        }
+
+        if (data.action === 'profile_ready') {
+            this._emit('profile_ready', data);
+        }
+
         if (data.action === 'idle_warning') {
             this._emit('idle_warning', data);
         }
@@ -266,10 +659,38 @@ export class AuroraSession extends EventEmitter {
             this._emit('idle_timeout', data);
         }
 
+        if (data.action === 'startup_timeline') {
+            this._emit('startup_timeline', data);
+        }
+
+        if (data.action === 'direct_channel') {
+            this._openDirectChannel(data);
+        }
+
         if (data.action === 'log') {
             this._emit('log', { level: data.level, message: data.message, context: data.context });
         }
 
+        // Batched Houdini logs: repeated entries carry a count, and levels
+        // that were sampled or evicted on the runner are summarised in `dropped`
+        if (data.action === 'logs') {
+            for (const entry of data.entries || []) {
+                this._emit('log', {
+                    level: entry.level,
+                    message: entry.message,
+                    context: entry.context,
+                    count: entry.count || 1,
+                });
+            }
+            for (const [level, count] of Object.entries(data.dropped || {})) {
+                this._emit('log', {
+                    level: 'system',
+                    message: `${count} ${level} message(s) suppressed`,
+                    context: 'Houdini',
+                });
+            }
+        }
+
         if (data.error) {
             this._emit('error', data.error);
         }
@@ -282,6 +703,27 @@ export class AuroraSession extends EventEmitter {
     /*  Internal helpers                                                   */
     /* ================================================================== */
 
+    /**
+     * @private — request a presigned URL and PUT the file to S3.
+     * @returns {Promise<object>} the upload_url_ready payload (incl. s3_key)
+     */
+    async _uploadToS3(file) {
+        const urlData = await this._requestUploadUrl(file);
+
+        const uploadResponse = await fetch(urlData.upload_url, {
+            method: 'PUT',
+            body: file,
+            headers: { 'Content-Type': file.type || 'application/octet-stream' }
+        });
+
+        if (!uploadResponse.ok) {
+            throw new Error(`Upload failed: ${uploadResponse.status} ${uploadResponse.statusText}`);
+        }
+
+        this._emit('log', { level: 'info', message: `HDA uploaded to S3: ${file.name}`, context: 'Client' });
+        return urlData;
+    }
+
     /** @private — ask backend for a presigned S3 upload URL */
     _requestUploadUrl(file) {
         return new Promise((resolve, reject) => {
@@ -313,8 +755,60 @@ export class AuroraSession extends EventEmitter {
         });
     }
 
+    /**
+     * Connect straight to the session instance with a signed token.
+     * API Gateway stays open; if the channel can't be opened, traffic
+     * simply keeps flowing through it.
+     * @private
+     */
+    _openDirectChannel({ url, token }) {
+        const ws = new WebSocket(`${url}/?token=${encodeURIComponent(token)}`);
+        ws.binaryType = 'arraybuffer';
+
+        ws.onopen = () => {
+            this._direct = ws;
+            this._emit('direct_channel', { connected: true });
+        };
+
+        ws.onmessage = (event) => this._receive(event.data);
+
+        ws.onclose = () => {
+            if (this._direct !== ws) return;  // never opened: stay on API Gateway
+            this._direct = null;
+            this._emit('direct_channel', { connected: false });
+
+            // Dropped after opening: ask for a fresh token
+            if (this.connected) {
+                setTimeout(() => this.send({ action: 'request_direct_channel' }), 2000);
+            }
+        };
+    }
+
+    /**
+     * Send the pending parameter updates (latest value of each).
+     * @private
+     */
+    _flushUpdates() {
+        this._updateTimer = null;
+        for (const [paramPath, { value, numComponents }] of this._pendingUpdates) {
+            this.send({
+                action: 'update_parameter',
+                param: paramPath,
+                value,
+                num_components: numComponents
+            });
+        }
+        this._pendingUpdates.clear();
+        this._lastUpdateSent = Date.now();
+    }
+
     /** @private */
     _close() {
+        if (this._direct) {
+            const direct = this._direct;
+            this._direct = null;
+            direct.close();
+        }
         if (this._ws) {
             this._ws.close();
             this._ws = null;
@@ -5,7 +5,12 @@
  *   import { AuroraViewport } from './aurora/viewport.js';
  *   const vp = new AuroraViewport(document.getElementById('viewer'));
  *   vp.loadModel(url);           // load GLB/GLTF from URL
+ *   vp.loadModel(url, { instance: 'user_hda_2' });  // replace one instance's mesh only
  *   vp.loadModelFromFile(file);   // load from a File/Blob
+ *   vp.removeModel('user_hda_2'); // remove one instance's mesh
+ *   vp.setModelTransform('user_hda_2', matrix);  // move one instance's mesh
+ *   const scene = await vp.loadScene(url);        // load without showing
+ *   vp.showModel('user_hda', scene);              // swap a mesh in, keeping the framing
  *   vp.dispose();                 // tear down
  */
 
@@ -18,6 +23,9 @@ import { ViewportGizmo } from 'https://cdn.jsdelivr.net/gh/taucad/three-viewport
 const HDRI_URL = 'https://dl.polyhaven.org/file/ph-assets/HDRIs/hdr/1k/flamingo_pan_1k.hdr';
 const BG_COLOR = 0x1a1a2e;
 
+// Model key when the caller does not name an instance
+const DEFAULT_INSTANCE = 'default';
+
 export class AuroraViewport {
     /**
      * @param {HTMLElement} container — the DOM element to mount the viewport in.
@@ -31,8 +39,10 @@ export class AuroraViewport {
         this._container = container;
         this._opts = { hdri: true, grid: true, wireframe: false, toolbar: true, ...opts };
 
-        // State
+        // State — one model per HDA instance, all under this._model
         this._model = null;
+        /** @type {Map<string, THREE.Object3D>} */
+        this._models = new Map();
         this._wireframes = [];
         this._wireframeEnabled = this._opts.wireframe;
         this._hdriEnabled = this._opts.hdri;
@@ -295,17 +305,27 @@ export class AuroraViewport {
      * @param {string}  url
      * @param {object}  [opts]
      * @param {boolean} [opts.resetView=false] — reset scale & camera (use for new HDA)
+     * @param {string}  [opts.instance] — HDA instance the model belongs to;
+     *   replaces only that instance's model and keeps the others
      * @returns {Promise<void>}
      */
     loadModel(url, opts = {}) {
         if (opts.resetView) this._modelScale = null;
+        return this.loadScene(url).then((scene) => {
+            this._setModel(scene, opts.instance ?? DEFAULT_INSTANCE);
+        });
+    }
+
+    /**
+     * Load a GLB/GLTF scene without adding it (e.g. animation frames).
+     * @param {string} url
+     * @returns {Promise<THREE.Object3D>}
+     */
+    loadScene(url) {
         return new Promise((resolve, reject) => {
             new GLTFLoader().load(
                 url,
-                (gltf) => {
-                    this._setModel(gltf.scene);
-                    resolve();
-                },
+                (gltf) => resolve(gltf.scene),
                 undefined,
                 (err) => {
                     console.error('[AuroraViewport] Failed to load model:', err);
@@ -315,6 +335,17 @@ export class AuroraViewport {
         });
     }
 
+    /**
+     * Show *scene* as an instance's model without re-framing the view, so
+     * successive animation frames do not jump around.
+     * @param {string}         instance
+     * @param {THREE.Object3D} scene — from loadScene
+     */
+    showModel(instance, scene) {
+        if (this._models.get(instance) === scene) return;
+        this._setModel(scene, instance ?? DEFAULT_INSTANCE, { keepFraming: true });
+    }
+
     /**
      * Load a model from a File or Blob.
      * @param {File|Blob} file
@@ -327,7 +358,40 @@ export class AuroraViewport {
     }
 
     /**
-     * Remove the current model from the scene.
+     * Remove one HDA instance's model from the scene.
+     * @param {string} instance
+     */
+    removeModel(instance) {
+        const model = this._models.get(instance);
+        if (!model) return;
+        this._removeWireframe();
+        model.traverse((child) => this._originalMaterials.delete(child));
+        this._model.remove(model);
+        this._models.delete(instance);
+        if (this._models.size) {
+            this._frameModels();
+            if (this._wireframeEnabled) this._addWireframe(this._model);
+        } else {
+            this.clearModel();
+        }
+    }
+
+    /**
+     * Place one HDA instance's model with a transform relative to the
+     * geometry it was loaded with (the next loadModel resets it).
+     * @param {string}   instance
+     * @param {number[]} matrix — 16 numbers, column-major (Matrix4.fromArray)
+     */
+    setModelTransform(instance, matrix) {
+        const model = this._models.get(instance);
+        if (!model) return;
+        model.matrixAutoUpdate = false;
+        model.matrix.fromArray(matrix);
+        model.matrixWorldNeedsUpdate = true;
+    }
+
+    /**
+     * Remove all models from the scene.
      */
     clearModel() {
         if (this._model) {
@@ -336,6 +400,7 @@ export class AuroraViewport {
             this._scene.remove(this._model);
             this._model = null;
         }
+        this._models.clear();
     }
 
     /**
@@ -364,25 +429,27 @@ export class AuroraViewport {
     /*  Internals                                                          */
     /* ------------------------------------------------------------------ */
 
-    _setModel(scene) {
+    _setModel(scene, instance, { keepFraming = false } = {}) {
         const isFirstLoad = !this._modelScale;
-        this.clearModel();
-        this._model = scene;
-        this._scene.add(this._model);
+        if (isFirstLoad) this.clearModel();
 
-        // Compute bounding box
-        const box = new THREE.Box3().setFromObject(this._model);
-        const center = box.getCenter(new THREE.Vector3());
-        const size = box.getSize(new THREE.Vector3());
-
-        // Lock scale on first load, reuse for subsequent loads
-        if (isFirstLoad) {
-            this._modelScale = 5 / Math.max(size.x, size.y, size.z);
+        // Instances share one group, so they keep their relative placement
+        if (!this._model) {
+            this._model = new THREE.Group();
+            this._scene.add(this._model);
+        }
+        this._removeWireframe();
+        const previous = this._models.get(instance);
+        if (previous) {
+            // Animation frames are shown again later, with their own materials
+            this._restorePBR(previous);
+            previous.traverse((child) => this._originalMaterials.delete(child));
+            this._model.remove(previous);
         }
+        this._models.set(instance, scene);
+        this._model.add(scene);
 
-        // Apply scale and center at origin
-        this._model.scale.setScalar(this._modelScale);
-        this._model.position.copy(center).negate().multiplyScalar(this._modelScale);
+        if (isFirstLoad || !keepFraming) this._frameModels(isFirstLoad);
 
         // Only reset camera on first load
         if (isFirstLoad) {
@@ -393,6 +460,26 @@ export class AuroraViewport {
         if (this._wireframeEnabled) this._addWireframe(this._model);
 
         // Apply current HDRI state (Lambert if off)
-        if (!this._hdriEnabled) this._switchToLambert(this._model);
+        if (!this._hdriEnabled) this._switchToLambert(scene);
+    }
+
+    /** Scale and center all models at the origin. */
+    _frameModels(lockScale = false) {
+        // Compute bounding box of the unscaled models
+        this._model.scale.setScalar(1);
+        this._model.position.set(0, 0, 0);
+        this._model.updateMatrixWorld(true);
+        const box = new THREE.Box3().setFromObject(this._model);
+        const center = box.getCenter(new THREE.Vector3());
+        const size = box.getSize(new THREE.Vector3());
+
+        // Lock scale on first load, reuse for subsequent loads
+        if (lockScale) {
+            this._modelScale = 5 / Math.max(size.x, size.y, size.z);
+        }
+
+        // Apply scale and center at origin
+        this._model.scale.setScalar(this._modelScale);
+        this._model.position.copy(center).negate().multiplyScalar(this._modelScale);
     }
 }